@@ -0,0 +1,81 @@
+"""
+Micro-benchmark comparing the per-requirement cost of the single-pass lexer
+with the previous three-pass regular expression parsing (extras, then the
+specification, then splitting operators from versions).
+
+Usage:
+    python benchmarks/bench_lexer.py [--number N]
+"""
+import argparse
+import re
+import timeit
+
+from pipenv_devcheck.lexer import lex_requirement
+
+# The uncompiled patterns used before the lexer, kept here for comparison
+legacy_ops_exp = "(?:==|!=|>=|<=|<|>)"
+legacy_version_exp = r"[\d.]+"
+legacy_package_name_exp = r"([\w|\-]*)"
+legacy_spec_exp = (r"(\s*" + legacy_ops_exp + r"\s*" + legacy_version_exp +
+                   "|\\*)")
+legacy_split_exp = "(" + legacy_ops_exp + r")\s*(" + legacy_version_exp + ")"
+legacy_addtl_spec_exp = r"(?:," + legacy_spec_exp + ")?"
+legacy_setup_spec_exp = (legacy_package_name_exp + legacy_spec_exp +
+                         legacy_addtl_spec_exp + legacy_addtl_spec_exp)
+legacy_setup_extras_exp = r'(?:\[([\w\-, ]*)\])'
+legacy_setup_extras_w_name_exp = (legacy_package_name_exp +
+                                  legacy_setup_extras_exp)
+
+requirements = [
+    "matplotlib>=3.1.1",
+    "pyhive[hive, presto]>=0.6.0",
+    "pandas[fake_extra]>=0.25.1, <1.0",
+    "seaborn>=0.9.0, !=0.9.1, <0.11",
+    "simple_salesforce==0.74.3",
+]
+
+
+def legacy_parse(dep_str):
+    """Parses a requirement the way get_setup_deps used to"""
+    extras = []
+    extras_match = re.search(legacy_setup_extras_exp, dep_str)
+    if extras_match:
+        extras_info = re.findall(legacy_setup_extras_w_name_exp, dep_str)[0]
+        extras = [extra.strip() for extra in extras_info[1].split(',')]
+        dep_str = dep_str[:extras_match.start()] + dep_str[extras_match.end():]
+    parsed_dep = re.findall(legacy_setup_spec_exp, dep_str)[0]
+    specs = [re.findall(legacy_split_exp, spec)[0]
+             for spec in parsed_dep[1:] if spec != ""]
+    return parsed_dep[0], extras, specs
+
+
+def lexer_parse(dep_str):
+    """Parses a requirement with the single-pass lexer"""
+    return lex_requirement(dep_str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000,
+                        help="Number of passes over the sample requirements")
+    args = parser.parse_args()
+
+    for dep_str in requirements:
+        legacy = legacy_parse(dep_str)
+        lexed = lexer_parse(dep_str)
+        assert legacy == (lexed.name, lexed.extras, lexed.specs), dep_str
+
+    results = {}
+    for label, parse_fn in [("three-pass regexps", legacy_parse),
+                            ("single-pass lexer", lexer_parse)]:
+        seconds = min(timeit.repeat(
+            lambda: [parse_fn(dep_str) for dep_str in requirements],
+            number=args.number, repeat=3))
+        results[label] = seconds / (args.number * len(requirements)) * 1e6
+        print("{:<20} {:8.2f} us/requirement".format(label, results[label]))
+    print("speedup: {:.2f}x".format(results["three-pass regexps"] /
+                                     results["single-pass lexer"]))
+
+
+if __name__ == "__main__":
+    main()
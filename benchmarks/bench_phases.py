@@ -0,0 +1,170 @@
+"""
+Times each phase of a check on generated projects of increasing size and
+compares the timings with a saved JSON baseline, failing when a phase has
+slowed down by more than the regression threshold.
+
+Usage:
+    python benchmarks/bench_phases.py [--sizes N ...] [--repeat N]
+                                      [--baseline PATH] [--save PATH]
+                                      [--threshold FRACTION]
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from generate import write_project
+from pipenv_devcheck import pipenv_setup_comp, version_cache
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "baselines", "phases.json")
+default_sizes = [10, 100, 1000, 10000]
+
+
+def best_seconds(fn, make_args, repeat):
+    """
+    Runs a function 'repeat' times on fresh arguments and returns its
+    fastest wall time. Building the arguments is not timed, and garbage
+    collection is disabled while timing, as in 'timeit'. The version caches
+    are emptied before each run, so that every run parses from scratch.
+
+    Returns:
+        float: The fastest wall time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        args = make_args()
+        version_cache.clear_caches()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def time_phases(project_dir, requirements, repeat):
+    """
+    Times each phase of a check on a generated project
+
+    Returns:
+        dict<str, float>: Fastest wall time of each phase, in seconds
+    """
+    setup_path = os.path.join(project_dir, "setup.py")
+    pipfile_path = os.path.join(project_dir, "Pipfile")
+    setup_deps, setup_extras = pipenv_setup_comp.get_setup_deps(setup_path)
+    pipfile_deps, pipfile_extras = pipenv_setup_comp.get_pipfile_deps(
+        pipfile_path)
+    spec_strings = {name: list(specs) for name, _, specs, _ in requirements}
+
+    phases = [
+        ("read_setup", pipenv_setup_comp.read_setup,
+         lambda: (setup_path,)),
+        ("read_pipfile", pipenv_setup_comp.read_pipfile,
+         lambda: (pipfile_path,)),
+        ("get_setup_deps", pipenv_setup_comp.get_setup_deps,
+         lambda: (setup_path,)),
+        ("get_pipfile_deps", pipenv_setup_comp.get_pipfile_deps,
+         lambda: (pipfile_path,)),
+        ("split_ops_and_versions", pipenv_setup_comp.split_ops_and_versions,
+         lambda: (copy.deepcopy(spec_strings),)),
+        ("version_check", pipenv_setup_comp.version_check,
+         lambda: (setup_deps, pipfile_deps)),
+        ("extras_equality_check", pipenv_setup_comp.extras_equality_check,
+         lambda: (setup_extras, pipfile_extras)),
+    ]
+    return {name: best_seconds(fn, make_args, repeat)
+            for name, fn, make_args in phases}
+
+
+def regressions(results, baseline, threshold, min_delta):
+    """
+    Finds the phases that are slower than the baseline by more than
+    'threshold' (a fraction) and more than 'min_delta' seconds
+
+    Returns:
+        list<str>: A description of each regression
+    """
+    found = []
+    for size, phases in results.items():
+        for phase, seconds in phases.items():
+            base = baseline.get(size, {}).get(phase)
+            if base is None:
+                continue
+            if (seconds > base * (1 + threshold) and
+                    seconds - base > min_delta):
+                found.append("{} deps, {}: {:.2f} ms vs baseline {:.2f} ms "
+                             "(+{:.0%})".format(size, phase, seconds * 1000,
+                                                base * 1000,
+                                                seconds / base - 1))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=default_sizes)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=default_baseline,
+                        help="Baseline to compare with, if it exists")
+    parser.add_argument("--save", default=None,
+                        help="Write the results to this path as a new "
+                             "baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown, as a fraction of the "
+                             "baseline time")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="Slowdowns smaller than this are ignored as "
+                             "noise")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            project_dir = os.path.join(tmp_dir, str(size))
+            os.mkdir(project_dir)
+            requirements = write_project(project_dir, size)
+            results[str(size)] = time_phases(project_dir, requirements,
+                                             args.repeat)
+
+    phase_names = list(next(iter(results.values())))
+    print("{:<24}".format("phase") +
+          "".join("{:>12}".format(size + " deps") for size in results))
+    for phase in phase_names:
+        print("{:<24}".format(phase) +
+              "".join("{:>9.2f} ms".format(results[size][phase] * 1000)
+                      for size in results))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)),
+                    exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "machine": platform.machine(),
+                       "results": results}, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print("Saved baseline to {}".format(args.save))
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        found = regressions(results, baseline, args.threshold,
+                            args.min_delta_ms / 1000)
+        if found:
+            print("Regressions against {}:".format(args.baseline))
+            for regression in found:
+                print("    " + regression)
+            sys.exit(1)
+        print("No regressions against {}".format(args.baseline))
+
+
+if __name__ == "__main__":
+    main()
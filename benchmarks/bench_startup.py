@@ -0,0 +1,119 @@
+"""
+Tracks the cold-start latency of 'python -m pipenv_devcheck' against a
+regression budget. Each scenario is run in a fresh interpreter, and its
+median wall time is compared with that of a bare 'python -c pass', so the
+budget only covers the cost added by this package.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--budget-hit-ms MS]
+                                       [--budget-full-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+setup_text = """
+from setuptools import setup
+
+setup(
+    name="startup-bench",
+    install_requires=["pandas[excel]>=0.25.1, <2.0", "requests~=2.22"],
+)
+"""
+
+pipfile_text = """
+[packages]
+pandas = {extras = ["excel"], version = "==1.0.0"}
+requests = "==2.22.0"
+"""
+
+
+def median_seconds(cmd, env, runs):
+    """
+    Runs a command 'runs' times and returns its median wall time
+
+    Returns:
+        float: The median wall time in seconds
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def slowest_imports(cmd, env, count=10):
+    """
+    Lists the imports with the highest cumulative time for a command
+
+    Returns:
+        list<str>: '-X importtime' lines, slowest first
+    """
+    result = subprocess.run(cmd[:1] + ["-X", "importtime"] + cmd[1:],
+                            env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    lines = [line for line in result.stderr.splitlines()
+             if line.startswith("import time:") and "cumulative" not in line]
+    lines.sort(key=lambda line: -int(line.split("|")[1]))
+    return lines[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-hit-ms", type=float, default=60.0,
+                        help="Allowed overhead of a check served from the "
+                             "result cache")
+    parser.add_argument("--budget-full-ms", type=float, default=150.0,
+                        help="Allowed overhead of a full, uncached check")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_dir = os.path.join(tmp_dir, "project")
+        os.mkdir(project_dir)
+        with open(os.path.join(project_dir, "setup.py"), "w") as f:
+            f.write(setup_text)
+        with open(os.path.join(project_dir, "Pipfile"), "w") as f:
+            f.write(pipfile_text)
+
+        env = dict(os.environ,
+                   PYTHONPATH=repo_root,
+                   PIPENV_DEVCHECK_CACHE_DIR=os.path.join(tmp_dir, "cache"))
+        base_cmd = [sys.executable, "-m", "pipenv_devcheck",
+                    "--project-root", project_dir]
+        scenarios = [("cache hit", base_cmd, args.budget_hit_ms),
+                     ("full check", base_cmd + ["--no-cache"],
+                      args.budget_full_ms)]
+        # Populate the cache for the cache hit scenario
+        subprocess.run(base_cmd, env=env, check=True)
+
+        baseline = median_seconds([sys.executable, "-c", "pass"], env,
+                                  args.runs)
+        print("{:<12} {:8.1f} ms".format("interpreter", baseline * 1000))
+        failed = False
+        for label, cmd, budget_ms in scenarios:
+            overhead_ms = (median_seconds(cmd, env, args.runs) -
+                           baseline) * 1000
+            over_budget = overhead_ms > budget_ms
+            print("{:<12} {:+8.1f} ms (budget {:.0f} ms){}".format(
+                label, overhead_ms, budget_ms,
+                " OVER BUDGET" if over_budget else ""))
+            if over_budget:
+                failed = True
+                for line in slowest_imports(cmd, env):
+                    print("    " + line)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
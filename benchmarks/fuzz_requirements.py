@@ -0,0 +1,108 @@
+"""
+Fuzz/benchmark harness feeding adversarial requirement strings through the
+setup.py dependency parsing of 'get_setup_deps' (via 'parse_setup_deps',
+which is the part of it that runs after the file has been read). Reports
+the worst-case parse time per line for each parsing mode, how that time
+scales with the input length, and fails if any line exceeds the budget.
+
+Usage:
+    python benchmarks/fuzz_requirements.py [--length N] [--budget-ms MS]
+"""
+import argparse
+import random
+import sys
+import time
+
+from pipenv_devcheck.lexer import requirement_parsers
+from pipenv_devcheck.pipenv_setup_comp import parse_setup_deps
+
+
+def adversarial_inputs(length, rng):
+    """
+    Generates malformed and near-valid requirement strings of roughly
+    'length' characters, designed to maximize backtracking
+
+    Args:
+        length (int):
+            Approximate length of each generated string
+        rng (random.Random):
+            Source of randomness for the mutated inputs
+    Returns:
+        dict<str, str>: Mapping from input category to requirement string
+    """
+    inputs = {
+        "long name, dangling operator": "a" * length + ">=",
+        "long version, bad tail": "pkg>=" + "1." * (length // 2) + "$",
+        "spec chain, trailing comma": "pkg" + ">=1.0," * (length // 6),
+        "spaces before garbage": "pkg" + " " * length + "x",
+        "spaces between specs": "pkg>=1" + (" " * 20 + ",>=1") *
+                                (length // 24) + " " * 20 + "<",
+        "unterminated extras": "pkg[" + "a, " * (length // 3),
+        "unterminated parens": "pkg (" + ">=1, " * (length // 5),
+        "operator soup": "pkg" + "<>=!~" * (length // 5) + "1",
+        "valid, long chain": "pkg>=0" + "".join(
+            ",!=1.0.{}".format(i) for i in range(length // 10)),
+    }
+    alphabet = "ab1.-_<>=!~,[]() *;@"
+    for i in range(5):
+        inputs["random {}".format(i)] = "pkg" + "".join(
+            rng.choice(alphabet) for _ in range(length))
+    return inputs
+
+
+def time_parse(line, parser, repeat):
+    """
+    Times parsing a single requirement line
+
+    Returns:
+        float: The best time in seconds over 'repeat' runs
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            parse_setup_deps([line], parser)
+        except ValueError:
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--length", type=int, default=10000,
+                            help="Approximate length of each input line")
+    arg_parser.add_argument("--budget-ms", type=float, default=50.0,
+                            help="Maximum allowed parse time per line")
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="Runs per line; the fastest is reported")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    inputs = adversarial_inputs(args.length, rng)
+    scaled_inputs = adversarial_inputs(args.length * 4, rng)
+
+    over_budget = False
+    for parser in sorted(requirement_parsers):
+        worst_category, worst_seconds = None, 0.0
+        for category, line in inputs.items():
+            seconds = time_parse(line, parser, args.repeat)
+            if seconds > worst_seconds:
+                worst_category, worst_seconds = category, seconds
+        scaled_seconds = time_parse(scaled_inputs[worst_category], parser,
+                                    args.repeat)
+        over_budget |= worst_seconds * 1000 > args.budget_ms
+        print("{:<8} worst {:8.3f} ms/line ({}); 4x input -> {:.1f}x time"
+              .format(parser, worst_seconds * 1000, worst_category,
+                      scaled_seconds / worst_seconds))
+
+    if over_budget:
+        print("FAIL: parse time exceeded the budget of {} ms per line"
+              .format(args.budget_ms))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Differential fuzz/throughput harness for version compatibility. Random pairs
+of setup.py and Pipfile specifications - with every operator, wildcards,
+pre-, post- and development releases and epochs - are judged by each
+implementation (the pairwise 'check_fn_mapping' functions, the interval
+engine used by 'version_check', and 'packaging.specifiers.SpecifierSet'),
+and every verdict is compared with a brute-force oracle that tries each
+version of a sampled universe. Reports disagreements and checks per second
+for each implementation, and fails if the interval engine disagrees with the
+oracle.
+
+Usage:
+    python benchmarks/fuzz_specs.py [--pairs N] [--seed N] [--examples N]
+"""
+import argparse
+import random
+import sys
+import time
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import parse as parse_version
+
+from pipenv_devcheck.check_fns import check_fn_mapping
+from pipenv_devcheck.intervals import intersect, spec_intervals
+
+# Comparison operators, drawn with any version shape
+fuzz_ops = ["==", "!=", ">=", "<=", "<", ">", "~="]
+# Operators that also take a prefix ending in '.*'
+wildcard_ops = ["==", "!="]
+# Suffixes giving pre-, post- and development releases of a grid version
+version_suffixes = ["a1", "rc1", ".post1", ".dev1"]
+# Epoch of versions that follow every version without one
+epoch = "1!"
+
+
+def version_grid(majors=3, minors=3, micros=3):
+    """
+    Release versions that specifications are drawn from. Small, so that
+    specifications often share or straddle versions. Major versions start
+    at 1, leaving room for versions below the whole grid - nothing precedes
+    0.0.0, so '<0.0.0' could never be satisfied.
+
+    Returns:
+        list<str>: Versions such as '1.2.0', in ascending order
+    """
+    return ["{}.{}.{}".format(major, minor, micro)
+            for major in range(1, majors + 1) for minor in range(minors)
+            for micro in range(micros)]
+
+
+def version_universe(grid):
+    """
+    The versions the oracle tries, with and without the epoch: every grid
+    version and its pre-, post- and development releases, a version next to
+    each of those (e.g. 'rc2' between 'rc1' and the release, '1.2.0.5'
+    between '1.2.0' and '1.2.1'), the development release ending each
+    wildcard prefix and one version below them all, so that every region
+    the generated specifications bound is sampled
+
+    Returns:
+        list<packaging.version.Version>: The versions, in ascending order
+    """
+    versions = {"0.5"}
+    for grid_version in grid:
+        versions.update(grid_version + suffix for suffix in (
+            "", ".dev0", ".dev1", ".dev2", "a1", "a2", "rc1", "rc2",
+            ".post0", ".post1", ".post2", ".5"))
+        versions.update(_next_prefix(prefix) + ".dev0"
+                        for prefix in _prefixes(grid_version))
+    return sorted(parse_version(prefix + version) for version in versions
+                  for prefix in ("", epoch))
+
+
+def random_version(grid, rng):
+    """
+    Draws a grid version - a third of the time as a pre-, post- or
+    development release, and one time in twelve with an epoch
+
+    Returns:
+        str: The version, e.g. '1.2.0rc1' or '1!1.2.0'
+    """
+    version = rng.choice(grid)
+    shape = rng.randrange(12)
+    if shape < len(version_suffixes):
+        return version + version_suffixes[shape]
+    if shape == len(version_suffixes):
+        return epoch + version
+    return version
+
+
+def random_specs(grid, rng):
+    """
+    Generates one to three random (operator, version) specifications. One
+    in six matches a prefix of a grid version, e.g. '!=1.2.*'.
+
+    Returns:
+        list<tuple<str, str>>: The specifications
+    """
+    specs = []
+    for _ in range(rng.randint(1, 3)):
+        if rng.randrange(6) == 0:
+            prefix = rng.choice(_prefixes(rng.choice(grid)))
+            if rng.randrange(6) == 0:
+                prefix = epoch + prefix
+            specs.append((rng.choice(wildcard_ops), prefix + ".*"))
+        else:
+            specs.append((rng.choice(fuzz_ops), random_version(grid, rng)))
+    return specs
+
+
+def random_pairs(n_pairs, grid, rng):
+    """
+    Generates pairs of setup.py and Pipfile specifications for one package
+
+    Returns:
+        list<tuple<list, list>>: The pairs
+    """
+    return [(random_specs(grid, rng), random_specs(grid, rng))
+            for _ in range(n_pairs)]
+
+
+def oracle(setup_specs, pipfile_specs, universe):
+    """
+    Brute force: whether any version in the universe satisfies both sides,
+    according to SpecifierSet's reading of PEP 440
+
+    Returns:
+        bool: The verdict
+    """
+    specifiers = SpecifierSet(_render(setup_specs + pipfile_specs))
+    return any(specifiers.contains(version, prereleases=True)
+               for version in universe)
+
+
+def check_fns_compatible(setup_specs, pipfile_specs):
+    """
+    The pairwise verdict 'version_check' gave before the interval engine:
+    every setup.py specification checked against every Pipfile one with the
+    function 'check_fn_mapping' assigns to its operator. Pairs with an
+    operator or wildcard those functions do not handle count as
+    incompatible.
+
+    Returns:
+        bool: The verdict
+    """
+    specs = setup_specs + pipfile_specs
+    if any(op not in check_fn_mapping or version.endswith(".*")
+           for op, version in specs):
+        return False
+    for setup_op, setup_version in setup_specs:
+        check_fn = check_fn_mapping[setup_op]
+        left_version = parse_version(setup_version)
+        for pipfile_op, pipfile_version in pipfile_specs:
+            if not check_fn(left_op=setup_op, left_version=left_version,
+                            right_op=pipfile_op,
+                            right_version=parse_version(pipfile_version)):
+                return False
+    return True
+
+
+def intervals_compatible(setup_specs, pipfile_specs):
+    """
+    The verdict of the interval engine, as used by 'version_check'
+
+    Returns:
+        bool: The verdict
+    """
+    return bool(intersect(spec_intervals(setup_specs),
+                          spec_intervals(pipfile_specs)))
+
+
+def specifier_set_compatible(setup_specs, pipfile_specs):
+    """
+    A verdict built on SpecifierSet: the combined set is satisfiable if and
+    only if it contains one of its critical versions - each specification's
+    version, its final release, a version just above that, or one below the
+    grid. Wildcards and '~=' contribute the development releases their
+    prefix spans.
+
+    Returns:
+        bool: The verdict
+    """
+    specs = setup_specs + pipfile_specs
+    specifiers = SpecifierSet(_render(specs))
+    candidates = {"0.5", epoch + "0.5"}
+    for op, version in specs:
+        if version.endswith(".*"):
+            prefix = version[:-2]
+            candidates.add(prefix + ".dev0")
+            candidates.add(_next_prefix(prefix) + ".dev0")
+            continue
+        parsed = parse_version(version)
+        candidates.update((version, parsed.base_version,
+                           parsed.base_version + ".5"))
+        if op == "~=":
+            release = ".".join(str(part) for part in parsed.release[:-1])
+            candidates.add("{}!{}.dev0".format(parsed.epoch,
+                                               _next_prefix(release)))
+    return any(specifiers.contains(candidate, prereleases=True)
+               for candidate in candidates)
+
+
+# Implementations compared with the oracle
+implementations = {
+    "check_fns": check_fns_compatible,
+    "intervals": intervals_compatible,
+    "SpecifierSet": specifier_set_compatible,
+}
+
+
+def run_fuzz(pairs, universe):
+    """
+    Judges every pair with the oracle and each implementation
+
+    Returns:
+        dict<str, tuple<float, list>>:
+            For each implementation, its checks per second and the pairs
+            (with the oracle's verdict) it disagreed on
+    """
+    expected = [oracle(setup_specs, pipfile_specs, universe)
+                for setup_specs, pipfile_specs in pairs]
+    results = {}
+    for name, compatible in implementations.items():
+        start = time.perf_counter()
+        verdicts = [compatible(setup_specs, pipfile_specs)
+                    for setup_specs, pipfile_specs in pairs]
+        seconds = time.perf_counter() - start
+        mismatches = [(pair, verdict) for pair, verdict, actual
+                      in zip(pairs, expected, verdicts) if verdict != actual]
+        results[name] = (len(pairs) / seconds, mismatches)
+    return results
+
+
+def _prefixes(version):
+    """The major and major.minor prefixes of a grid version"""
+    parts = version.split(".")
+    return [".".join(parts[:1]), ".".join(parts[:2])]
+
+
+def _next_prefix(prefix):
+    """The prefix after another, e.g. '1.3' for '1.2', keeping any epoch"""
+    head, _, last = prefix.rpartition(".")
+    epoch_part, _, last = last.rpartition("!")
+    next_last = (epoch_part + "!" if epoch_part else "") + str(int(last) + 1)
+    return head + "." + next_last if head else next_last
+
+
+def _render(specs):
+    """Renders specifications for SpecifierSet"""
+    return ",".join(op + version for op, version in specs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--pairs", type=int, default=20000,
+                            help="Number of random specification pairs")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--examples", type=int, default=3,
+                            help="Disagreements to print per implementation")
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    grid = version_grid()
+    pairs = random_pairs(args.pairs, grid, rng)
+    results = run_fuzz(pairs, version_universe(grid))
+
+    print("{:<14}{:>14}{:>14}".format("implementation", "checks/s",
+                                      "mismatches"))
+    for name, (rate, mismatches) in results.items():
+        print("{:<14}{:>14,.0f}{:>14}".format(name, rate, len(mismatches)))
+    for name, (_, mismatches) in results.items():
+        for (setup_specs, pipfile_specs), verdict in mismatches[
+                :args.examples]:
+            print("{}: setup.py {} / Pipfile {} - oracle says {}".format(
+                name, _render(setup_specs), _render(pipfile_specs),
+                "compatible" if verdict else "incompatible"))
+
+    if results["intervals"][1]:
+        print("FAIL: the interval engine disagrees with the oracle")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
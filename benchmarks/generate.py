@@ -0,0 +1,128 @@
+"""
+Generators of synthetic setup.py and Pipfile pairs for benchmarks. The
+generated files are compatible, so every check runs to completion, and mix
+the shapes of specification seen in practice: single lower bounds, ranges
+with several specifications, '!=' chains, '~=' releases and extras.
+
+Usage:
+    python benchmarks/generate.py N_DEPS DIRECTORY
+"""
+import argparse
+import os
+import random
+
+
+def generate_requirements(n_deps, seed=0):
+    """
+    Generates matching requirements for setup.py and the Pipfile
+
+    Args:
+        n_deps (int):
+            Number of dependencies to generate
+        seed (int):
+            Seed of the generator, so that runs are reproducible
+    Returns:
+        list<tuple<str, list<str>, list<str>, str>>:
+            For each dependency, its name, its extras, its setup.py
+            specifications and the version it is pinned to in the Pipfile
+    """
+    rng = random.Random(seed)
+    requirements = []
+    for index in range(n_deps):
+        name = "package-{}".format(index)
+        major, minor = rng.randint(0, 9), rng.randint(0, 20)
+        pinned = "{}.{}.{}".format(major, minor, rng.randint(1, 9))
+        shape = index % 4
+        if shape == 0:
+            specs = [">={}.{}".format(major, minor)]
+        elif shape == 1:
+            specs = [">={}.{}".format(major, minor),
+                     "<{}.0".format(major + 1)]
+        elif shape == 2:
+            specs = [">={}.0".format(major)]
+            specs += ["!={}.{}.0".format(major, excluded)
+                      for excluded in range(minor + 1, minor + 6)]
+            specs.append("<{}".format(major + 2))
+        else:
+            specs = ["~={}.{}.0".format(major, minor)]
+        extras = (["extra{}".format(n) for n in range(rng.randint(1, 3))]
+                  if index % 5 == 0 else [])
+        requirements.append((name, extras, specs, pinned))
+    return requirements
+
+
+def render_setup(requirements):
+    """
+    Renders a setup.py file declaring the requirements
+
+    Returns:
+        str: The file's text
+    """
+    lines = ["from setuptools import setup, find_packages", "",
+             "setup(", "    name='generated',", "    version='0.0',",
+             "    packages=find_packages(),", "    install_requires=["]
+    for name, extras, specs, _ in requirements:
+        extras_str = "[{}]".format(", ".join(extras)) if extras else ""
+        lines.append("        '{}{}{}',".format(name, extras_str,
+                                               ", ".join(specs)))
+    lines += ["    ]", ")", ""]
+    return "\n".join(lines)
+
+
+def render_pipfile(requirements):
+    """
+    Renders a Pipfile pinning each requirement to a compatible version
+
+    Returns:
+        str: The file's text
+    """
+    lines = ["[[source]]", 'name = "pypi"',
+             'url = "https://pypi.org/simple"', "verify_ssl = true", "",
+             "[packages]"]
+    for name, extras, _, pinned in requirements:
+        if extras:
+            lines.append('{} = {{extras = [{}], version = "=={}"}}'.format(
+                name, ", ".join('"{}"'.format(e) for e in extras), pinned))
+        else:
+            lines.append('{} = "=={}"'.format(name, pinned))
+    lines += ["", "[requires]", 'python_version = "3.7"', ""]
+    return "\n".join(lines)
+
+
+def write_project(directory, n_deps, seed=0):
+    """
+    Writes a generated setup.py and Pipfile into a directory
+
+    Args:
+        directory (str):
+            The project directory, which must exist
+        n_deps (int):
+            Number of dependencies to generate
+        seed (int):
+            Seed of the generator
+    Returns:
+        list<tuple<str, list<str>, list<str>, str>>:
+            The generated requirements, as returned by
+            'generate_requirements'
+    """
+    requirements = generate_requirements(n_deps, seed)
+    with open(os.path.join(directory, "setup.py"), "w") as f:
+        f.write(render_setup(requirements))
+    with open(os.path.join(directory, "Pipfile"), "w") as f:
+        f.write(render_pipfile(requirements))
+    return requirements
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    parser.add_argument("n_deps", type=int)
+    parser.add_argument("directory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    os.makedirs(args.directory, exist_ok=True)
+    write_project(args.directory, args.n_deps, args.seed)
+
+
+if __name__ == "__main__":
+    main()
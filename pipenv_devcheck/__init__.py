@@ -1,6 +1,23 @@
-from .pipenv_setup_comp import compare_deps
 from ._version import (__title__, __description__, __url__, __version__,
                        __author__, __author_email__, __license__)
 
-__all__ = ["compare_deps", "__title__", "__description__", "__url__",
-           "__version__", "__author__", "__author_email__", "__license__"]
+__all__ = ["compare_deps", "compare_deps_batch", "check_report",
+           "compare_groups",
+           "__title__", "__description__", "__url__", "__version__",
+           "__author__", "__author_email__", "__license__"]
+
+
+def __getattr__(name):
+    # The comparison functions are imported on first use, so that importing
+    # the package (e.g. to consult the result cache) stays cheap
+    if name in ("compare_deps", "compare_deps_batch"):
+        from . import pipenv_setup_comp
+        return getattr(pipenv_setup_comp, name)
+    if name == "check_report":
+        from . import report
+        return report.check_report
+    if name == "compare_groups":
+        from . import groups
+        return groups.compare_groups
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
@@ -1,8 +1,392 @@
-from pipenv_devcheck import compare_deps
+import argparse
+import sys
 
 
-def main():
-    compare_deps()
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pipenv-devcheck",
+        description="Checks that the dependencies in setup.py and the "
+                    "Pipfile are compatible")
+    parser.add_argument(
+        "--project-root", default=None,
+        help="Directory containing the dependency files "
+             "(defaults to the current directory)")
+    parser.add_argument(
+        "--setup-path", default=None,
+        help="Path of the setup.py, setup.cfg or pyproject.toml file "
+             "declaring the package's dependencies (defaults to the first "
+             "of these in the project root that declares any)")
+    parser.add_argument(
+        "--pipfile-path", default=None,
+        help="Path of the Pipfile (defaults to Pipfile in the project root)")
+    parser.add_argument(
+        "--parser", choices=["regex", "linear"], default=None,
+        help="Requirement parsing mode for setup.py (defaults to 'regex'). "
+             "'linear' uses a state machine whose running time is linear in "
+             "the input length.")
+    parser.add_argument(
+        "--dynamic-setup", action="store_true",
+        help="Run setup.py in a subprocess when its dependencies are "
+             "computed rather than written as literals. This executes the "
+             "project's code with your permissions - only use it on "
+             "projects you trust.")
+    parser.add_argument(
+        "--lock", action="store_true",
+        help="Also check that Pipfile.lock is up to date and that its pinned "
+             "versions satisfy setup.py (only with the default comparison "
+             "of a single project)")
+    parser.add_argument(
+        "--installed", action="store_true",
+        help="Instead of comparing setup.py with the Pipfile, check that the "
+             "distributions installed in the running environment satisfy "
+             "setup.py")
+    parser.add_argument(
+        "--transitive", action="store_true",
+        help="Instead of comparing setup.py with the Pipfile, check that the "
+             "ranges in setup.py are consistent with the requirements of the "
+             "installed distributions they lead to, walking their metadata "
+             "without using the network")
+    parser.add_argument(
+        "--site-packages", nargs="+", metavar="DIR", default=None,
+        help="Directories to look for installed distributions in with "
+             "--installed or --transitive (defaults to those on the Python "
+             "path)")
+    parser.add_argument(
+        "--projects", nargs="+", metavar="ROOT",
+        help="Check every given project root in a single invocation, "
+             "reporting one result per project")
+    parser.add_argument(
+        "--history", metavar="RANGE",
+        help="Check every commit in a git revision range (e.g. v1.0..HEAD) "
+             "of the repository at the project root, reading the dependency "
+             "files from git without checking commits out. --setup-path and "
+             "--pipfile-path are then paths within the repository.")
+    parser.add_argument(
+        "--staged", action="store_true",
+        help="Only check if git reports setup.py or the Pipfile as staged "
+             "for commit, reusing the cached parse of an unchanged file")
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="Like --staged, but considering changes in the working tree "
+             "since the git revision REF")
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="Number of worker processes used with --projects or --history "
+             "(defaults to the number of CPUs)")
+    parser.add_argument(
+        "--json", action="store_true",
+        help="Run every check and print all findings as a JSON report "
+             "instead of stopping at the first failing check. The exit "
+             "status is 1 if the report has any findings.")
+    parser.add_argument(
+        "--groups", action="store_true",
+        help="Compare install_requires with [packages] and each extra with "
+             "the Pipfile section of the same name, or [dev-packages], "
+             "reporting every finding per section. The exit status is 1 if "
+             "any section has findings.")
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="Print the wall time, number of dependencies and peak memory "
+             "of each phase, and the hit rates of the version caches, to "
+             "stderr. Implies --no-cache.")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Keep running, checking again whenever setup.py or the Pipfile "
+             "changes")
+    parser.add_argument(
+        "--poll-interval", type=float, default=None,
+        help="Seconds between checks with --watch when file change "
+             "notifications are unavailable")
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="Run a daemon that checks projects for pipenv-devcheck-client, "
+             "keeping the checks loaded between requests")
+    parser.add_argument(
+        "--socket", default=None,
+        help="Path of the Unix socket used with --serve")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Always parse and check the dependency files, bypassing the "
+             "result cache (including evaluations of a dynamic setup.py)")
+    parser.add_argument(
+        "--clear-cache", action="store_true",
+        help="Remove all cached results before running")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    index_parser = commands.add_parser(
+        "index", help="Store the dependencies of projects in the index")
+    index_parser.add_argument("roots", nargs="+", metavar="ROOT",
+                              help="Project roots to index")
+    query_parser = commands.add_parser(
+        "query", help="Answer questions from the index")
+    query_parser.add_argument(
+        "question", choices=["allows", "conflicts"],
+        help="'allows REQUIREMENT' lists the projects allowing a version "
+             "matching REQUIREMENT, e.g. 'pandas<1.0'. 'conflicts PACKAGE' "
+             "lists projects whose specifications for PACKAGE cannot be "
+             "satisfied together.")
+    query_parser.add_argument("subject",
+                              metavar="REQUIREMENT or PACKAGE")
+    query_parser.add_argument(
+        "--source", choices=["setup", "pipfile"], default="setup",
+        help="Which file's specifications 'allows' consults")
+    for command_parser in (index_parser, query_parser):
+        command_parser.add_argument(
+            "--db", default=None,
+            help="Path of the index database (defaults to "
+                 "$PIPENV_DEVCHECK_INDEX, or pipenv-devcheck/index.sqlite3 "
+                 "in the user's data directory)")
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+    args.parser = args.parser or "regex"
+
+    if args.clear_cache:
+        from pipenv_devcheck.cache import clear_cache
+        clear_cache()
+
+    if args.command == "index":
+        from pipenv_devcheck.index import index_projects
+        summary = index_projects(args.roots, args.db, args.parser)
+        print("Indexed {} projects, {} unchanged, {} failed".format(*summary))
+        return
+
+    if args.command == "query":
+        _query_index(args)
+        return
+
+    if args.serve:
+        from pipenv_devcheck.daemon import serve
+        serve(args.socket)
+        return
+
+    if args.projects:
+        from pipenv_devcheck import compare_deps_batch
+        results = compare_deps_batch(args.projects, processes=args.jobs,
+                                     use_cache=not args.no_cache,
+                                     dynamic_setup=args.dynamic_setup,
+                                     parser=args.parser)
+        for result in results:
+            if result.passed:
+                print("PASS {}".format(result.project))
+            else:
+                print("FAIL {}\n    {}".format(result.project, result.error))
+        if not all(result.passed for result in results):
+            sys.exit(1)
+        return
+
+    if args.history:
+        from pipenv_devcheck.history import check_history
+        results = check_history(args.history, repo=args.project_root,
+                                setup_path=args.setup_path or "setup.py",
+                                pipfile_path=args.pipfile_path or "Pipfile",
+                                processes=args.jobs, parser=args.parser)
+        for result in results:
+            print("{} {} {}".format("PASS" if result.passed else "FAIL",
+                                    result.commit[:12], result.subject))
+            if not result.passed:
+                print("    {}".format(result.error))
+        if not all(result.passed for result in results):
+            sys.exit(1)
+        return
+
+    if args.watch:
+        from pipenv_devcheck.watch import DEFAULT_INTERVAL, watch
+        watch(setup_path=args.setup_path,
+              pipfile_path=args.pipfile_path,
+              project_root=args.project_root,
+              parser=args.parser,
+              dynamic_setup=args.dynamic_setup,
+              interval=args.poll_interval or DEFAULT_INTERVAL,
+              use_cache=not args.no_cache)
+        return
+
+    stop_timings = None
+    if args.timings:
+        from pipenv_devcheck.phases import format_timings, record_timings
+        timings, stop_timings = record_timings()
+        # Cache hits skip every phase, so measuring requires a full check
+        args.no_cache = True
+    try:
+        _check_project(args)
+    finally:
+        if stop_timings is not None:
+            stop_timings()
+            from pipenv_devcheck.version_cache import (
+                cache_stats, format_cache_stats)
+            print(format_timings(timings), file=sys.stderr)
+            print(format_cache_stats(cache_stats()), file=sys.stderr)
+
+
+def _check_args(parser, args):
+    """
+    Rejects arguments that would have no effect: several modes at once, or
+    an option that the selected mode does not use
+    """
+    environment = " and ".join(flag for flag, value in (
+        ("--installed", args.installed), ("--transitive", args.transitive))
+        if value)
+    # The selected modes and the flags selecting them. 'check' is the
+    # default comparison of a single project, which --lock extends.
+    modes = [(mode, flag) for mode, flag, value in (
+        ("check", "--lock", args.lock),
+        (args.command, "the {} command".format(args.command), args.command),
+        ("serve", "--serve", args.serve),
+        ("projects", "--projects", args.projects),
+        ("history", "--history", args.history),
+        ("watch", "--watch", args.watch),
+        ("changes", "--staged", args.staged),
+        ("changes", "--changed-since", args.changed_since),
+        ("environment", environment, environment),
+        ("groups", "--groups", args.groups),
+        ("json", "--json", args.json))
+        if value]
+    if len(modes) > 1:
+        parser.error("{} cannot be combined with {}".format(
+            modes[0][1], ", ".join(flag for _, flag in modes[1:])))
+    mode, mode_flag = modes[0] if modes else ("check", None)
+
+    # The modes using each option that only some modes use
+    single_project = {"check", "changes", "environment", "groups", "json"}
+    option_modes = {
+        "--project-root": single_project | {"history", "watch"},
+        "--setup-path": single_project | {"history", "watch"},
+        "--pipfile-path": (single_project - {"environment"} |
+                           {"history", "watch"}),
+        "--parser": single_project | {"index", "projects", "history",
+                                      "watch"},
+        "--dynamic-setup": single_project | {"projects", "watch"},
+        "--no-cache": single_project | {"projects", "watch"},
+        "--timings": single_project,
+        "--site-packages": {"environment"},
+        "--jobs": {"projects", "history"},
+        "--poll-interval": {"watch"},
+        "--socket": {"serve"},
+    }
+    required_flags = {"environment": "--installed or --transitive",
+                      "projects": "--projects", "history": "--history",
+                      "watch": "--watch", "serve": "--serve"}
+    for option, used_by in option_modes.items():
+        value = getattr(args, option[2:].replace("-", "_"))
+        if value is None or value is False or mode in used_by:
+            continue
+        if mode != "check":
+            parser.error("{} cannot be combined with {}".format(
+                option, mode_flag))
+        parser.error("{} requires {}".format(option, " or ".join(
+            required_flags[used] for used in sorted(used_by))))
+
+
+def _query_index(args):
+    """Answers a question from the dependency index"""
+    from pipenv_devcheck.index import find_conflicts, projects_allowing
+    from pipenv_devcheck.report import format_specs
+
+    if args.question == "allows":
+        for project_spec in projects_allowing(args.subject, args.db,
+                                              args.source):
+            print("{} {}".format(project_spec.project,
+                                 format_specs(project_spec.specs)))
+        return
+    for conflict in find_conflicts(args.subject, args.db):
+        print("{} ({}: {}) conflicts with {} ({}: {})".format(
+            conflict.left.project, conflict.left.source,
+            format_specs(conflict.left.specs), conflict.right.project,
+            conflict.right.source, format_specs(conflict.right.specs)))
+
+
+def _check_groups(args):
+    """Compares each setup.py group with its Pipfile section"""
+    from pipenv_devcheck.groups import compare_groups
+    from pipenv_devcheck.report import format_extras
+
+    results = compare_groups(setup_path=args.setup_path,
+                             pipfile_path=args.pipfile_path,
+                             project_root=args.project_root,
+                             parser=args.parser,
+                             dynamic_setup=args.dynamic_setup,
+                             use_cache=not args.no_cache)
+    for result in results:
+        print("{} [{}] ({})".format("FAIL" if result.findings else "PASS",
+                                    result.section,
+                                    ", ".join(result.groups)))
+        for finding in result.findings:
+            print("    {} {}: setup.py {}, Pipfile {}".format(
+                finding.check, finding.package, finding.setup_spec,
+                finding.pipfile_spec))
+    if any(result.findings for result in results):
+        sys.exit(1)
+
+
+def _check_project(args):
+    """Checks the project described by the command-line arguments"""
+    if args.staged or args.changed_since:
+        from pipenv_devcheck.changes import check_changes
+        check_changes(setup_path=args.setup_path,
+                      pipfile_path=args.pipfile_path,
+                      project_root=args.project_root,
+                      base_ref=args.changed_since,
+                      parser=args.parser,
+                      dynamic_setup=args.dynamic_setup,
+                      use_cache=not args.no_cache)
+        return
+
+    if args.installed or args.transitive:
+        if args.installed:
+            from pipenv_devcheck.environment import check_installed
+            check_installed(setup_path=args.setup_path,
+                            project_root=args.project_root,
+                            parser=args.parser,
+                            dynamic_setup=args.dynamic_setup,
+                            paths=args.site_packages,
+                            use_cache=not args.no_cache)
+        if args.transitive:
+            from pipenv_devcheck.transitive import check_transitive
+            check_transitive(setup_path=args.setup_path,
+                             project_root=args.project_root,
+                             parser=args.parser,
+                             dynamic_setup=args.dynamic_setup,
+                             paths=args.site_packages,
+                             use_cache=not args.no_cache)
+        return
+
+    if args.groups:
+        _check_groups(args)
+        return
+
+    if args.json:
+        from pipenv_devcheck.report import check_report
+        report = check_report(setup_path=args.setup_path,
+                              pipfile_path=args.pipfile_path,
+                              project_root=args.project_root,
+                              parser=args.parser,
+                              dynamic_setup=args.dynamic_setup,
+                              use_cache=not args.no_cache)
+        print(report.to_json(indent=2))
+        sys.exit(report.exit_code)
+
+    if args.no_cache:
+        from pipenv_devcheck import compare_deps
+        compare_deps(setup_path=args.setup_path,
+                     pipfile_path=args.pipfile_path,
+                     project_root=args.project_root,
+                     parser=args.parser,
+                     dynamic_setup=args.dynamic_setup,
+                     use_cache=False)
+    else:
+        from pipenv_devcheck.cache import cached_compare_deps
+        cached_compare_deps(setup_path=args.setup_path,
+                            pipfile_path=args.pipfile_path,
+                            project_root=args.project_root,
+                            parser=args.parser,
+                            dynamic_setup=args.dynamic_setup)
+
+    if args.lock:
+        from pipenv_devcheck.lockfile import check_lock
+        check_lock(setup_path=args.setup_path,
+                   pipfile_path=args.pipfile_path,
+                   project_root=args.project_root,
+                   parser=args.parser,
+                   dynamic_setup=args.dynamic_setup,
+                   use_cache=not args.no_cache)
 
 
 if __name__ == "__main__":
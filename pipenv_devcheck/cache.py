@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+
+from pipenv_devcheck._version import __version__
+from pipenv_devcheck.paths import resolve_paths
+
+# Environment variable that overrides the default cache directory
+CACHE_DIR_ENV = "PIPENV_DEVCHECK_CACHE_DIR"
+# Upper bound on the total size of the cache directory, in bytes
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+# Exception types raised by the checks whose verdicts are cached
+_cached_error_types = {"ValueError": ValueError, "KeyError": KeyError}
+
+
+def default_cache_dir():
+    """
+    Returns the directory the result cache is stored in
+
+    Returns:
+        str: The cache directory, which may not exist yet
+    """
+    if os.getenv(CACHE_DIR_ENV):
+        return os.getenv(CACHE_DIR_ENV)
+    cache_home = (os.getenv("XDG_CACHE_HOME") or
+                  os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "pipenv-devcheck")
+
+
+def cache_key(*contents):
+    """
+    Computes the cache key for a set of dependency files
+
+    Args:
+        *contents (bytes):
+            The raw contents of each dependency file
+    Returns:
+        str: A hex digest of the file contents and the tool version
+    """
+    digest = hashlib.sha256(__version__.encode("utf-8"))
+    for content in contents:
+        digest.update(b"\0" + str(len(content)).encode("ascii") + b"\0")
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def load_entry(key, cache_dir=None):
+    """
+    Loads a cache entry, marking it as recently used
+
+    Args:
+        key (str):
+            The cache key of the entry
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+    Returns:
+        dict: The cached entry, or None on a cache miss
+    """
+    entry_path = _entry_path(key, cache_dir)
+    try:
+        with open(entry_path, "r") as f:
+            entry = json.load(f)
+        os.utime(entry_path)
+    except (OSError, ValueError):
+        return None
+    return entry
+
+
+def store_entry(key, entry, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Stores a cache entry, evicting the least recently used entries if the
+    cache grows beyond 'max_bytes'. Failures to write are ignored, since the
+    cache is only an optimization.
+
+    Args:
+        key (str):
+            The cache key of the entry
+        entry (dict):
+            JSON-serializable data to store
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+        max_bytes (int):
+            Upper bound on the total size of the cache directory
+    """
+    import threading
+
+    cache_dir = cache_dir or default_cache_dir()
+    entry_path = _entry_path(key, cache_dir)
+    # Unique per thread, so that concurrent writers never share a file
+    tmp_path = "{}.{}.{}.tmp".format(entry_path, os.getpid(),
+                                     threading.get_ident())
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp_path, entry_path)
+        evict(cache_dir, max_bytes)
+    except OSError:
+        pass
+
+
+def evict(cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Removes the least recently used entries until the cache directory is no
+    larger than 'max_bytes'
+
+    Args:
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+        max_bytes (int):
+            Upper bound on the total size of the cache directory
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    entries = []
+    for dir_entry in os.scandir(cache_dir):
+        if dir_entry.name.endswith(".json"):
+            stat = dir_entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_bytes -= size
+
+
+def clear_cache(cache_dir=None):
+    """
+    Removes every entry from the cache
+
+    Args:
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+    """
+    import shutil
+
+    shutil.rmtree(cache_dir or default_cache_dir(), ignore_errors=True)
+
+
+def cached_compare_deps(setup_path=None, pipfile_path=None,
+                        project_root=None, parser="regex",
+                        dynamic_setup=False, cache_dir=None,
+                        max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Equivalent of 'compare_deps' that reuses the parsed dependencies and the
+    check verdict from a previous run when neither dependency file has
+    changed. On a cache hit the parsing modules are never imported.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        pipfile_path (str):
+            Path of the Pipfile to read
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode used on a cache miss
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically. The requirements files
+            beside setup.py then also form part of the cache key.
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+        max_bytes (int):
+            Upper bound on the total size of the cache directory
+    Returns:
+        tuple<dict<str, list<tuple<str, str>>>:
+            Dictionaries of the dependencies found in setup.py and the Pipfile
+    Raises:
+        ValueError, KeyError:
+            If any of the checks fail, as with 'compare_deps'
+    """
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    with open(pipfile_path, "rb") as f:
+        pipfile_content = f.read()
+    key = cache_key(b"compare", pipfile_content,
+                    *setup_key_contents(setup_path, parser, dynamic_setup))
+
+    entry = load_entry(key, cache_dir)
+    if entry is None or (entry["error"] is not None and
+                         entry["error"]["type"] not in _cached_error_types):
+        # Entries with an error type this version cannot raise are recomputed
+        entry = _run_uncached(setup_path, pipfile_path, parser,
+                              dynamic_setup)
+        store_entry(key, entry, cache_dir, max_bytes)
+
+    error = entry["error"]
+    if error is not None:
+        raise _cached_error_types[error["type"]](error["message"])
+    return (_restore_specs(entry["setup_deps"]),
+            _restore_specs(entry["pipfile_deps"]))
+
+
+def cached_setup_deps(setup_path, parser="regex", dynamic_setup=False,
+                      cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Equivalent of 'get_setup_deps' that reuses the parse of a previous run
+    when the file has not changed
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        parser (str):
+            Requirement parsing mode used on a cache miss
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+        max_bytes (int):
+            Upper bound on the total size of the cache directory
+    Returns:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        setup_extras (dict<str, list<str>>):
+            Dictionary of extras specified in setup.py
+    """
+    contents = setup_key_contents(setup_path, parser, dynamic_setup)
+    key = cache_key(b"setup-parse", *contents)
+
+    entry = load_entry(key, cache_dir)
+    if entry is None:
+        from pipenv_devcheck.pipenv_setup_comp import get_setup_deps
+
+        text = None if dynamic_setup else contents[-1].decode("utf-8")
+        setup_deps, setup_extras = get_setup_deps(setup_path, parser,
+                                                  dynamic_setup, text)
+        entry = {"deps": setup_deps, "extras": setup_extras}
+        store_entry(key, entry, cache_dir, max_bytes)
+    return _restore_specs(entry["deps"]), entry["extras"]
+
+
+def cached_pipfile_deps(pipfile_path, cache_dir=None,
+                        max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Equivalent of 'get_pipfile_deps' that reuses the parse of a previous
+    run when the file has not changed
+
+    Args:
+        pipfile_path (str):
+            Path of the Pipfile to read
+        cache_dir (str):
+            The cache directory. Defaults to 'default_cache_dir()'.
+        max_bytes (int):
+            Upper bound on the total size of the cache directory
+    Returns:
+        pipfile_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in the Pipfile
+        pipfile_extras (dict<str, list<str>>):
+            Dictionary of extras specified in the Pipfile
+    """
+    with open(pipfile_path, "rb") as f:
+        content = f.read()
+    key = cache_key(b"pipfile-parse", content)
+
+    entry = load_entry(key, cache_dir)
+    if entry is None:
+        from pipenv_devcheck.pipenv_setup_comp import get_pipfile_deps
+
+        pipfile_deps, pipfile_extras = get_pipfile_deps(
+            pipfile_path, content.decode("utf-8"))
+        entry = {"deps": pipfile_deps, "extras": pipfile_extras}
+        store_entry(key, entry, cache_dir, max_bytes)
+    return _restore_specs(entry["deps"]), entry["extras"]
+
+
+def setup_key_contents(setup_path, parser="regex", dynamic_setup=False):
+    """
+    Gathers what a cached result derived from a setup file depends on: the
+    options it is read with (the parser, whether setup.py may be evaluated
+    and the file name, which selects the reader) and the file's contents -
+    or, when it may be evaluated, every input of the evaluation
+
+    Args:
+        setup_path (str):
+            Path of the setup file
+        parser (str):
+            Requirement parsing mode
+        dynamic_setup (bool):
+            Whether setup.py may be evaluated in a subprocess
+    Returns:
+        list<bytes>:
+            Contents to pass to 'cache_key'. Without 'dynamic_setup', the
+            last item is the file's contents.
+    """
+    options = [parser.encode("utf-8"),
+               os.path.basename(setup_path).encode("utf-8")]
+    if dynamic_setup:
+        from pipenv_devcheck.dynamic_setup import setup_inputs
+        return options + [b"dynamic-setup"] + setup_inputs(setup_path)
+    with open(setup_path, "rb") as f:
+        return options + [b"static", f.read()]
+
+
+def _run_uncached(setup_path, pipfile_path, parser, dynamic_setup):
+    """
+    Parses both dependency files and runs all checks, producing a cache
+    entry. Only failures of the checks themselves are recorded - errors
+    reading or parsing the files propagate.
+    """
+    from pipenv_devcheck.pipenv_setup_comp import (
+        get_setup_deps, get_pipfile_deps, run_checks)
+
+    setup_deps, setup_extras = get_setup_deps(setup_path, parser,
+                                              dynamic_setup)
+    pipfile_deps, pipfile_extras = get_pipfile_deps(pipfile_path)
+    error = None
+    try:
+        run_checks(setup_deps, setup_extras, pipfile_deps, pipfile_extras)
+    except tuple(_cached_error_types.values()) as e:
+        # Subclasses such as InvalidVersion are recorded as their base type
+        error_type = next(name for name, base in _cached_error_types.items()
+                          if isinstance(e, base))
+        error = {"type": error_type, "message": e.args[0]}
+    return {"setup_deps": setup_deps, "pipfile_deps": pipfile_deps,
+            "error": error}
+
+
+def _restore_specs(deps):
+    """Converts JSON lists back into the (operator, version) tuples"""
+    return {dep: [tuple(spec) if isinstance(spec, list) else spec
+                  for spec in specs]
+            for dep, specs in deps.items()}
+
+
+def _entry_path(key, cache_dir):
+    """Path of the file holding the entry for 'key'"""
+    return os.path.join(cache_dir or default_cache_dir(), key + ".json")
@@ -0,0 +1,94 @@
+import os
+
+from pipenv_devcheck.git import run_git
+from pipenv_devcheck.paths import resolve_paths
+
+
+def changed_paths(repo, base_ref=None):
+    """
+    Lists the files git reports as changed, relative to 'repo'. Only changes
+    inside 'repo' are listed, so it may be a subdirectory of a repository.
+
+    Args:
+        repo (str):
+            Directory inside the git repository
+        base_ref (str):
+            Revision to compare the working tree with. By default the
+            staged changes are listed instead.
+    Returns:
+        set<str>: Normalized paths of the changed files
+    Raises:
+        ValueError: If git fails
+    """
+    args = ["diff", "--name-only", "--relative", "-z"]
+    args += [base_ref, "--"] if base_ref else ["--cached"]
+    output = run_git(args, repo)
+    return {os.path.normpath(path)
+            for path in output.decode("utf-8", "replace").split("\0")
+            if path}
+
+
+def check_changes(setup_path=None, pipfile_path=None, project_root=None,
+                  base_ref=None, parser="regex", dynamic_setup=False,
+                  cache_dir=None, use_cache=True):
+    """
+    Equivalent of 'compare_deps' for pre-commit hooks, which skips the
+    check entirely unless git reports setup.py or the Pipfile as changed.
+    Each file's parse is cached by its contents, so when only one of them
+    changed the other's parse from a previous run is reused.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        pipfile_path (str):
+            Path of the Pipfile to read
+        project_root (str):
+            Directory containing the dependency files, inside a git
+            repository
+        base_ref (str):
+            Revision to compare the working tree with. By default the
+            staged changes are considered.
+        parser (str):
+            Requirement parsing mode for setup.py
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        cache_dir (str):
+            The cache directory. Defaults to 'cache.default_cache_dir()'.
+        use_cache (bool):
+            Whether to consult and update the cache of parsed files
+    Returns:
+        list<str>:
+            The dependency files that changed - empty if the check was
+            skipped
+    Raises:
+        ValueError, KeyError:
+            If any of the checks fail, as with 'compare_deps'
+    """
+    from pipenv_devcheck.cache import cached_pipfile_deps, cached_setup_deps
+
+    repo = project_root or "."
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    changed = changed_paths(repo, base_ref)
+    changed_deps_files = [path for path in (setup_path, pipfile_path)
+                          if os.path.normpath(os.path.relpath(path, repo))
+                          in changed]
+    if not changed_deps_files:
+        return []
+
+    from pipenv_devcheck.pipenv_setup_comp import (
+        get_pipfile_deps, get_setup_deps, run_checks)
+
+    if use_cache:
+        setup_deps, setup_extras = cached_setup_deps(setup_path, parser,
+                                                     dynamic_setup, cache_dir)
+        pipfile_deps, pipfile_extras = cached_pipfile_deps(pipfile_path,
+                                                           cache_dir)
+    else:
+        setup_deps, setup_extras = get_setup_deps(setup_path, parser,
+                                                  dynamic_setup,
+                                                  use_cache=False)
+        pipfile_deps, pipfile_extras = get_pipfile_deps(pipfile_path)
+    run_checks(setup_deps, setup_extras, pipfile_deps, pipfile_extras)
+    return changed_deps_files
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Environment variable that overrides the default daemon socket path
+SOCKET_ENV = "PIPENV_DEVCHECK_SOCKET"
+
+
+def default_socket_path():
+    """
+    Returns the path of the Unix socket the daemon listens on. It lives in
+    the user's runtime directory rather than the cache directory, so that
+    clearing the cache leaves a running daemon reachable.
+
+    Returns:
+        str:
+            The socket path: in '$XDG_RUNTIME_DIR' where set, and otherwise
+            in a directory of the system's temporary directory private to
+            the user
+    """
+    if os.getenv(SOCKET_ENV):
+        return os.getenv(SOCKET_ENV)
+    if os.getenv("XDG_RUNTIME_DIR"):
+        return os.path.join(os.getenv("XDG_RUNTIME_DIR"),
+                            "pipenv-devcheck.sock")
+    import tempfile
+    return os.path.join(tempfile.gettempdir(),
+                        "pipenv-devcheck-{}".format(os.getuid()),
+                        "daemon.sock")
+
+
+def request_check(project_root, socket_path=None, **options):
+    """
+    Asks a running daemon to check a project
+
+    Args:
+        project_root (str):
+            Directory containing the dependency files. Relative paths are
+            resolved against the current directory before being sent.
+        socket_path (str):
+            The daemon's socket. Defaults to 'default_socket_path()'.
+        **options:
+            Further request fields: 'setup_path', 'pipfile_path', 'parser',
+            'dynamic_setup' and 'use_cache'
+    Returns:
+        dict:
+            The daemon's response, with 'passed' (bool) and 'error' (str or
+            None)
+    Raises:
+        OSError:
+            If no daemon is listening on the socket
+    """
+    request = dict(options, project_root=os.path.abspath(project_root))
+    for path_field in ("setup_path", "pipfile_path"):
+        if request.get(path_field):
+            request[path_field] = os.path.abspath(request[path_field])
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            response = f.readline()
+    if not response:
+        raise ConnectionError("The daemon closed the connection")
+    return json.loads(response)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pipenv-devcheck-client",
+        description="Checks projects using a running pipenv-devcheck daemon "
+                    "(started with 'pipenv-devcheck --serve'), checking "
+                    "in-process if none is running")
+    parser.add_argument(
+        "projects", nargs="*", default=["."], metavar="ROOT",
+        help="Project roots to check (defaults to the current directory)")
+    parser.add_argument(
+        "--socket", default=None,
+        help="Path of the daemon's socket")
+    parser.add_argument(
+        "--dynamic-setup", action="store_true",
+        help="Run setup.py in a subprocess when its dependencies are "
+             "computed rather than written as literals. This executes the "
+             "project's code with your permissions - only use it on "
+             "projects you trust.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for project in args.projects:
+        try:
+            response = request_check(project, args.socket,
+                                     dynamic_setup=args.dynamic_setup)
+        except OSError:
+            response = _check_in_process(project, args.dynamic_setup)
+        if response["passed"]:
+            print("PASS {}".format(project))
+        else:
+            failed = True
+            print("FAIL {}\n    {}".format(project, response["error"]))
+    if failed:
+        sys.exit(1)
+
+
+def _check_in_process(project_root, dynamic_setup):
+    """Checks a project without the daemon, producing a response"""
+    from pipenv_devcheck.pipenv_setup_comp import check_project
+
+    result = check_project(project_root, use_cache=True,
+                           dynamic_setup=dynamic_setup)
+    return {"passed": result.passed, "error": result.error}
+
+
+if __name__ == "__main__":
+    main()
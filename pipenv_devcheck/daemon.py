@@ -0,0 +1,150 @@
+import json
+import os
+import socket
+import socketserver
+
+from pipenv_devcheck.client import default_socket_path
+
+# Request fields passed on to 'cached_compare_deps' or 'compare_deps'
+_request_fields = ("setup_path", "pipfile_path", "project_root", "parser",
+                   "dynamic_setup")
+
+
+def serve(socket_path=None):
+    """
+    Runs a daemon that checks projects on request until interrupted or
+    terminated. The modules used by the checks are imported once at startup,
+    so each request only pays for reading and, on a cache miss, parsing the
+    dependency files.
+
+    Each connection carries a single request: a line of JSON with a
+    'project_root' and optionally 'setup_path', 'pipfile_path', 'parser',
+    'dynamic_setup' and 'use_cache'. The response is a line of JSON with
+    'passed' (bool) and 'error' (str or None). Connections are handled in
+    concurrent threads.
+
+    Args:
+        socket_path (str):
+            Path of the Unix socket to listen on. Defaults to
+            'client.default_socket_path()'.
+    Raises:
+        OSError:
+            If another daemon is already listening on the socket
+    """
+    import signal
+    import sys
+
+    socket_path = socket_path or default_socket_path()
+    server = make_server(socket_path)
+    # Stop cleanly, removing the socket, when asked to terminate
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        _remove_socket(socket_path)
+
+
+def make_server(socket_path):
+    """
+    Creates the daemon's server, warming up the checks and replacing a
+    socket left behind by a daemon that is no longer running
+
+    Args:
+        socket_path (str):
+            Path of the Unix socket to listen on
+    Returns:
+        socketserver.ThreadingUnixStreamServer: The bound server
+    Raises:
+        OSError:
+            If another daemon is already listening on the socket
+    """
+    # Import everything a check may need before serving any request
+    import packaging.version  # noqa: F401
+    import pipenv_devcheck.cache  # noqa: F401
+    import pipenv_devcheck.intervals  # noqa: F401
+    import pipenv_devcheck.lexer  # noqa: F401
+    import pipenv_devcheck.pipenv_setup_comp  # noqa: F401
+    import pipenv_devcheck.readers  # noqa: F401
+    import pipenv_devcheck.setup_locator  # noqa: F401
+    import pipenv_devcheck.version_cache  # noqa: F401
+    pipenv_devcheck.readers.load_toml("")
+
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            raise OSError("A daemon is already listening on {}"
+                          .format(socket_path))
+        _remove_socket(socket_path)
+    # Only the user may connect when the directory is created here
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o700,
+                exist_ok=True)
+    server = socketserver.ThreadingUnixStreamServer(socket_path,
+                                                    _RequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def handle_request(request):
+    """
+    Checks the project described by a request
+
+    Args:
+        request (dict):
+            The decoded request
+    Returns:
+        dict: The response, with 'passed' (bool) and 'error' (str or None)
+    """
+    from pipenv_devcheck.cache import cached_compare_deps
+    from pipenv_devcheck.pipenv_setup_comp import compare_deps
+
+    kwargs = {field: request[field] for field in _request_fields
+              if request.get(field) is not None}
+    try:
+        if request.get("use_cache", True):
+            cached_compare_deps(**kwargs)
+        else:
+            compare_deps(use_cache=False, **kwargs)
+    except Exception as e:
+        return {"passed": False,
+                "error": "{}: {}".format(type(e).__name__, e)}
+    return {"passed": True, "error": None}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one request from a connection and writes its response"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # The client closed the connection without sending a request
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Requests must be JSON objects")
+        except ValueError as e:
+            response = {"passed": False,
+                        "error": "Invalid request: {}".format(e)}
+        else:
+            response = handle_request(request)
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def _is_listening(socket_path):
+    """Whether a server accepts connections on a Unix socket"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def _remove_socket(socket_path):
+    """Removes a socket file, if it exists"""
+    try:
+        os.remove(socket_path)
+    except FileNotFoundError:
+        pass
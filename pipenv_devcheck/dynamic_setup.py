@@ -0,0 +1,170 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from pipenv_devcheck.cache import cache_key, load_entry, store_entry
+
+# Default number of seconds a setup.py file may take to call setup()
+DEFAULT_TIMEOUT = 30
+# Largest file, in bytes, the evaluation may write
+MAX_FILE_BYTES = 16 * 1024 * 1024
+
+# Script run in the subprocess. It limits its own resources, since limits
+# set between fork and exec are unsafe in a threaded parent, then replaces
+# setup() with a function that records its keyword arguments and exits
+# before anything is built.
+_runner = r"""
+import json
+import os
+import sys
+
+setup_path, output_path = sys.argv[1], sys.argv[2]
+
+# Limit the resources of this process before running any of setup.py
+try:
+    import resource
+except ImportError:
+    pass
+else:
+    for limit_name, value in ((resource.RLIMIT_CPU, int(sys.argv[3])),
+                              (resource.RLIMIT_FSIZE, int(sys.argv[4])),
+                              (resource.RLIMIT_CORE, 0)):
+        _, hard = resource.getrlimit(limit_name)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(limit_name, (value, value))
+
+
+def _as_list(value):
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines()
+                if line.strip() and not line.strip().startswith("#")]
+    return [str(item) for item in value or []]
+
+
+def _capture_setup(*_, **kwargs):
+    captured = {
+        "install_requires": _as_list(kwargs.get("install_requires")),
+        "extras_require": {str(extra): _as_list(deps) for extra, deps
+                           in (kwargs.get("extras_require") or {}).items()},
+    }
+    with open(output_path, "w") as f:
+        json.dump(captured, f)
+    raise SystemExit(0)
+
+
+try:
+    import setuptools
+except ImportError:
+    import types
+    setuptools = types.ModuleType("setuptools")
+    setuptools.find_packages = lambda *_, **__: []
+    setuptools.Command = object
+    sys.modules["setuptools"] = setuptools
+setuptools.setup = _capture_setup
+try:
+    import distutils.core
+    distutils.core.setup = _capture_setup
+except ImportError:
+    pass
+
+setup_dir = os.path.dirname(os.path.abspath(setup_path))
+os.chdir(setup_dir)
+sys.path.insert(0, setup_dir)
+sys.argv = [setup_path]
+with open(setup_path, "rb") as f:
+    code = compile(f.read(), setup_path, "exec")
+exec(code, {"__name__": "__main__", "__file__": setup_path})
+"""
+
+
+def evaluate_setup(setup_path, timeout=DEFAULT_TIMEOUT, cache_dir=None,
+                   use_cache=True):
+    """
+    Evaluates a setup.py file in a subprocess with setup() patched to
+    capture its dependency keyword arguments. This supports files that
+    compute their dependencies, e.g. by reading requirements.txt. Results
+    are cached by the contents of the file and of the requirements files
+    beside it, so each version of a file is only evaluated once.
+
+    This executes untrusted code. The subprocess runs with its environment
+    cleared of everything but PATH, a temporary home directory, no user
+    site-packages, and limits on CPU time, the size of the files it writes
+    and core dumps, but it can still read and write the user's files, use
+    the network and start processes - only evaluate projects you trust.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to evaluate
+        timeout (float):
+            Number of seconds after which the evaluation is abandoned
+        cache_dir (str):
+            The cache directory. Defaults to 'cache.default_cache_dir()'.
+        use_cache (bool):
+            Whether to consult and update the cache
+    Returns:
+        dict:
+            The captured 'install_requires' (list<str>) and
+            'extras_require' (dict<str, list<str>>) arguments
+    Raises:
+        ValueError:
+            If the file fails, times out or never calls setup()
+    """
+    if not use_cache:
+        return _run_setup(setup_path, timeout)
+    key = cache_key(b"dynamic-setup", *setup_inputs(setup_path))
+    captured = load_entry(key, cache_dir)
+    if captured is None:
+        captured = _run_setup(setup_path, timeout)
+        store_entry(key, captured, cache_dir)
+    return captured
+
+
+def setup_inputs(setup_path):
+    """
+    Reads the files a dynamic setup.py file is likely to depend on: the file
+    itself and any requirements*.txt files beside it
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file
+    Returns:
+        list<bytes>: The contents of each file, setup.py first
+    """
+    setup_dir = os.path.dirname(os.path.abspath(setup_path))
+    paths = [setup_path] + sorted(
+        glob.glob(os.path.join(setup_dir, "requirements*.txt")))
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(os.path.basename(path).encode() + b"\0" +
+                            f.read())
+    return contents
+
+
+def _run_setup(setup_path, timeout):
+    """Runs the capturing script on a setup.py file"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "setup_kwargs.json")
+        try:
+            result = subprocess.run(
+                [sys.executable, "-I", "-c", _runner,
+                 os.path.abspath(setup_path), output_path,
+                 str(int(timeout) + 1), str(MAX_FILE_BYTES)],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE, timeout=timeout,
+                env={"PATH": os.getenv("PATH", os.defpath),
+                     "HOME": tmp_dir, "TMPDIR": tmp_dir})
+        except subprocess.TimeoutExpired:
+            raise ValueError("Evaluating {} timed out after {} seconds"
+                             .format(setup_path, timeout))
+        if not os.path.exists(output_path):
+            stderr = result.stderr.decode(errors="replace").strip()
+            raise ValueError("Evaluating {} did not reach setup(){}".format(
+                setup_path, ":\n" + stderr[-2000:] if stderr else ""))
+        with open(output_path, "r") as f:
+            return json.load(f)
+
@@ -0,0 +1,208 @@
+from collections import namedtuple
+import os
+import sys
+
+from pipenv_devcheck.paths import resolve_paths
+
+# An installed distribution, with the path of its METADATA (or PKG-INFO) file
+Distribution = namedtuple("Distribution", ["name", "version",
+                                           "metadata_path"])
+
+# Suffixes of the metadata directories (or files) of installed
+# distributions, and the metadata file inside each directory
+_metadata_files = {".dist-info": "METADATA", ".egg-info": "PKG-INFO"}
+
+
+def check_installed(setup_path=None, project_root=None, parser="regex",
+                    dynamic_setup=False, paths=None, use_cache=True):
+    """
+    Checks that the distributions installed in the running environment
+    satisfy the specifications in setup.py. The environment is indexed by a
+    single scan of its metadata directories (see 'installed_versions'), so
+    no package is looked up individually.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        use_cache (bool):
+            Whether such an evaluation may be served from and stored in the
+            result cache
+        paths (list<str>):
+            Directories to look for installed distributions in. Defaults to
+            the entries of 'sys.path'.
+    Returns:
+        dict<str, str>:
+            Dictionary from setup.py dependency names to their installed
+            versions
+    Raises:
+        ValueError:
+            If a dependency is not installed, or its installed version does
+            not satisfy setup.py
+    """
+    from pipenv_devcheck.lexer import canonical_name
+    from pipenv_devcheck.pipenv_setup_comp import get_setup_deps
+
+    setup_path, _ = resolve_paths(setup_path, None, project_root)
+    setup_deps, _ = get_setup_deps(setup_path, parser, dynamic_setup,
+                                   use_cache=use_cache)
+    installed = installed_versions(paths)
+    verify_installed_versions(setup_deps, installed)
+    return {dep_name: installed[canonical_name(dep_name)]
+            for dep_name in setup_deps}
+
+
+def installed_versions(paths=None):
+    """
+    Indexes the distributions installed in a set of directories by reading
+    the 'Name' and 'Version' headers of each '*.dist-info/METADATA' (or
+    '*.egg-info/PKG-INFO') file. Only the headers are read, and each
+    directory is listed once.
+
+    Args:
+        paths (list<str>):
+            Directories to look for installed distributions in, in order of
+            precedence. Defaults to the entries of 'sys.path'.
+    Returns:
+        dict<str, str>:
+            Dictionary from canonical distribution names to their versions.
+            Where a distribution is installed in several directories, the
+            first takes precedence, as it would on import.
+    """
+    return {name: distribution.version for name, distribution
+            in installed_distributions(paths).items()}
+
+
+def installed_distributions(paths=None):
+    """
+    Indexes the distributions installed in a set of directories, like
+    'installed_versions', keeping the path of each one's metadata
+
+    Args:
+        paths (list<str>):
+            Directories to look for installed distributions in, in order of
+            precedence. Defaults to the entries of 'sys.path'.
+    Returns:
+        dict<str, Distribution>:
+            Dictionary from canonical distribution names to the first
+            distribution installed under each
+    """
+    from pipenv_devcheck.lexer import canonical_name
+
+    distributions = {}
+    for path in sys.path if paths is None else paths:
+        try:
+            dir_entries = list(os.scandir(path or "."))
+        except OSError:
+            continue
+        for dir_entry in dir_entries:
+            metadata_path = _metadata_path(dir_entry)
+            if metadata_path is None:
+                continue
+            try:
+                name, version = read_name_version(metadata_path)
+            except OSError:
+                continue
+            if name and version:
+                distributions.setdefault(
+                    canonical_name(name),
+                    Distribution(name, version, metadata_path))
+    return distributions
+
+
+def read_name_version(metadata_path):
+    """
+    Reads the 'Name' and 'Version' headers of a distribution's metadata,
+    stopping as soon as both are found
+
+    Args:
+        metadata_path (str):
+            Path of a METADATA or PKG-INFO file
+    Returns:
+        tuple<str, str>: The name and the version, either of which may be
+        None if missing
+    """
+    name = version = None
+    with open(metadata_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                # The headers end at the first blank line
+                break
+            if line.startswith("Name:"):
+                name = line[5:].strip()
+            elif line.startswith("Version:"):
+                version = line[8:].strip()
+            if name and version:
+                break
+    return name, version
+
+
+def verify_installed_versions(setup_deps, installed):
+    """
+    Checks that installed versions satisfy the specifications in setup.py
+
+    Args:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        installed (dict<str, str>):
+            Installed versions, as returned by 'installed_versions'
+    Returns:
+        bool:
+            Whether the check passes - will always be true, otherwise the
+            function will not reach this line.
+    Raises:
+        ValueError:
+            If dependencies are not installed or installed at versions
+            setup.py does not allow
+    """
+    from packaging.version import InvalidVersion
+    from pipenv_devcheck.intervals import contains_version
+    from pipenv_devcheck.lexer import canonical_name
+    from pipenv_devcheck.version_cache import parse_version, spec_intervals
+
+    missing_deps = []
+    problem_deps = []
+    for dep_name, specs in setup_deps.items():
+        installed_version = installed.get(canonical_name(dep_name))
+        if installed_version is None:
+            missing_deps.append(dep_name)
+            continue
+        try:
+            version = parse_version(installed_version)
+        except InvalidVersion:
+            version = None
+        if version is None or not contains_version(spec_intervals(specs),
+                                                   version):
+            problem_deps.append("{}=={}".format(dep_name, installed_version))
+
+    if missing_deps or problem_deps:
+        err_msg = "Installed packages do not satisfy setup.py!\n"
+        if missing_deps:
+            err_msg += ("Dependencies in setup.py but not installed: " +
+                        ", ".join(missing_deps) + "\n")
+        if problem_deps:
+            err_msg += ("Installed versions not allowed by setup.py: " +
+                        ", ".join(problem_deps) + "\n")
+        raise ValueError(err_msg)
+    return True
+
+
+def _metadata_path(dir_entry):
+    """
+    Path of the metadata file of an installed distribution, or None if the
+    directory entry is not a distribution's metadata
+    """
+    for suffix, metadata_file in _metadata_files.items():
+        if dir_entry.name.endswith(suffix):
+            if dir_entry.is_dir():
+                return os.path.join(dir_entry.path, metadata_file)
+            # Old-style eggs may install 'PKG-INFO' as a bare file
+            return dir_entry.path if suffix == ".egg-info" else None
+    return None
@@ -0,0 +1,27 @@
+import subprocess
+
+
+def run_git(args, repo, stdin=None):
+    """
+    Runs a git command in a repository
+
+    Args:
+        args (list<str>):
+            The git subcommand and its arguments
+        repo (str):
+            Directory of the git repository
+        stdin (str):
+            Text to pass to the command's standard input
+    Returns:
+        bytes: The command's output
+    Raises:
+        ValueError: If the command fails
+    """
+    result = subprocess.run(
+        ["git", "-C", repo] + args,
+        input=stdin.encode("utf-8") if stdin is not None else None,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise ValueError("git {} failed: {}".format(
+            args[0], result.stderr.decode("utf-8", "replace").strip()))
+    return result.stdout
@@ -0,0 +1,183 @@
+from collections import namedtuple
+
+from pipenv_devcheck.paths import resolve_paths
+
+# Outcome of comparing one Pipfile section with the setup.py groups mapped
+# onto it
+SectionResult = namedtuple("SectionResult", ["section", "groups", "findings"])
+
+# Pipfile section that extras are compared with when the Pipfile has no
+# section of the same name
+DEFAULT_EXTRAS_SECTION = "dev-packages"
+
+
+def compare_groups(setup_path=None, pipfile_path=None, project_root=None,
+                   parser="regex", dynamic_setup=False, group_map=None,
+                   use_cache=True):
+    """
+    Compares each group of setup.py dependencies with a Pipfile section:
+    'install_requires' with '[packages]', and each extra with the section
+    of the same name if there is one, or '[dev-packages]' otherwise. Groups
+    mapped onto the same section are compared with it together, and a
+    dependency listed in several of them must satisfy all their
+    specifications. Every requirement and specification string is parsed
+    once, however many groups it appears in.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        pipfile_path (str):
+            Path of the Pipfile to read
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        use_cache (bool):
+            Whether such an evaluation may be served from and stored in the
+            result cache
+        group_map (dict<str, str>):
+            Sections to compare groups with, overriding the defaults
+    Returns:
+        list<SectionResult>:
+            The findings for each section that at least one group maps onto,
+            in the order the groups appear
+    """
+    from pipenv_devcheck.pipenv_setup_comp import (
+        read_pipfile_sections, read_setup_groups)
+    from pipenv_devcheck.report import collect_findings
+
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    setup_groups = read_setup_groups(setup_path, dynamic_setup,
+                                     use_cache=use_cache)
+    pipfile_sections = read_pipfile_sections(pipfile_path)
+    table = VersionTable(parser)
+
+    section_groups = {}
+    for group in setup_groups:
+        section = section_for_group(group, pipfile_sections, group_map)
+        section_groups.setdefault(section, []).append(group)
+
+    results = []
+    for section, groups in section_groups.items():
+        setup_deps, setup_extras = table.setup_deps(
+            dep_str for group in groups for dep_str in setup_groups[group])
+        pipfile_deps, pipfile_extras = table.pipfile_deps(
+            pipfile_sections.get(section, {}))
+        results.append(SectionResult(section, groups, collect_findings(
+            setup_deps, setup_extras, pipfile_deps, pipfile_extras)))
+    return results
+
+
+def section_for_group(group, pipfile_sections, group_map=None):
+    """
+    Chooses the Pipfile section a setup.py group is compared with
+
+    Args:
+        group (str):
+            'install_requires' or the name of an extra
+        pipfile_sections (dict<str, dict>):
+            The Pipfile's sections, as returned by 'read_pipfile_sections'
+        group_map (dict<str, str>):
+            Sections to compare groups with, overriding the defaults
+    Returns:
+        str: The name of the section
+    """
+    from pipenv_devcheck.readers import INSTALL_REQUIRES
+
+    if group_map and group in group_map:
+        return group_map[group]
+    if group == INSTALL_REQUIRES:
+        return "packages"
+    if group in pipfile_sections and group != "packages":
+        return group
+    return DEFAULT_EXTRAS_SECTION
+
+
+class VersionTable:
+    """
+    Memoizes the parsing of requirements and specifications, so that text
+    shared between groups is parsed once. Version intervals are memoized by
+    'version_cache.spec_intervals'.
+    """
+
+    def __init__(self, parser="regex"):
+        from pipenv_devcheck.lexer import requirement_parsers
+
+        self.parse_requirement = requirement_parsers[parser]
+        self.requirements = {}
+        self.specs = {}
+
+    def setup_deps(self, dep_strs):
+        """
+        Parses setup.py dependency lines, combining the specifications of
+        dependencies listed more than once
+
+        Args:
+            dep_strs (iterable<str>):
+                The dependency lines
+        Returns:
+            setup_deps (dict<str, list<tuple<str, str>>>):
+                Dictionary of the dependencies
+            setup_extras (dict<str, list<str>>):
+                Dictionary of the extras specified
+        """
+        setup_deps = {}
+        setup_extras = {}
+        for dep_str in dep_strs:
+            requirement = self.requirements.get(dep_str)
+            if requirement is None:
+                requirement = self.parse_requirement(dep_str)
+                self.requirements[dep_str] = requirement
+            name, extras, specs = requirement
+            if name in setup_deps:
+                setup_deps[name] = _combine_specs(setup_deps[name], specs)
+            else:
+                setup_deps[name] = specs
+            if extras:
+                known = setup_extras.setdefault(name, [])
+                known.extend(extra for extra in extras if extra not in known)
+        return setup_deps, setup_extras
+
+    def pipfile_deps(self, section):
+        """
+        Parses the packages of a Pipfile section
+
+        Args:
+            section (dict<str, object>):
+                Package names and their specification strings or
+                dictionaries
+        Returns:
+            pipfile_deps (dict<str, list<tuple<str, str>>>):
+                Dictionary of the dependencies
+            pipfile_extras (dict<str, list<str>>):
+                Dictionary of the extras specified
+        """
+        from pipenv_devcheck.lexer import lex_specs
+
+        pipfile_deps = {}
+        pipfile_extras = {}
+        for name, dep_spec in section.items():
+            if isinstance(dep_spec, dict):
+                if "extras" in dep_spec:
+                    pipfile_extras[name] = dep_spec["extras"]
+                dep_spec = dep_spec.get("version", "*")
+            specs = self.specs.get(dep_spec)
+            if specs is None:
+                specs = lex_specs(dep_spec)
+                self.specs[dep_spec] = specs
+            pipfile_deps[name] = specs
+        return pipfile_deps, pipfile_extras
+
+
+def _combine_specs(specs, other_specs):
+    """Combines two lists of specifications that must both hold"""
+    if specs == ["*"]:
+        return other_specs
+    if other_specs == ["*"] or other_specs == specs:
+        return specs
+    return specs + other_specs
@@ -0,0 +1,214 @@
+from collections import namedtuple
+import os
+
+from pipenv_devcheck.git import run_git
+
+# Outcome of checking the dependency files of a single commit
+CommitResult = namedtuple("CommitResult",
+                          ["commit", "subject", "passed", "error"])
+
+
+def check_history(rev_range="HEAD", repo=None, setup_path="setup.py",
+                  pipfile_path="Pipfile", processes=None, parser="regex"):
+    """
+    Checks the dependency files of every commit in a range, reading them
+    straight from the repository's object store instead of checking each
+    commit out. Commits whose setup.py and Pipfile blobs are both unchanged
+    share a single check, and the distinct pairs are spread across a process
+    pool.
+
+    Args:
+        rev_range (str):
+            Commits to check, in any form 'git log' accepts, e.g.
+            'v1.0..HEAD'
+        repo (str):
+            Directory of the project within a git repository, which need
+            not be the repository's top level. Defaults to the current
+            directory.
+        setup_path (str):
+            Path of setup.py, setup.cfg or pyproject.toml relative to
+            'repo'
+        pipfile_path (str):
+            Path of the Pipfile relative to 'repo'
+        processes (int):
+            Number of worker processes to use. Defaults to the number of
+            CPUs on the machine.
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+    Returns:
+        list<CommitResult>: One result per commit, oldest first
+    Raises:
+        ValueError:
+            If git fails, e.g. because the range is invalid
+    """
+    repo = repo or "."
+    commits = list_commits(rev_range, repo)
+    blob_ids = resolve_blobs(
+        [object_name(commit, path) for commit, _ in commits
+         for path in (setup_path, pipfile_path)], repo)
+    pairs = [(blob_ids[2 * index], blob_ids[2 * index + 1])
+             for index in range(len(commits))]
+    unique_pairs = list(dict.fromkeys(pair for pair in pairs
+                                      if None not in pair))
+    blobs = read_blobs({blob_id for pair in unique_pairs
+                        for blob_id in pair}, repo)
+
+    verdicts = dict(zip(unique_pairs, _map_checks(
+        [blobs[setup_id] for setup_id, _ in unique_pairs],
+        [blobs[pipfile_id] for _, pipfile_id in unique_pairs],
+        parser, processes, setup_path)))
+
+    results = []
+    for (commit, subject), (setup_id, pipfile_id) in zip(commits, pairs):
+        if setup_id is None or pipfile_id is None:
+            missing = setup_path if setup_id is None else pipfile_path
+            results.append(CommitResult(
+                commit, subject, False,
+                "FileNotFoundError: {} not found in commit".format(missing)))
+        else:
+            passed, error = verdicts[(setup_id, pipfile_id)]
+            results.append(CommitResult(commit, subject, passed, error))
+    return results
+
+
+def check_texts(setup_text, pipfile_text, parser="regex",
+                setup_path="setup.py"):
+    """
+    Runs all checks on the contents of a setup.py file and a Pipfile,
+    capturing any failure instead of raising it
+
+    Args:
+        setup_text (str):
+            Contents of setup.py
+        pipfile_text (str):
+            Contents of the Pipfile
+        parser (str):
+            Requirement parsing mode for setup.py
+        setup_path (str):
+            Path of the setup file, whose name chooses how 'setup_text' is
+            read, e.g. as setup.cfg
+    Returns:
+        tuple<bool, str>:
+            Whether the checks pass, and the error if they do not
+    """
+    from pipenv_devcheck.pipenv_setup_comp import (
+        get_setup_deps, get_pipfile_deps, run_checks)
+
+    try:
+        setup_deps, setup_extras = get_setup_deps(setup_path, parser,
+                                                  text=setup_text)
+        pipfile_deps, pipfile_extras = get_pipfile_deps(text=pipfile_text)
+        run_checks(setup_deps, setup_extras, pipfile_deps, pipfile_extras)
+    except Exception as e:
+        return False, "{}: {}".format(type(e).__name__, e)
+    return True, None
+
+
+def list_commits(rev_range, repo):
+    """
+    Lists the commits in a range, oldest first
+
+    Returns:
+        list<tuple<str, str>>: The hash and subject of each commit
+    """
+    output = run_git(["log", "--reverse", "--format=%H%x00%s", rev_range,
+                      "--"], repo)
+    return [tuple(line.split("\0", 1))
+            for line in output.decode("utf-8", "replace").splitlines()]
+
+
+def object_name(commit, path):
+    """
+    Names a file of a commit relative to the directory git runs in, rather
+    than to the top level of the repository, so projects in subdirectories
+    of a repository resolve
+
+    Args:
+        commit (str):
+            The commit
+        path (str):
+            Path of the file relative to the project directory
+    Returns:
+        str: The '<commit>:./<path>' object name
+    """
+    return "{}:./{}".format(commit,
+                            os.path.normpath(path).replace(os.sep, "/"))
+
+
+def resolve_blobs(object_names, repo):
+    """
+    Resolves object names, e.g. from 'object_name', to blob ids with a
+    single git process
+
+    Args:
+        object_names (list<str>):
+            The names to resolve
+        repo (str):
+            Directory of the git repository
+    Returns:
+        list<str>:
+            The blob id of each name, in order, or None where the path does
+            not exist in the commit
+    """
+    if not object_names:
+        return []
+    output = run_git(
+        ["cat-file", "--batch-check=%(objectname) %(objecttype)"], repo,
+        "\n".join(object_names) + "\n")
+    blob_ids = []
+    for line in output.decode("utf-8", "replace").splitlines():
+        fields = line.split()
+        blob_ids.append(fields[0] if fields[-1] == "blob" else None)
+    return blob_ids
+
+
+def read_blobs(blob_ids, repo):
+    """
+    Reads the contents of blobs with a single git process
+
+    Args:
+        blob_ids (set<str>):
+            Ids of the blobs to read
+        repo (str):
+            Directory of the git repository
+    Returns:
+        dict<str, str>: Dictionary from blob ids to their decoded contents
+    """
+    blob_ids = sorted(blob_ids)
+    if not blob_ids:
+        return {}
+    output = run_git(["cat-file", "--batch"], repo,
+                     "\n".join(blob_ids) + "\n")
+    blobs = {}
+    pos = 0
+    for blob_id in blob_ids:
+        header_end = output.index(b"\n", pos)
+        size = int(output[pos:header_end].split()[2])
+        content_start = header_end + 1
+        blobs[blob_id] = output[content_start:content_start + size].decode(
+            "utf-8", "replace")
+        # Each blob's contents are followed by a newline
+        pos = content_start + size + 1
+    return blobs
+
+
+def _map_checks(setup_texts, pipfile_texts, parser, processes, setup_path):
+    """Runs 'check_texts' on each pair of texts, across a process pool"""
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(setup_texts))
+    if processes <= 1:
+        return [check_texts(setup_text, pipfile_text, parser, setup_path)
+                for setup_text, pipfile_text
+                in zip(setup_texts, pipfile_texts)]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(setup_texts) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(check_texts, setup_texts, pipfile_texts,
+                                 [parser] * len(setup_texts),
+                                 [setup_path] * len(setup_texts),
+                                 chunksize=chunksize))
+
@@ -0,0 +1,268 @@
+from collections import namedtuple
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from pipenv_devcheck.paths import resolve_paths
+
+# Environment variable overriding the path of the index database
+INDEX_PATH_ENV = "PIPENV_DEVCHECK_INDEX"
+# Name of the index database inside the data directory
+INDEX_FILENAME = "index.sqlite3"
+
+# Outcome of indexing a batch of projects
+IndexSummary = namedtuple("IndexSummary", ["indexed", "unchanged", "failed"])
+# A project's specifications for a package, as returned by queries
+ProjectSpec = namedtuple("ProjectSpec", ["project", "source", "specs"])
+# Two sets of specifications for the same package with no version in common
+Conflict = namedtuple("Conflict", ["package", "left", "right"])
+
+_schema = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL UNIQUE,
+    setup_hash TEXT,
+    pipfile_hash TEXT,
+    indexed_at REAL NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS deps (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    package TEXT NOT NULL,
+    name TEXT NOT NULL,
+    specs TEXT NOT NULL,
+    extras TEXT NOT NULL,
+    PRIMARY KEY (project_id, source, package)
+);
+CREATE INDEX IF NOT EXISTS deps_package ON deps (package, source);
+"""
+
+
+def default_index_path():
+    """
+    Returns the path of the index database. The index is built explicitly
+    and is expensive to rebuild, so it lives in the user's data directory
+    rather than the cache directory that '--clear-cache' removes.
+
+    Returns:
+        str:
+            The database path: '$PIPENV_DEVCHECK_INDEX' where set, and
+            otherwise in '$XDG_DATA_HOME' (or '~/.local/share')
+    """
+    if os.getenv(INDEX_PATH_ENV):
+        return os.getenv(INDEX_PATH_ENV)
+    data_home = (os.getenv("XDG_DATA_HOME") or
+                 os.path.join(os.path.expanduser("~"), ".local", "share"))
+    return os.path.join(data_home, "pipenv-devcheck", INDEX_FILENAME)
+
+
+def connect(db_path=None):
+    """
+    Opens the index database, creating its tables if needed
+
+    Args:
+        db_path (str):
+            Path of the database. Defaults to 'default_index_path()'.
+    Returns:
+        sqlite3.Connection: The open database
+    """
+    db_path = db_path or default_index_path()
+    if db_path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)),
+                    exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(_schema)
+    return connection
+
+
+def index_projects(project_roots, db_path=None, parser="regex"):
+    """
+    Stores the parsed dependencies of each project in the index. Projects
+    whose setup.py and Pipfile hashes match those already indexed are not
+    parsed again.
+
+    Args:
+        project_roots (list<str>):
+            Directories containing a setup.py and a Pipfile
+        db_path (str):
+            Path of the database. Defaults to 'default_index_path()'.
+        parser (str):
+            Requirement parsing mode for setup.py
+    Returns:
+        IndexSummary:
+            Numbers of projects parsed and stored, skipped as unchanged and
+            that could not be read or parsed
+    """
+    from pipenv_devcheck.lexer import canonical_name
+    from pipenv_devcheck.pipenv_setup_comp import (
+        get_setup_deps, get_pipfile_deps)
+
+    indexed = unchanged = failed = 0
+    with connect(db_path) as connection:
+        for project_root in project_roots:
+            root = os.path.abspath(project_root)
+            setup_path, pipfile_path = resolve_paths(project_root=root)
+            try:
+                setup_content = _read_text(setup_path)
+                pipfile_content = _read_text(pipfile_path)
+            except OSError as e:
+                _store_project(connection, root, None, None,
+                               "{}: {}".format(type(e).__name__, e))
+                failed += 1
+                continue
+            setup_hash = _hash(setup_content)
+            pipfile_hash = _hash(pipfile_content)
+            if connection.execute(
+                    "SELECT 1 FROM projects WHERE root = ? AND setup_hash = ?"
+                    " AND pipfile_hash = ? AND error IS NULL",
+                    (root, setup_hash, pipfile_hash)).fetchone():
+                unchanged += 1
+                continue
+
+            try:
+                parsed = {
+                    "setup": get_setup_deps(setup_path, parser,
+                                            text=setup_content),
+                    "pipfile": get_pipfile_deps(pipfile_path,
+                                                pipfile_content)}
+            except Exception as e:
+                _store_project(connection, root, setup_hash, pipfile_hash,
+                               "{}: {}".format(type(e).__name__, e))
+                failed += 1
+                continue
+            project_id = _store_project(connection, root, setup_hash,
+                                        pipfile_hash, None)
+            connection.executemany(
+                "INSERT OR REPLACE INTO deps VALUES (?, ?, ?, ?, ?, ?)",
+                [(project_id, source, canonical_name(name), name,
+                  json.dumps(specs), json.dumps(extras.get(name, [])))
+                 for source, (deps, extras) in parsed.items()
+                 for name, specs in deps.items()])
+            indexed += 1
+    connection.close()
+    return IndexSummary(indexed, unchanged, failed)
+
+
+def projects_allowing(requirement, db_path=None, source="setup"):
+    """
+    Finds the indexed projects whose specifications for a package allow at
+    least one version matching a requirement
+
+    Args:
+        requirement (str):
+            A requirement, e.g. 'pandas<1.0'
+        db_path (str):
+            Path of the database. Defaults to 'default_index_path()'.
+        source (str):
+            Which file's specifications to consult: 'setup' or 'pipfile'
+    Returns:
+        list<ProjectSpec>: The matching projects, ordered by root
+    """
+    from pipenv_devcheck.intervals import intersect
+    from pipenv_devcheck.lexer import lex_requirement
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    name, _, specs = lex_requirement(requirement)
+    wanted = spec_intervals(specs)
+    return [project_spec for project_spec in _package_specs(
+                name, db_path, source)
+            if intersect(spec_intervals(project_spec.specs), wanted)]
+
+
+def find_conflicts(package, db_path=None):
+    """
+    Finds conflicting specifications for a package: projects whose setup.py
+    and Pipfile allow no common version, and pairs of projects whose setup.py
+    files allow no common version, so that they cannot be installed together
+
+    Args:
+        package (str):
+            The package name
+        db_path (str):
+            Path of the database. Defaults to 'default_index_path()'.
+    Returns:
+        list<Conflict>:
+            The conflicts, each between two ProjectSpecs - conflicts within a
+            project come first
+    """
+    from pipenv_devcheck.intervals import intersect
+    from pipenv_devcheck.matrix import compatibility_matrix
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    setup_specs = _package_specs(package, db_path, "setup")
+    pipfile_specs = {project_spec.project: project_spec for project_spec
+                     in _package_specs(package, db_path, "pipfile")}
+
+    conflicts = []
+    for project_spec in setup_specs:
+        pipfile_spec = pipfile_specs.get(project_spec.project)
+        if pipfile_spec is not None and not intersect(
+                spec_intervals(project_spec.specs),
+                spec_intervals(pipfile_spec.specs)):
+            conflicts.append(Conflict(package, project_spec, pipfile_spec))
+    # Every pair of projects is compared at once, vectorized when possible
+    compatible = compatibility_matrix([project_spec.specs
+                                       for project_spec in setup_specs])
+    for index, left in enumerate(setup_specs):
+        for right_index in range(index + 1, len(setup_specs)):
+            if not compatible[index][right_index]:
+                conflicts.append(Conflict(package, left,
+                                          setup_specs[right_index]))
+    return conflicts
+
+
+def _package_specs(package, db_path, source):
+    """Reads every project's specifications for a package from one file"""
+    from pipenv_devcheck.lexer import canonical_name
+
+    connection = connect(db_path)
+    try:
+        rows = connection.execute(
+            "SELECT projects.root, deps.specs FROM deps JOIN projects "
+            "ON projects.id = deps.project_id "
+            "WHERE deps.package = ? AND deps.source = ? "
+            "ORDER BY projects.root",
+            (canonical_name(package), source)).fetchall()
+    finally:
+        connection.close()
+    return [ProjectSpec(root, source,
+                        [tuple(spec) if isinstance(spec, list) else spec
+                         for spec in json.loads(specs)])
+            for root, specs in rows]
+
+
+def _store_project(connection, root, setup_hash, pipfile_hash, error):
+    """
+    Records a project, replacing its previous dependencies
+
+    Returns:
+        int: The project's row id
+    """
+    row = connection.execute("SELECT id FROM projects WHERE root = ?",
+                             (root,)).fetchone()
+    if row is None:
+        return connection.execute(
+            "INSERT INTO projects (root, setup_hash, pipfile_hash, "
+            "indexed_at, error) VALUES (?, ?, ?, ?, ?)",
+            (root, setup_hash, pipfile_hash, time.time(), error)).lastrowid
+    connection.execute("DELETE FROM deps WHERE project_id = ?", (row[0],))
+    connection.execute(
+        "UPDATE projects SET setup_hash = ?, pipfile_hash = ?, "
+        "indexed_at = ?, error = ? WHERE id = ?",
+        (setup_hash, pipfile_hash, time.time(), error, row[0]))
+    return row[0]
+
+
+def _read_text(path):
+    """Reads a file as text"""
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _hash(text):
+    """Hashes the contents of a file"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,309 @@
+from collections import namedtuple
+import functools
+
+from packaging.version import parse as parse_version
+
+# A contiguous range of versions. 'lower'/'upper' are None when unbounded,
+# and 'lower' may be an 'AfterPosts' bound.
+Interval = namedtuple("Interval", ["lower", "lower_inclusive",
+                                   "upper", "upper_inclusive"])
+
+
+@functools.total_ordering
+class AfterPosts:
+    """
+    A bound above a final release and all of its post-releases, and below
+    every later release. No version lies on it, so it is only used as the
+    exclusive lower bound of '>1.4', which PEP 440 does not let match
+    1.4.post1.
+
+    Attributes:
+        version (packaging.version.Version):
+            The final release
+    """
+    __slots__ = ("version",)
+
+    def __init__(self, version):
+        self.version = version
+
+    def __eq__(self, other):
+        return (isinstance(other, AfterPosts) and
+                _release_key(self.version) == _release_key(other.version))
+
+    def __lt__(self, other):
+        other_version = (other.version if isinstance(other, AfterPosts)
+                         else other)
+        return _release_key(self.version) < _release_key(other_version)
+
+    def __hash__(self):
+        return hash(_release_key(self.version))
+
+    def __str__(self):
+        return str(self.version)
+
+    def __repr__(self):
+        return "AfterPosts({!r})".format(self.version)
+
+
+def spec_intervals(specs, parse=parse_version):
+    """
+    Normalizes a list of specifications into the sorted, disjoint intervals
+    of versions that satisfy all of them. Each specification is parsed once,
+    and exclusions ('!=') are applied in a single sweep over the range left
+    by the other operators.
+
+    Args:
+        specs (list<tuple<str, str>>):
+            Operator/version tuples as returned by 'split_ops_and_versions',
+            or ["*"] for any version
+        parse (callable):
+            Function used to parse version strings
+    Returns:
+        list<Interval>: The satisfying intervals, in ascending order. Empty
+        if the specifications cannot all be satisfied.
+    """
+    lower, lower_inclusive = None, False
+    upper, upper_inclusive = None, False
+    excluded = []
+    for spec in specs:
+        op = spec[0]
+        if op == "*":
+            continue
+        bounds = spec_bounds(op, spec[1], parse)
+        if op == "!=":
+            excluded.append(bounds)
+            continue
+        lower, lower_inclusive = _max_lower(lower, lower_inclusive,
+                                            bounds.lower,
+                                            bounds.lower_inclusive)
+        upper, upper_inclusive = _min_upper(upper, upper_inclusive,
+                                            bounds.upper,
+                                            bounds.upper_inclusive)
+
+    if _is_empty(lower, lower_inclusive, upper, upper_inclusive):
+        return []
+    intervals = []
+    excluded.sort(key=lambda bounds: (bounds.lower,
+                                      not bounds.lower_inclusive))
+    for bounds in excluded:
+        piece_upper, piece_upper_inclusive = _min_upper(
+            upper, upper_inclusive, bounds.lower, not bounds.lower_inclusive)
+        if not _is_empty(lower, lower_inclusive,
+                         piece_upper, piece_upper_inclusive):
+            intervals.append(Interval(lower, lower_inclusive,
+                                      piece_upper, piece_upper_inclusive))
+        lower, lower_inclusive = _max_lower(lower, lower_inclusive,
+                                            bounds.upper,
+                                            not bounds.upper_inclusive)
+    if not _is_empty(lower, lower_inclusive, upper, upper_inclusive):
+        intervals.append(Interval(lower, lower_inclusive,
+                                  upper, upper_inclusive))
+    return intervals
+
+
+def spec_bounds(op, version, parse=parse_version):
+    """
+    Converts a single specification into the interval of versions it
+    matches - or, for '!=', the interval of versions it excludes. As in
+    PEP 440, '<' and '>' with a final release do not match its pre- and
+    post-releases: '<1.4' ends below 1.4.dev0 and '>1.4' starts above
+    1.4.post1.
+
+    Args:
+        op (str):
+            The comparison operator
+        version (str):
+            The version, which may end in '.*' for '==' and '!='
+        parse (callable):
+            Function used to parse version strings
+    Returns:
+        Interval: The versions matched (or excluded) by the specification
+    Raises:
+        ValueError:
+            If the operator is unknown or cannot be applied to the version
+    """
+    if op in ("==", "!=") and version.endswith(".*"):
+        # Prefix matching - '==1.2.*' spans from the first development
+        # release of 1.2 up to, but excluding, that of 1.3
+        prefix = version[:-2]
+        parsed = parse(prefix)
+        return Interval(parse(prefix + ".dev0"), True,
+                        _first_dev(parsed.epoch,
+                                   _next_release(parsed.release), parse),
+                        False)
+    if op == "~=":
+        # Compatible release - '~=1.4.2' is '>=1.4.2, ==1.4.*'
+        parsed = parse(version)
+        if len(parsed.release) < 2:
+            raise ValueError("'~=' requires a version with at least two "
+                             "release segments: {}".format(version))
+        return Interval(parsed, True,
+                        _first_dev(parsed.epoch,
+                                   _next_release(parsed.release[:-1]), parse),
+                        False)
+
+    parsed = parse(version)
+    final = (parsed.pre is None and parsed.post is None and
+             parsed.dev is None)
+    if op in ("==", "===", "!="):
+        return Interval(parsed, True, parsed, True)
+    if op == ">=":
+        return Interval(parsed, True, None, False)
+    if op == ">":
+        return Interval(AfterPosts(parsed) if final else parsed, False,
+                        None, False)
+    if op == "<=":
+        return Interval(None, False, parsed, True)
+    if op == "<":
+        return Interval(None, False,
+                        _first_dev(parsed.epoch, parsed.release, parse)
+                        if final else parsed, False)
+    raise ValueError("Unknown comparison operator: {}".format(op))
+
+
+def intersect(left, right):
+    """
+    Intersects two sorted lists of disjoint intervals in a single merge pass
+
+    Args:
+        left (list<Interval>):
+            Intervals as returned by 'spec_intervals'
+        right (list<Interval>):
+            Intervals as returned by 'spec_intervals'
+    Returns:
+        list<Interval>: The versions contained in both inputs
+    """
+    overlap = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        a, b = left[i], right[j]
+        lower, lower_inclusive = _max_lower(a.lower, a.lower_inclusive,
+                                            b.lower, b.lower_inclusive)
+        upper, upper_inclusive = _min_upper(a.upper, a.upper_inclusive,
+                                            b.upper, b.upper_inclusive)
+        if not _is_empty(lower, lower_inclusive, upper, upper_inclusive):
+            overlap.append(Interval(lower, lower_inclusive,
+                                    upper, upper_inclusive))
+        # Advance past whichever interval ends first
+        if (upper, upper_inclusive) == (a.upper, a.upper_inclusive):
+            i += 1
+        else:
+            j += 1
+    return overlap
+
+
+def is_subset(inner, outer):
+    """
+    Checks whether every version in 'inner' is also in 'outer'
+
+    Args:
+        inner (list<Interval>):
+            Intervals as returned by 'spec_intervals'
+        outer (list<Interval>):
+            Intervals as returned by 'spec_intervals'
+    Returns:
+        bool: Whether 'inner' is contained in 'outer'
+    """
+    return intersect(inner, outer) == inner
+
+
+def contains_version(intervals, version):
+    """
+    Checks whether a version falls into any of the given intervals
+
+    Args:
+        intervals (list<Interval>):
+            Intervals as returned by 'spec_intervals'
+        version (packaging.version.Version):
+            The version to look for
+    Returns:
+        bool: Whether the version is contained in the intervals
+    """
+    return any(_contains(interval.lower, interval.lower_inclusive,
+                         interval.upper, interval.upper_inclusive, version)
+               for interval in intervals)
+
+
+def format_intervals(intervals):
+    """
+    Renders intervals as specification strings, for error messages
+
+    Args:
+        intervals (list<Interval>):
+            Intervals as returned by 'spec_intervals'
+    Returns:
+        str: e.g. '>=1.0, <2.0 | >2.0, <3.0', or 'no versions' if empty
+    """
+    if not intervals:
+        return "no versions"
+    rendered = []
+    for interval in intervals:
+        if (interval.lower is not None and interval.lower == interval.upper):
+            rendered.append("=={}".format(interval.lower))
+            continue
+        bounds = []
+        if interval.lower is not None:
+            bounds.append("{}{}".format(
+                ">=" if interval.lower_inclusive else ">", interval.lower))
+        if interval.upper is not None:
+            bounds.append("{}{}".format(
+                "<=" if interval.upper_inclusive else "<", interval.upper))
+        rendered.append(", ".join(bounds) or "*")
+    return " | ".join(rendered)
+
+
+def _is_empty(lower, lower_inclusive, upper, upper_inclusive):
+    """Whether the given bounds leave no versions between them"""
+    if lower is None or upper is None:
+        return False
+    return lower > upper or (lower == upper and
+                             not (lower_inclusive and upper_inclusive))
+
+
+def _contains(lower, lower_inclusive, upper, upper_inclusive, version):
+    """Whether 'version' lies within the given bounds"""
+    above_lower = (lower is None or version > lower or
+                   (lower_inclusive and version == lower))
+    below_upper = (upper is None or version < upper or
+                   (upper_inclusive and version == upper))
+    return above_lower and below_upper
+
+
+def _max_lower(a, a_inclusive, b, b_inclusive):
+    """The tighter of two lower bounds, where None is unbounded"""
+    if a is None or (b is not None and b > a):
+        return b, b_inclusive
+    if b is None or a > b:
+        return a, a_inclusive
+    return a, a_inclusive and b_inclusive
+
+
+def _min_upper(a, a_inclusive, b, b_inclusive):
+    """The tighter of two upper bounds, where None is unbounded"""
+    if a is None or (b is not None and b < a):
+        return b, b_inclusive
+    if b is None or a < b:
+        return a, a_inclusive
+    return a, a_inclusive and b_inclusive
+
+
+def _next_release(release):
+    """Increments the last segment of a release, e.g. (1, 4) to (1, 5)"""
+    return release[:-1] + (release[-1] + 1,)
+
+
+def _first_dev(epoch, release, parse):
+    """
+    The first development release of a release, e.g. '1.5.dev0' for
+    (1, 5) - below its pre-releases and above every earlier release
+    """
+    return parse("{}!{}.dev0".format(
+        epoch, ".".join(str(part) for part in release)))
+
+
+def _release_key(version):
+    """A version's epoch and release, without trailing zeros"""
+    release = list(version.release)
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    return version.epoch, tuple(release)
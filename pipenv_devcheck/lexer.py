@@ -0,0 +1,260 @@
+from collections import namedtuple
+import re
+
+# A dependency specification broken into its parts. 'specs' holds
+# (operator, version) tuples, or is ["*"] when any version is allowed.
+Requirement = namedtuple("Requirement", ["name", "extras", "specs"])
+
+# Each pattern below is applied at the current position with .match() and
+# consumes any whitespace that follows its token. None of them contains
+# nested or adjacent overlapping repetition, so each character of a
+# requirement is consumed exactly once.
+
+# Optional whitespace
+ws_exp = re.compile(r"\s*")
+# The name of a package
+name_exp = re.compile(r"\s*([\w.\-]+)\s*")
+# Extras in brackets, capturing the comma-separated list
+extras_exp = re.compile(r"\[([^\]]*)\]\s*")
+# A single specification, capturing the operator and the version. Longer
+# operators are listed first so that e.g. '===' is not read as '=='.
+spec_exp = re.compile(r"(===|~=|==|!=|<=|>=|<|>)\s*([\w.*+!\-]+)\s*")
+# Separator between specifications
+comma_exp = re.compile(r",\s*")
+# Start of a direct reference ('name @ url') or of environment markers
+tail_exp = re.compile(r"[@;]")
+
+# Runs of separators that are equivalent in package names
+name_separator_exp = re.compile(r"[-_.]+")
+
+# Character classes used by 'scan_requirement', in addition to alphanumerics
+name_chars = frozenset("_.-")
+version_chars = frozenset("_.*+!-")
+op_chars = frozenset("<>=!~")
+tail_chars = frozenset("@;")
+# Every valid comparison operator
+ops = frozenset(["===", "~=", "==", "!=", "<=", ">=", "<", ">"])
+
+
+def lex_requirement(text):
+    """
+    Parses a dependency specification, as found in setup.py, in a single
+    left-to-right pass
+
+    Args:
+        text (str):
+            A requirement, e.g. 'pyhive[hive, presto]>=0.6.0, <0.7'
+    Returns:
+        Requirement: The package name, extras and specifications
+    Raises:
+        ValueError:
+            If the text is not a valid requirement
+    """
+    name_match = name_exp.match(text)
+    if not name_match:
+        raise _lex_error(text)
+    pos = name_match.end()
+
+    extras = []
+    extras_match = extras_exp.match(text, pos)
+    if extras_match:
+        extras = [extra.strip() for extra in extras_match.group(1).split(",")
+                  if extra.strip()]
+        pos = extras_match.end()
+
+    in_parens = text.startswith("(", pos)
+    if in_parens:
+        pos = ws_exp.match(text, pos + 1).end()
+    specs, pos = _lex_specs_at(text, pos)
+    if in_parens:
+        if not text.startswith(")", pos):
+            raise _lex_error(text)
+        pos = ws_exp.match(text, pos + 1).end()
+
+    if pos != len(text) and not tail_exp.match(text, pos):
+        raise _lex_error(text)
+    return Requirement(name_match.group(1), extras, specs)
+
+
+def scan_requirement(text):
+    """
+    Parses a dependency specification with a hand-written state machine.
+    Every loop below only ever moves forward through the text and does a
+    constant amount of work per character, so the running time is linear in
+    the length of the input regardless of its content. Accepts the same
+    operator and version characters as 'lex_requirement', and so produces
+    the same results and raises on the same input.
+
+    Args:
+        text (str):
+            A requirement, e.g. 'pyhive[hive, presto]>=0.6.0, <0.7'
+    Returns:
+        Requirement: The package name, extras and specifications
+    Raises:
+        ValueError:
+            If the text is not a valid requirement
+    """
+    end = len(text)
+    pos = _skip_space(text, 0)
+
+    # Package name
+    start = pos
+    while pos < end and (text[pos].isalnum() or text[pos] in name_chars):
+        pos += 1
+    if pos == start:
+        raise _lex_error(text)
+    name = text[start:pos]
+    pos = _skip_space(text, pos)
+
+    # Extras
+    extras = []
+    if pos < end and text[pos] == "[":
+        start = pos + 1
+        pos = start
+        while pos < end and text[pos] != "]":
+            pos += 1
+        if pos == end:
+            raise _lex_error(text)
+        extras = [extra.strip() for extra in text[start:pos].split(",")
+                  if extra.strip()]
+        pos = _skip_space(text, pos + 1)
+
+    # Specifications, optionally in parentheses
+    in_parens = pos < end and text[pos] == "("
+    if in_parens:
+        pos = _skip_space(text, pos + 1)
+    specs = []
+    while pos < end and text[pos] in op_chars:
+        # The longest valid operator, as 'spec_exp' matches, so that in
+        # e.g. '<!-' the '!' starts the version
+        op = next((text[pos:pos + length] for length in (3, 2, 1)
+                   if text[pos:pos + length] in ops), None)
+        if op is None:
+            raise _lex_error(text)
+        pos = _skip_space(text, pos + len(op))
+
+        start = pos
+        while pos < end and (text[pos].isalnum() or
+                             text[pos] in version_chars):
+            pos += 1
+        if pos == start:
+            raise _lex_error(text)
+        specs.append((op, text[start:pos]))
+        pos = _skip_space(text, pos)
+
+        if pos < end and text[pos] == ",":
+            pos = _skip_space(text, pos + 1)
+            if pos == end or text[pos] not in op_chars:
+                raise _lex_error(text)
+        else:
+            break
+    if in_parens:
+        if pos == end or text[pos] != ")":
+            raise _lex_error(text)
+        pos = _skip_space(text, pos + 1)
+
+    # Anything left must be a direct reference or environment markers
+    if pos != end and text[pos] not in tail_chars:
+        raise _lex_error(text)
+    return Requirement(name, extras, specs or ["*"])
+
+
+def lex_specs(text):
+    """
+    Parses a comma-separated list of specifications, as found in a Pipfile
+
+    Args:
+        text (str):
+            Specifications, e.g. '>=3.1.1, <=3.1.2', or '*'
+    Returns:
+        list<tuple<str, str>>:
+            (operator, version) tuples, or ["*"] if any version is allowed
+    Raises:
+        ValueError:
+            If the text is not a valid list of specifications
+    """
+    pos = ws_exp.match(text).end()
+    if text.startswith("*", pos):
+        pos = ws_exp.match(text, pos + 1).end()
+        specs = ["*"]
+    else:
+        specs, pos = _lex_specs_at(text, pos)
+    if pos != len(text):
+        raise _lex_error(text)
+    return specs
+
+
+def lex_spec(text):
+    """
+    Splits a single specification into its operator and version
+
+    Args:
+        text (str):
+            A specification, e.g. '>=3.1.1'
+    Returns:
+        tuple<str, str>: The operator and the version
+    Raises:
+        ValueError:
+            If the text is not a valid specification
+    """
+    spec_match = spec_exp.fullmatch(text, ws_exp.match(text).end())
+    if not spec_match:
+        raise _lex_error(text)
+    return spec_match.groups()
+
+
+def canonical_name(name):
+    """
+    Normalizes a package name so that spellings pip considers equal
+    compare equal, e.g. 'Simple_Salesforce' and 'simple-salesforce'
+
+    Args:
+        name (str):
+            A package name
+    Returns:
+        str: The lowercase name with separators replaced by '-'
+    """
+    return name_separator_exp.sub("-", name).lower()
+
+
+def _lex_specs_at(text, pos):
+    """
+    Reads comma-separated specifications starting at 'pos'
+
+    Returns:
+        tuple<list, int>: The specifications and the position after them
+    """
+    specs = []
+    spec_match = spec_exp.match(text, pos)
+    while spec_match:
+        specs.append(spec_match.groups())
+        pos = spec_match.end()
+        comma_match = comma_exp.match(text, pos)
+        if not comma_match:
+            break
+        spec_match = spec_exp.match(text, comma_match.end())
+        if not spec_match:
+            raise _lex_error(text)
+    return specs or ["*"], pos
+
+
+def _skip_space(text, pos):
+    """Returns the position of the first non-whitespace character at or
+    after 'pos'"""
+    end = len(text)
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _lex_error(text):
+    """Error raised for text that cannot be parsed"""
+    return ValueError("Could not parse dependency specification: "
+                      "{!r}".format(text))
+
+
+# Mapping from parsing mode names to requirement parsing functions
+requirement_parsers = {
+    "regex": lex_requirement,
+    "linear": scan_requirement
+}
@@ -0,0 +1,259 @@
+import json
+import os
+
+from pipenv_devcheck.cache import (cache_key, load_entry, setup_key_contents,
+                                   store_entry)
+from pipenv_devcheck.paths import resolve_paths
+
+# Top-level sections of a lock file that the checks read
+LOCK_SECTIONS = ("_meta", "default")
+
+
+def check_lock(setup_path=None, pipfile_path=None, lock_path=None,
+               project_root=None, parser="regex", dynamic_setup=False,
+               use_cache=True, cache_dir=None):
+    """
+    Checks that the versions pinned in Pipfile.lock satisfy the
+    specifications in setup.py, and that the lock is up to date with the
+    Pipfile (its '_meta.hash.sha256' identifies the Pipfile it was generated
+    from). When none of the lock and the dependency files have changed, the
+    cached verdict is reused without parsing anything.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        pipfile_path (str):
+            Path of the Pipfile to read
+        lock_path (str):
+            Path of the lock file. Defaults to 'Pipfile.lock' beside the
+            Pipfile.
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        use_cache (bool):
+            Whether to consult and update the result cache
+        cache_dir (str):
+            The cache directory. Defaults to 'cache.default_cache_dir()'.
+    Returns:
+        dict<str, str>:
+            Dictionary from setup.py dependency names to their locked
+            versions
+    Raises:
+        ValueError:
+            If the lock is out of date, or a locked version is missing or
+            does not satisfy setup.py
+    """
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    if lock_path is None:
+        lock_path = os.path.join(os.path.dirname(pipfile_path),
+                                 "Pipfile.lock")
+
+    entry = None
+    if use_cache:
+        with open(lock_path, "rb") as f:
+            lock_content = f.read()
+        with open(pipfile_path, "rb") as f:
+            pipfile_content = f.read()
+        key = cache_key(b"lock", lock_content, pipfile_content,
+                        *setup_key_contents(setup_path, parser,
+                                            dynamic_setup))
+        entry = load_entry(key, cache_dir)
+    if entry is None:
+        entry = _check_lock_uncached(setup_path, pipfile_path, lock_path,
+                                     parser, dynamic_setup, use_cache)
+        if use_cache:
+            store_entry(key, entry, cache_dir)
+
+    if entry["error"] is not None:
+        raise ValueError(entry["error"])
+    return entry["locked_versions"]
+
+
+def read_lock(lock_path, sections=LOCK_SECTIONS):
+    """
+    Reads top-level sections of a lock file, decoding each one as its key is
+    reached and stopping once all of them have been read. pipenv writes the
+    sections in sorted order, so the 'develop' section after 'default' is
+    never decoded. Package hash arrays in the sections read are decoded, but
+    not kept.
+
+    Args:
+        lock_path (str):
+            Path of the lock file
+        sections (tuple<str>):
+            Names of the top-level sections to read
+    Returns:
+        dict: The sections found, by name
+    Raises:
+        ValueError:
+            If the lock is not valid JSON up to the last section read
+    """
+    from json.decoder import JSONDecodeError, WHITESPACE, scanstring
+
+    with open(lock_path, "r") as f:
+        text = f.read()
+    decoder = json.JSONDecoder(object_pairs_hook=_drop_hashes)
+    lock = {}
+    pos = WHITESPACE.match(text).end()
+    if not text.startswith("{", pos):
+        raise JSONDecodeError("Expecting '{'", text, pos)
+    pos = WHITESPACE.match(text, pos + 1).end()
+    if text.startswith("}", pos):
+        return lock
+    while True:
+        if not text.startswith('"', pos):
+            raise JSONDecodeError("Expecting property name", text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = WHITESPACE.match(text, pos).end()
+        if not text.startswith(":", pos):
+            raise JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = WHITESPACE.match(text, pos + 1).end()
+        # Sections not asked for are decoded too, when they come first
+        value, pos = decoder.raw_decode(text, pos)
+        if key in sections:
+            lock[key] = value
+            if len(lock) == len(sections):
+                return lock
+        pos = WHITESPACE.match(text, pos).end()
+        if text.startswith("}", pos):
+            return lock
+        if not text.startswith(",", pos):
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = WHITESPACE.match(text, pos + 1).end()
+
+
+def read_lock_hash(lock_path, lock=None):
+    """
+    Reads the hash of the Pipfile a lock was generated from
+
+    Args:
+        lock_path (str):
+            Path of the lock file
+        lock (dict):
+            The lock, as returned by 'read_lock', to use instead of reading
+            'lock_path'
+    Returns:
+        str: The value of '_meta.hash.sha256'
+    Raises:
+        ValueError:
+            If the lock has no Pipfile hash
+    """
+    if lock is None:
+        lock = read_lock(lock_path)
+    try:
+        return lock["_meta"]["hash"]["sha256"]
+    except (KeyError, TypeError):
+        raise ValueError("No Pipfile hash found in {}".format(lock_path))
+
+
+def read_lock_default(lock_path, lock=None):
+    """
+    Reads the versions pinned in the top-level 'default' section of a lock
+    file
+
+    Args:
+        lock_path (str):
+            Path of the lock file
+        lock (dict):
+            The lock, as returned by 'read_lock', to use instead of reading
+            'lock_path'
+    Returns:
+        dict<str, str>:
+            Dictionary from canonical package names to pinned versions,
+            e.g. {'pandas': '1.0.0'}. Packages without a pinned version
+            (such as VCS dependencies) are omitted.
+    """
+    from pipenv_devcheck.lexer import canonical_name
+
+    if lock is None:
+        lock = read_lock(lock_path)
+    locked_versions = {}
+    for name, info in lock.get("default", {}).items():
+        version = info.get("version", "") if isinstance(info, dict) else ""
+        if version.startswith("=="):
+            locked_versions[canonical_name(name)] = version[2:]
+    return locked_versions
+
+
+def verify_locked_versions(setup_deps, locked_versions):
+    """
+    Checks that every setup.py dependency is locked to a version its
+    specifications allow
+
+    Args:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        locked_versions (dict<str, str>):
+            Locked versions, as returned by 'read_lock_default'
+    Returns:
+        bool:
+            Whether the check passes - will always be true, otherwise the
+            function will not reach this line.
+    Raises:
+        ValueError:
+            If dependencies are missing from the lock or locked to versions
+            setup.py does not allow
+    """
+    from packaging.version import parse as parse_version
+    from pipenv_devcheck.intervals import contains_version, spec_intervals
+    from pipenv_devcheck.lexer import canonical_name
+
+    missing_deps = []
+    problem_deps = []
+    for dep_name, specs in setup_deps.items():
+        locked_version = locked_versions.get(canonical_name(dep_name))
+        if locked_version is None:
+            missing_deps.append(dep_name)
+        elif not contains_version(spec_intervals(specs),
+                                  parse_version(locked_version)):
+            problem_deps.append("{}=={}".format(dep_name, locked_version))
+
+    if missing_deps or problem_deps:
+        err_msg = "Pipfile.lock does not satisfy setup.py!\n"
+        if missing_deps:
+            err_msg += ("Dependencies in setup.py but not in Pipfile.lock: " +
+                        ", ".join(missing_deps) + "\n")
+        if problem_deps:
+            err_msg += ("Locked versions not allowed by setup.py: " +
+                        ", ".join(problem_deps) + "\n")
+        raise ValueError(err_msg)
+    return True
+
+
+def _check_lock_uncached(setup_path, pipfile_path, lock_path, parser,
+                         dynamic_setup, use_cache):
+    """
+    Parses the dependency files and the lock and checks them, producing a
+    cache entry
+    """
+    import pipfile
+    from pipenv_devcheck.lexer import canonical_name
+    from pipenv_devcheck.pipenv_setup_comp import get_setup_deps
+
+    lock = read_lock(lock_path)
+    if pipfile.load(pipfile_path).hash != read_lock_hash(lock_path, lock):
+        return {"locked_versions": None,
+                "error": "Pipfile.lock is out of date with the Pipfile - "
+                         "run 'pipenv lock' to update it"}
+    setup_deps, _ = get_setup_deps(setup_path, parser, dynamic_setup,
+                                   use_cache=use_cache)
+    locked_versions = read_lock_default(lock_path, lock)
+    try:
+        verify_locked_versions(setup_deps, locked_versions)
+    except ValueError as e:
+        return {"locked_versions": None, "error": e.args[0]}
+    return {"locked_versions": {
+                dep_name: locked_versions[canonical_name(dep_name)]
+                for dep_name in setup_deps},
+            "error": None}
+
+
+def _drop_hashes(pairs):
+    """Builds a JSON object, leaving out package hash arrays"""
+    return {key: value for key, value in pairs if key != "hashes"}
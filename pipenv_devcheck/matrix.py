@@ -0,0 +1,249 @@
+from collections import namedtuple
+
+# Number of release segments encoded per version, and the exclusive upper
+# bound on each segment. Four segments of 15 bits fit in an int64 with room
+# for the two bits marking '.dev0' and inclusivity, and the unbounded keys.
+RELEASE_WIDTH = 4
+SEGMENT_BASE = 1 << 15
+
+# Keys standing in for missing bounds, below and above every encoded version
+_UNBOUNDED_LOWER = -2
+_UNBOUNDED_UPPER = 2 * SEGMENT_BASE ** RELEASE_WIDTH
+
+# Interval bounds as integer keys: twice the encoded version, plus one for an
+# exclusive lower bound or minus one for an exclusive upper bound. Two
+# intervals then intersect exactly when each one's lower key is at most the
+# other's upper key. Rows are padded to a common width with an interval
+# that intersects nothing.
+EncodedInterval = namedtuple("EncodedInterval", ["lower", "upper"])
+_empty_interval = EncodedInterval(2 * _UNBOUNDED_UPPER + 2,
+                                  2 * _UNBOUNDED_LOWER - 2)
+
+# Upper bound on the number of interval comparisons held in memory at once
+_chunk_elements = 1 << 22
+
+
+def compatibility_matrix(left_specs, right_specs=None, vectorize=None):
+    """
+    Computes which specifications of a package are compatible with which
+    others, e.g. the setup.py specifications of every project in a fleet.
+    Each distinct list of specifications is normalized into intervals once.
+    With NumPy installed, release versions are encoded as fixed-width
+    integers and every pair of intervals is compared in vectorized
+    operations. Lists whose bounds cannot be encoded (pre-, post- and
+    development releases other than the '.dev0' bounds of '~=' and '==X.*',
+    local versions, epochs, or releases with more than RELEASE_WIDTH
+    segments or segments of SEGMENT_BASE or more) are compared one pair at a
+    time, as they are without NumPy.
+
+    Args:
+        left_specs (list<list<tuple<str, str>>>):
+            Lists of (operator, version) tuples, or ["*"], for the rows
+        right_specs (list<list<tuple<str, str>>>):
+            Lists of specifications for the columns. Defaults to
+            'left_specs'.
+        vectorize (bool):
+            Whether to use NumPy. Defaults to using it if it is installed.
+    Returns:
+        numpy.ndarray or list<list<bool>>:
+            Boolean matrix whose entry [i][j] is whether some version
+            satisfies both 'left_specs[i]' and 'right_specs[j]' - a NumPy
+            array when vectorized, and nested lists otherwise
+    Raises:
+        ImportError:
+            If 'vectorize' is set but NumPy is not installed
+    """
+    if right_specs is None:
+        right_specs = left_specs
+    if vectorize is None:
+        try:
+            import numpy  # noqa: F401
+            vectorize = True
+        except ImportError:
+            vectorize = False
+
+    left_unique, left_index = _unique_specs(left_specs)
+    right_unique, right_index = _unique_specs(right_specs)
+    if not vectorize:
+        unique_matrix = [[_scalar_compatible(left, right)
+                          for right in right_unique] for left in left_unique]
+        return [[unique_matrix[i][j] for j in right_index]
+                for i in left_index]
+
+    import numpy
+
+    unique_matrix = _vectorized_matrix(left_unique, right_unique)
+    return unique_matrix[numpy.ix_(left_index, right_index)]
+
+
+def encode_version(version):
+    """
+    Encodes a release version, or the first development release of one
+    (such as the '1.5.dev0' upper bound of '~=1.4'), as an integer that
+    orders like the version. A '.dev0' version encodes just below its
+    release and above every earlier release.
+
+    Args:
+        version (packaging.version.Version):
+            The version
+    Returns:
+        int:
+            The encoded version, or None if it is not a plain release (or
+            '.dev0' of one) that fits in RELEASE_WIDTH segments below
+            SEGMENT_BASE
+    """
+    if (version.epoch or version.pre is not None or
+            version.post is not None or version.dev not in (None, 0) or
+            version.local is not None):
+        return None
+    release = version.release
+    if len(release) > RELEASE_WIDTH:
+        return None
+    key = 0
+    for index in range(RELEASE_WIDTH):
+        segment = release[index] if index < len(release) else 0
+        if segment >= SEGMENT_BASE:
+            return None
+        key = key * SEGMENT_BASE + segment
+    return 2 * key - (version.dev == 0)
+
+
+def encode_intervals(intervals):
+    """
+    Encodes intervals as returned by 'spec_intervals'
+
+    Args:
+        intervals (list<Interval>):
+            The intervals
+    Returns:
+        list<EncodedInterval>:
+            The encoded intervals, or None if any bound cannot be encoded
+    """
+    from pipenv_devcheck.intervals import AfterPosts
+
+    encoded = []
+    for interval in intervals:
+        if interval.lower is None:
+            lower = _UNBOUNDED_LOWER
+        elif isinstance(interval.lower, AfterPosts):
+            # Post-releases cannot be encoded, so among encoded versions
+            # the bound falls just above its release
+            lower = encode_version(interval.lower.version)
+        else:
+            lower = encode_version(interval.lower)
+        if interval.upper is None:
+            upper = _UNBOUNDED_UPPER
+        else:
+            upper = encode_version(interval.upper)
+        if lower is None or upper is None:
+            return None
+        encoded.append(EncodedInterval(
+            2 * lower + (not interval.lower_inclusive),
+            2 * upper - (not interval.upper_inclusive)))
+    return encoded
+
+
+def _vectorized_matrix(left_unique, right_unique):
+    """
+    Computes the compatibility of every pair of distinct specification
+    lists, comparing encodable pairs with NumPy and the others one by one
+    """
+    import numpy
+
+    left_encoded, left_scalar = _encode_rows(left_unique)
+    right_encoded, right_scalar = _encode_rows(right_unique)
+    matrix = numpy.zeros((len(left_unique), len(right_unique)), dtype=bool)
+    left_rows = [index for index in range(len(left_unique))
+                 if index not in left_scalar]
+    right_rows = [index for index in range(len(right_unique))
+                  if index not in right_scalar]
+    if left_rows and right_rows:
+        right_arrays = _interval_arrays(
+            [right_encoded[index] for index in right_rows])
+        width = right_arrays[0].shape[1]
+        chunk = max(1, _chunk_elements // (len(right_rows) * width *
+                                           _max_width(left_encoded)))
+        for start in range(0, len(left_rows), chunk):
+            rows = left_rows[start:start + chunk]
+            left_arrays = _interval_arrays(
+                [left_encoded[index] for index in rows])
+            matrix[numpy.ix_(rows, right_rows)] = _intersects(left_arrays,
+                                                              right_arrays)
+
+    scalar_pairs = [(i, j) for i in left_scalar
+                    for j in range(len(right_unique))]
+    scalar_pairs += [(i, j) for i in left_rows for j in right_scalar]
+    for i, j in scalar_pairs:
+        matrix[i, j] = _scalar_compatible(left_unique[i], right_unique[j])
+    return matrix
+
+
+def _intersects(left, right):
+    """
+    Whether any interval of each left row intersects any interval of each
+    right row, by broadcasting every interval against every other
+    """
+    left_lower, left_upper = (array[:, None, :, None] for array in left)
+    right_lower, right_upper = (array[None, :, None, :] for array in right)
+    overlap = (left_lower <= right_upper) & (right_lower <= left_upper)
+    return overlap.any(axis=(2, 3))
+
+
+def _interval_arrays(rows):
+    """
+    Packs rows of encoded intervals into arrays of lower and upper keys,
+    padding every row to the same number of intervals
+    """
+    import numpy
+
+    width = _max_width(rows)
+    padded = [row + [_empty_interval] * (width - len(row)) for row in rows]
+    return (numpy.array([[interval.lower for interval in row]
+                         for row in padded], dtype=numpy.int64),
+            numpy.array([[interval.upper for interval in row]
+                         for row in padded], dtype=numpy.int64))
+
+
+def _encode_rows(unique_specs):
+    """
+    Encodes the intervals of each list of specifications
+
+    Returns:
+        tuple<list, set<int>>:
+            The encoded intervals of each list (None where they cannot be
+            encoded) and the indices of the lists that cannot
+    """
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    encoded = [encode_intervals(spec_intervals(specs))
+               for specs in unique_specs]
+    return encoded, {index for index, row in enumerate(encoded)
+                     if row is None}
+
+
+def _max_width(rows):
+    """The largest number of intervals in any encodable row, at least 1"""
+    return max([len(row) for row in rows if row is not None] + [1])
+
+
+def _unique_specs(specs_lists):
+    """
+    Deduplicates lists of specifications
+
+    Returns:
+        tuple<list, list<int>>:
+            The distinct lists, and the index of each input list among them
+    """
+    positions = {}
+    index = []
+    for specs in specs_lists:
+        index.append(positions.setdefault(tuple(specs), len(positions)))
+    return [list(specs) for specs in positions], index
+
+
+def _scalar_compatible(left, right):
+    """Whether two lists of specifications allow a common version"""
+    from pipenv_devcheck.intervals import intersect
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    return bool(intersect(spec_intervals(left), spec_intervals(right)))
@@ -0,0 +1,29 @@
+import os
+
+
+def resolve_paths(setup_path=None, pipfile_path=None, project_root=None):
+    """
+    Resolves the paths of the dependency files of a project
+
+    Args:
+        setup_path (str):
+            Path of the file declaring the package's dependencies, or None
+            for the first of setup.py, setup.cfg and pyproject.toml in the
+            project root that declares any (see
+            'readers.find_setup_source')
+        pipfile_path (str):
+            Path of the Pipfile, or None for the default
+        project_root (str):
+            Directory containing the dependency files, or None for the
+            current directory
+    Returns:
+        tuple<str, str>: The paths of the setup file and the Pipfile
+    """
+    project_root = project_root or ""
+    if setup_path:
+        setup_path = os.path.join(project_root, setup_path)
+    else:
+        from pipenv_devcheck.readers import find_setup_source
+        setup_path = find_setup_source(project_root)
+    pipfile_path = os.path.join(project_root, pipfile_path or "Pipfile")
+    return setup_path, pipfile_path
@@ -0,0 +1,186 @@
+from collections import namedtuple
+import functools
+import threading
+import time
+
+# Measurements of one run of a phase, passed to the end callbacks. 'deps' is
+# the number of dependencies the phase processed, or None if it raised, and
+# 'peak_bytes' the peak memory it allocated, or None if tracemalloc is not
+# tracing or cannot reset its peak (before Python 3.9).
+PhaseStats = namedtuple("PhaseStats",
+                        ["name", "seconds", "deps", "peak_bytes"])
+
+# Registered (on_start, on_end) pairs. Phases only measure anything while
+# this list is non-empty.
+_hooks = []
+# Per-thread stack of the phases running, for attributing peak memory
+_local = threading.local()
+
+
+def add_hook(on_start=None, on_end=None):
+    """
+    Registers callbacks run around every phase of a check
+
+    Args:
+        on_start (callable):
+            Called with the phase's name when it starts
+        on_end (callable):
+            Called with the phase's PhaseStats when it ends, including when
+            it raises
+    Returns:
+        tuple: A handle for 'remove_hook'
+    """
+    hook = (on_start, on_end)
+    _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    """
+    Unregisters callbacks registered with 'add_hook'
+
+    Args:
+        hook (tuple):
+            The handle returned by 'add_hook'
+    """
+    _hooks.remove(hook)
+
+
+def count_input(args, result):
+    """Counts the dependencies passed to a phase as its first argument"""
+    return len(args[0]) if args else None
+
+
+def count_output(args, result):
+    """Counts the dependencies a phase returns"""
+    return len(result)
+
+
+def phase(name, count=count_input):
+    """
+    Decorates a function as a phase of a check. While no hooks are
+    registered, calling the function only costs one extra call and a check
+    of the hook list.
+
+    Args:
+        name (str):
+            Name of the phase passed to the hooks
+        count (callable):
+            Computes the number of dependencies processed from the
+            function's positional arguments and its result, e.g.
+            'count_input' or 'count_output'
+    Returns:
+        callable: The decorator
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return fn(*args, **kwargs)
+            return _run_phase(name, count, fn, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def record_timings(trace_memory=True):
+    """
+    Starts collecting the stats of every phase
+
+    Args:
+        trace_memory (bool):
+            Whether to start tracemalloc so that peak memory is measured.
+            Tracing slows allocations down, which inflates the wall times.
+            Peak memory is not measured before Python 3.9.
+    Returns:
+        tuple<list<PhaseStats>, callable>:
+            The list stats are appended to as phases end, and a function
+            that stops collecting
+    """
+    import tracemalloc
+
+    stats = []
+    hook = add_hook(on_end=stats.append)
+    started_tracing = (trace_memory and _can_measure_peak() and
+                       not tracemalloc.is_tracing())
+    if started_tracing:
+        tracemalloc.start()
+
+    def stop():
+        remove_hook(hook)
+        if started_tracing:
+            tracemalloc.stop()
+    return stats, stop
+
+
+def format_timings(stats):
+    """
+    Renders phase stats as a table
+
+    Args:
+        stats (list<PhaseStats>):
+            The stats to render, in the order phases ended
+    Returns:
+        str: One line per phase, with a header
+    """
+    lines = ["{:<24}{:>12}{:>8}{:>12}".format("phase", "wall", "deps",
+                                               "peak mem")]
+    for stat in stats:
+        lines.append("{:<24}{:>9.2f} ms{:>8}{:>12}".format(
+            stat.name, stat.seconds * 1000,
+            "-" if stat.deps is None else stat.deps,
+            "-" if stat.peak_bytes is None
+            else "{:.1f} KiB".format(stat.peak_bytes / 1024)))
+    return "\n".join(lines)
+
+
+def _run_phase(name, count, fn, args, kwargs):
+    """Runs a phase, calling the hooks and measuring it"""
+    import tracemalloc
+
+    hooks = list(_hooks)
+    for on_start, _ in hooks:
+        if on_start is not None:
+            on_start(name)
+
+    tracing = _can_measure_peak() and tracemalloc.is_tracing()
+    stack = _phase_stack()
+    if tracing:
+        # The enclosing phase's peak so far must be kept before resetting
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        stack.append([current, current])
+    deps = None
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        deps = count(args, result)
+        return result
+    finally:
+        seconds = time.perf_counter() - start
+        peak_bytes = None
+        if tracing:
+            start_bytes, nested_peak = stack.pop()
+            peak = max(tracemalloc.get_traced_memory()[1], nested_peak)
+            peak_bytes = peak - start_bytes
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+        stats = PhaseStats(name, seconds, deps, peak_bytes)
+        for _, on_end in hooks:
+            if on_end is not None:
+                on_end(stats)
+
+
+def _phase_stack():
+    """The calling thread's stack of [start bytes, nested peak] entries"""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _can_measure_peak():
+    """Whether tracemalloc can reset its peak, which Python 3.9 added"""
+    import tracemalloc
+
+    return hasattr(tracemalloc, "reset_peak")
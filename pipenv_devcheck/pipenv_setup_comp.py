@@ -1,111 +1,303 @@
-import ast
-from packaging.version import parse as parse_version
-import pipfile
-import re
+from collections import namedtuple
+import os
 
-from pipenv_devcheck.check_fns import check_fn_mapping
-from pipenv_devcheck.regexps import (setup_spec_exp, setup_extras_exp,
-                                     setup_extras_w_name_exp,
-                                     spec_exp, split_exp)
+from pipenv_devcheck.paths import resolve_paths
+from pipenv_devcheck.phases import count_output, phase
 
+# The modules used by each phase (ast, tomllib, packaging, the lexer, the
+# result cache and the process pool) are imported by the functions that need
+# them, so that the startup cost of the command-line tool only covers the
+# phases that actually run.
 
-def compare_deps():
+
+def compare_deps(setup_path=None, pipfile_path=None, project_root=None,
+                 parser="regex", dynamic_setup=False, use_cache=True):
     """
-    Main wrapper around reading dependencies and running all checks
+    Main wrapper around reading dependencies and running all checks.
+    Only the given paths are read - the working directory and other global
+    state are never consulted or changed, so this is safe to call
+    concurrently from several threads.
 
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read. Defaults to 'setup.py' in
+            'project_root'. Relative paths are resolved against
+            'project_root' when it is given.
+        pipfile_path (str):
+            Path of the Pipfile to read. Defaults to 'Pipfile' in
+            'project_root'. Relative paths are resolved against
+            'project_root' when it is given.
+        project_root (str):
+            Directory containing the dependency files. Defaults to the
+            current directory.
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        use_cache (bool):
+            Whether such an evaluation may be served from and stored in the
+            result cache
     Returns:
         tuple<dict<str, list<tuple<str, str>>>:
             Dictionaries of the dependencies found in setup.py and the Pipfile
     """
-    setup_deps, setup_extras = get_setup_deps()
-    pipfile_deps, pipfile_extras = get_pipfile_deps()
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    setup_deps, setup_extras = get_setup_deps(setup_path, parser,
+                                              dynamic_setup,
+                                              use_cache=use_cache)
+    pipfile_deps, pipfile_extras = get_pipfile_deps(pipfile_path)
     run_checks(setup_deps, setup_extras, pipfile_deps, pipfile_extras)
     return setup_deps, pipfile_deps
 
 
-def get_setup_deps():
+# Aggregated outcome of checking a single project in batch mode
+ProjectResult = namedtuple("ProjectResult", ["project", "passed", "error"])
+
+
+def compare_deps_batch(project_roots, processes=None, use_cache=False,
+                       dynamic_setup=False, parser="regex"):
+    """
+    Reads dependencies and runs all checks for many projects at once,
+    spreading the projects across a process pool so that interpreter and
+    import startup is only paid once per worker rather than once per project
+
+    Args:
+        project_roots (list<str>):
+            Directories containing a setup.py and a Pipfile
+        processes (int):
+            Number of worker processes to use. Defaults to the number of
+            CPUs on the machine.
+        use_cache (bool):
+            Whether to reuse results for projects whose dependency files
+            have not changed since they were last checked
+        dynamic_setup (bool):
+            Whether to evaluate setup.py files in a subprocess when their
+            dependencies cannot be read statically
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+    Returns:
+        list<ProjectResult>:
+            One result per project, in the same order as 'project_roots'
+    """
+    project_roots = list(project_roots)
+    if not project_roots:
+        return []
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(project_roots))
+    if processes == 1:
+        return [check_project(root, use_cache, dynamic_setup, parser)
+                for root in project_roots]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(project_roots) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(check_project, project_roots,
+                                 [use_cache] * len(project_roots),
+                                 [dynamic_setup] * len(project_roots),
+                                 [parser] * len(project_roots),
+                                 chunksize=chunksize))
+
+
+def check_project(project_root, use_cache=False, dynamic_setup=False,
+                  parser="regex"):
+    """
+    Reads dependencies and runs all checks for the project in
+    'project_root', capturing any failure instead of raising it
+
+    Args:
+        project_root (str):
+            Directory containing a setup.py and a Pipfile
+        use_cache (bool):
+            Whether to consult and update the result cache
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+    Returns:
+        ProjectResult: The outcome of the checks for this project
+    """
+    try:
+        if use_cache:
+            from pipenv_devcheck.cache import cached_compare_deps
+            cached_compare_deps(project_root=project_root, parser=parser,
+                                dynamic_setup=dynamic_setup)
+        else:
+            compare_deps(project_root=project_root, parser=parser,
+                         dynamic_setup=dynamic_setup, use_cache=False)
+    except Exception as e:
+        return ProjectResult(project_root, False,
+                             "{}: {}".format(type(e).__name__, e))
+    return ProjectResult(project_root, True, None)
+
+
+def get_setup_deps(filename="setup.py", parser="regex", dynamic=False,
+                   text=None, use_cache=True):
     """
     Parses dependencies from setup.py and
     returns them as a dictionary
 
+    Args:
+        filename (str):
+            Path of the file to read: setup.py, setup.cfg or pyproject.toml
+        parser (str):
+            Requirement parsing mode, a key of 'requirement_parsers'. Use
+            "linear" for a guaranteed linear-time parse of untrusted input.
+        dynamic (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        text (str):
+            Contents of the file to parse instead of reading 'filename'
+        use_cache (bool):
+            Whether a dynamic evaluation may be served from and stored in
+            the result cache
     Returns:
         setup_deps (dict<str, list<tuple<str, str>>>):
             Dictionary of the dependencies found in setup.py
         setup_extras (dict<str, list<str>>):
             Dictionary of extras specified in setup.py
     """
-    setup_deps_str = read_setup()
+    return parse_setup_deps(read_setup(filename, dynamic, text, use_cache),
+                            parser)
+
 
+@phase("parse_setup_deps")
+def parse_setup_deps(setup_deps_str, parser="regex"):
+    """
+    Parses dependency specification strings, as read from setup.py, into
+    dictionaries
+
+    Args:
+        setup_deps_str (list<str>):
+            The dependency lines from setup.py
+        parser (str):
+            Requirement parsing mode, a key of 'requirement_parsers'
+    Returns:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        setup_extras (dict<str, list<str>>):
+            Dictionary of extras specified in setup.py
+    """
+    from pipenv_devcheck.lexer import requirement_parsers
+
+    parse_requirement = requirement_parsers[parser]
     setup_extras = {}
-    for i in range(len(setup_deps_str)):
-        current_dep_str = setup_deps_str[i]
-        extras_match = re.search(setup_extras_exp, current_dep_str)
-        if extras_match:
-            extras_info = re.findall(setup_extras_w_name_exp,
-                                     current_dep_str)[0]
-            dep = extras_info[0]
-            extras = [extra.strip() for extra in extras_info[1].split(',')]
-            setup_extras[dep] = extras
-
-            setup_deps_str[i] = (current_dep_str[:extras_match.start()] +
-                                 current_dep_str[extras_match.end():])
     setup_deps = {}
-    for dep in setup_deps_str:
-        parsed_dep = re.findall(setup_spec_exp, dep)
-        if len(parsed_dep):
-            parsed_dep = parsed_dep[0]
-            dep_name = parsed_dep[0]
-            if dep_name in setup_deps.keys():
-                raise ValueError('Dependency {} appears multiple times in '
-                                 'setup file.'.format(dep_name))
-            setup_deps.update({dep_name: [spec for spec in parsed_dep[1:]
-                                          if spec != ""]})
-        else:
-            setup_deps.update({dep: ["*"]})
-
-    setup_deps = split_ops_and_versions(setup_deps)
+    for dep_str in setup_deps_str:
+        dep_name, extras, specs = parse_requirement(dep_str)
+        if dep_name in setup_deps.keys():
+            raise ValueError('Dependency {} appears multiple times in '
+                             'setup file.'.format(dep_name))
+        if extras:
+            setup_extras[dep_name] = extras
+        setup_deps[dep_name] = specs
     return setup_deps, setup_extras
 
 
-def read_setup():
+@phase("read_setup", count_output)
+def read_setup(filename="setup.py", dynamic=False, text=None,
+               use_cache=True):
     """
-    Reads dependencies from setup.py and does preprocessing
+    Reads dependencies from setup.py, setup.cfg or pyproject.toml and does
+    preprocessing
 
+    Args:
+        filename (str):
+            Path of the file to read, as for 'read_setup_groups'
+        dynamic (bool):
+            Whether to fall back to evaluating the file in a subprocess
+            when its dependencies cannot be read statically. Only used when
+            reading from 'filename'.
+        text (str):
+            Contents of setup.py to parse instead of reading 'filename',
+            which is then only used in error messages
+        use_cache (bool):
+            Whether a dynamic evaluation may be served from and stored in
+            the result cache
     Returns:
         list<str>: A list of the dependency lines from setup.py
     """
-    filename = "setup.py"
-    with open(filename, "r") as f:
-        setup_tree = ast.parse(f.read(), filename)
-    for node in ast.walk(setup_tree):
-        is_setup_node = (hasattr(node, "func") and
-                         hasattr(node.func, "id") and
-                         node.func.id == "setup")
-        if is_setup_node:
-            setup_node = node
-
     deps = []
-    for kw in setup_node.keywords:
-        if kw.arg == "install_requires":
-            deps.extend(ast.literal_eval(kw.value))
-        if kw.arg == "extras_require":
-            for extra_deps in ast.literal_eval(kw.value).values():
-                deps.extend(extra_deps)
+    for group_deps in read_setup_groups(filename, dynamic, text,
+                                        use_cache).values():
+        deps.extend(group_deps)
     return deps
 
 
-def get_pipfile_deps():
+def read_setup_groups(filename="setup.py", dynamic=False, text=None,
+                      use_cache=True):
+    """
+    Reads dependencies from setup.py, setup.cfg or pyproject.toml, keeping
+    'install_requires' and each extras group apart. The file is read by the
+    reader registered for its name in 'readers.readers', and any other name
+    is read as a setup.py script.
+
+    Args:
+        filename (str):
+            Path of the file to read
+        dynamic (bool):
+            Whether to fall back to evaluating setup.py in a subprocess
+            when its dependencies cannot be read statically. Only used when
+            reading from 'filename'.
+        text (str):
+            Contents of the file to parse instead of reading 'filename',
+            which then only chooses the reader and appears in error messages
+        use_cache (bool):
+            Whether a dynamic evaluation may be served from and stored in
+            the result cache
+    Returns:
+        dict<str, list<str>>:
+            Dictionary from group names to their dependency lines. The
+            'install_requires' group comes first, followed by each extra.
+    """
+    from pipenv_devcheck.readers import reader_for
+
+    return reader_for(filename).read(filename, text, dynamic, use_cache)
+
+
+def get_pipfile_deps(filename="Pipfile", text=None):
     """
     Parses dependencies from  Pipfile and
     returns them as a dictionary
 
+    Args:
+        filename (str):
+            Path of the Pipfile to read
+        text (str):
+            Contents of the Pipfile to parse instead of reading 'filename'
     Returns:
         pipfile_deps (dict<str, list<tuple<str, str>>>):
             Dictionary of the dependencies found in the Pipfile
         pipfile_extras (dict<str, list<str>>):
             Dictionary of extras specified in the Pipfile
     """
-    pipfile_deps = read_pipfile()
+    return parse_pipfile_deps(read_pipfile(filename, text))
+
+
+@phase("parse_pipfile_deps")
+def parse_pipfile_deps(pipfile_deps):
+    """
+    Parses the version specifications of dependencies, as read from the
+    Pipfile, in place
+
+    Args:
+        pipfile_deps (dict<str, object>):
+            The Pipfile's packages, as returned by 'read_pipfile', from
+            package names to specification strings or dictionaries
+    Returns:
+        pipfile_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in the Pipfile
+        pipfile_extras (dict<str, list<str>>):
+            Dictionary of extras specified in the Pipfile
+    """
+    from pipenv_devcheck.lexer import lex_specs
 
     pipfile_extras = {}
     for dep in pipfile_deps.keys():
@@ -113,28 +305,52 @@ def get_pipfile_deps():
         if isinstance(dep_spec, dict):
             if 'extras' in dep_spec:
                 pipfile_extras[dep] = dep_spec['extras']
-            dep_spec = dep_spec['version']
-        pipfile_deps[dep] = re.findall(spec_exp, dep_spec)
-
-    pipfile_deps = split_ops_and_versions(pipfile_deps)
+            dep_spec = dep_spec.get('version', '*')
+        pipfile_deps[dep] = lex_specs(dep_spec)
 
     return pipfile_deps, pipfile_extras
 
 
-def read_pipfile():
+@phase("read_pipfile", count_output)
+def read_pipfile(filename="Pipfile", text=None):
     """
     Reads dependencies from Pipfile and does preprocessing
 
+    Args:
+        filename (str):
+            Path of the Pipfile to read
+        text (str):
+            Contents of the Pipfile to parse instead of reading 'filename'
     Returns:
         dict<str, str>: A dict of the dependencies in Pipfile, from
         package name keys to version specification values
     """
-    filename = "Pipfile"
-    pipfile_data = pipfile.load(filename).data
-    pipfile_deps = pipfile_data["default"]
-    return pipfile_deps
+    from pipenv_devcheck.readers import reader_for
+
+    return reader_for(filename, "Pipfile").read(filename, text)
+
+
+def read_pipfile_sections(filename="Pipfile", text=None):
+    """
+    Reads every section of the Pipfile that lists packages: '[packages]',
+    '[dev-packages]' and any custom package categories
+
+    Args:
+        filename (str):
+            Path of the Pipfile to read
+        text (str):
+            Contents of the Pipfile to parse instead of reading 'filename'
+    Returns:
+        dict<str, dict<str, object>>:
+            Dictionary from section names to the packages they list, as
+            returned by 'read_pipfile' for '[packages]'
+    """
+    from pipenv_devcheck.readers import reader_for
+
+    return reader_for(filename, "Pipfile").read_sections(filename, text)
 
 
+@phase("split_ops_and_versions")
 def split_ops_and_versions(deps):
     """
     Splits string values in dependency dictionary into tuples containing
@@ -149,10 +365,12 @@ def split_ops_and_versions(deps):
             Dependency dictionary with operator/version string values split
             into tuples
     """
+    from pipenv_devcheck.version_cache import lex_spec
+
     for dep in deps.keys():
         specs = deps[dep]
         if not (len(specs) == 1 and specs[0] == "*"):
-            deps[dep] = [re.findall(split_exp, spec)[0] for spec in specs]
+            deps[dep] = [lex_spec(spec) for spec in specs]
     return deps
 
 
@@ -165,6 +383,7 @@ def run_checks(setup_deps, setup_extras, pipfile_deps, pipfile_extras):
     extras_equality_check(setup_extras, pipfile_extras)
 
 
+@phase("name_equality_check")
 def name_equality_check(setup_deps, pipfile_deps):
     """
     Checks that all names present in either dependency file are present
@@ -203,6 +422,7 @@ def name_equality_check(setup_deps, pipfile_deps):
     return True
 
 
+@phase("version_check")
 def version_check(setup_deps, pipfile_deps):
     """
     Checks that the dependency specifications in either dependency file are
@@ -225,29 +445,9 @@ def version_check(setup_deps, pipfile_deps):
         ValueError:
             If there are discrepancies between version specifications
     """
-    problem_deps = []
-    for dep_name, setup_dep_specs in setup_deps.items():
-        pipfile_dep_specs = pipfile_deps[dep_name]
-
-        for setup_dep_spec in setup_dep_specs:
-            setup_op = setup_dep_spec[0]
-            if not setup_op == "*":
-                setup_version = parse_version(setup_dep_spec[1])
-
-                check_fn = check_fn_mapping[setup_op]
-                check_args = {}
-                check_args["left_op"] = setup_op
-                check_args["left_version"] = setup_version
-
-                for pipfile_dep_spec in pipfile_dep_specs:
-                    pipfile_op = pipfile_dep_spec[0]
-                    if not pipfile_op == "*":
-                        pipfile_version = parse_version(pipfile_dep_spec[1])
-                        check_args["right_op"] = pipfile_op
-                        check_args["right_version"] = pipfile_version
-
-                        if not check_fn(**check_args):
-                            problem_deps.append(dep_name)
+    problem_deps = [dep_name for dep_name, overlap
+                    in version_overlaps(setup_deps, pipfile_deps).items()
+                    if not overlap]
 
     if len(problem_deps):
         raise ValueError(
@@ -257,6 +457,38 @@ def version_check(setup_deps, pipfile_deps):
     return True
 
 
+def version_overlaps(setup_deps, pipfile_deps):
+    """
+    Computes, for each dependency, the range of versions allowed by both
+    dependency files. Each side's specifications are normalized into
+    intervals once, so the comparison is a single merge of sorted intervals
+    rather than a comparison of every pair of specifications. Intervals and
+    versions are memoized by 'version_cache', so specifications recurring
+    across packages and projects are parsed once.
+
+    Args:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary from setup.py dependency name keys to a list of
+            tuples as a value, with the tuples containing
+            a comparision operator and a version specification.
+        pipfile_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary from Pipfile dependency name keys to a list of
+            tuples as a value, with the tuples containing
+            a comparision operator and a version specification.
+    Returns:
+        dict<str, list<Interval>>:
+            Dictionary from dependency names to the intervals of versions
+            satisfying both files - an empty list marks a discrepancy
+    """
+    from pipenv_devcheck.intervals import intersect
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    return {dep_name: intersect(spec_intervals(setup_dep_specs),
+                                spec_intervals(pipfile_deps[dep_name]))
+            for dep_name, setup_dep_specs in setup_deps.items()}
+
+
+@phase("extras_equality_check")
 def extras_equality_check(setup_extras, pipfile_extras):
     """
     Checks that all packages that specify extras in one dependency file
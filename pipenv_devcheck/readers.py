@@ -0,0 +1,417 @@
+from collections import namedtuple
+import os
+
+# Name of the group of setup.py dependencies given by 'install_requires'
+INSTALL_REQUIRES = "install_requires"
+
+# Reasons a reader can give for skipping its source file
+ABSENT = "absent"
+UNCHANGED = "unchanged"
+
+# Whether a reader can skip reading its source file, and why. 'signature'
+# identifies the file's current state, to pass to the next call.
+SkipCheck = namedtuple("SkipCheck", ["skip", "reason", "signature"])
+
+# Pipfile sections that do not list packages
+_non_package_sections = {"source", "requires", "pipenv", "scripts"}
+
+
+class Reader:
+    """
+    Reads the dependencies declared in one kind of file. Readers of package
+    metadata (setup.py, setup.cfg, pyproject.toml) return dependency lines
+    by group, and the Pipfile reader returns its packages.
+
+    Attributes:
+        filename (str):
+            The file's conventional name
+        markers (tuple<str>):
+            Text that appears in any such file declaring dependencies
+    """
+    filename = None
+    markers = ()
+
+    def read(self, path, text=None, dynamic=False, use_cache=True):
+        """
+        Reads the dependencies declared in a file
+
+        Args:
+            path (str):
+                Path of the file to read
+            text (str):
+                Contents of the file to parse instead of reading 'path',
+                which is then only used in error messages
+            dynamic (bool):
+                Whether to fall back to evaluating the file when its
+                dependencies cannot be read statically, if the reader
+                supports it
+            use_cache (bool):
+                Whether such an evaluation may be served from and stored
+                in the result cache
+        Returns:
+            dict: The dependencies, in the reader's format
+        """
+        raise NotImplementedError
+
+    def can_skip(self, path, signature=None):
+        """
+        Reports whether reading a file can be skipped, because it is absent
+        or unchanged since its signature was last taken
+
+        Args:
+            path (str):
+                Path of the file
+            signature (tuple):
+                The file's signature when it was last read, or None
+        Returns:
+            SkipCheck: The verdict and the file's current signature
+        """
+        current = file_signature(path)
+        if current is None:
+            return SkipCheck(True, ABSENT, None)
+        if current == signature:
+            return SkipCheck(True, UNCHANGED, current)
+        return SkipCheck(False, None, current)
+
+    def declares_deps(self, text):
+        """
+        Cheaply checks whether a file's contents may declare dependencies,
+        without parsing them
+
+        Args:
+            text (str):
+                The file's contents
+        Returns:
+            bool: Whether any of the reader's markers appear in the text
+        """
+        return any(marker in text for marker in self.markers)
+
+
+class SetupPyReader(Reader):
+    """
+    Reads the 'install_requires' and 'extras_require' arguments of the
+    setup() call in setup.py, without running it
+    """
+    filename = "setup.py"
+    markers = ("install_requires", "extras_require")
+
+    def read(self, path, text=None, dynamic=False, use_cache=True):
+        """
+        Returns:
+            dict<str, list<str>>:
+                Dictionary from group names to their dependency lines. The
+                'install_requires' group comes first, followed by each extra.
+        Raises:
+            ValueError:
+                If there is no setup() call, or its dependencies are not
+                literals or module-level constants and 'dynamic' is not set.
+                Setting 'text' disables 'dynamic'.
+        """
+        import ast
+        from pipenv_devcheck.setup_locator import evaluate, find_setup_call
+
+        if text is None:
+            text = _read_text(path)
+        else:
+            dynamic = False
+        setup_tree = ast.parse(text, path)
+        try:
+            setup_node, constants = find_setup_call(setup_tree)
+            if setup_node is None:
+                raise ValueError("No setup() call found in {}".format(path))
+
+            groups = {INSTALL_REQUIRES: []}
+            for kw in setup_node.keywords:
+                if kw.arg == "install_requires":
+                    groups[INSTALL_REQUIRES].extend(_requirement_list(
+                        evaluate(kw.value, constants), kw.arg, path))
+                if kw.arg == "extras_require":
+                    extras = evaluate(kw.value, constants)
+                    if not isinstance(extras, dict):
+                        raise ValueError(
+                            "extras_require in {} is not a dictionary"
+                            .format(path))
+                    for extra, extra_deps in extras.items():
+                        if not isinstance(extra, str):
+                            raise ValueError(
+                                "extras_require in {} has a key that is not "
+                                "a string: {!r}".format(path, extra))
+                        groups.setdefault(extra, []).extend(
+                            _requirement_list(extra_deps, extra, path))
+        except ValueError:
+            if not dynamic:
+                raise
+            from pipenv_devcheck.dynamic_setup import evaluate_setup
+            setup_kwargs = evaluate_setup(path, use_cache=use_cache)
+            groups = {INSTALL_REQUIRES: list(
+                setup_kwargs["install_requires"])}
+            for extra, extra_deps in setup_kwargs["extras_require"].items():
+                groups.setdefault(extra, []).extend(extra_deps)
+        return groups
+
+
+class SetupCfgReader(Reader):
+    """
+    Reads 'install_requires' from the '[options]' section of setup.cfg, and
+    the extras from '[options.extras_require]'
+    """
+    filename = "setup.cfg"
+    markers = ("install_requires", "extras_require")
+
+    def read(self, path, text=None, dynamic=False, use_cache=True):
+        """
+        Returns:
+            dict<str, list<str>>:
+                Dictionary from group names to their dependency lines
+        Raises:
+            ValueError:
+                If the file is not valid, or its dependencies are read from
+                other files with 'file:'
+        """
+        import configparser
+
+        if text is None:
+            text = _read_text(path)
+        config = configparser.ConfigParser(interpolation=None)
+        try:
+            config.read_string(text, path)
+        except configparser.Error as e:
+            raise ValueError("Invalid {}: {}".format(path, e))
+
+        groups = {INSTALL_REQUIRES: _cfg_list(
+            config.get("options", "install_requires", fallback=""), path)}
+        if config.has_section("options.extras_require"):
+            for extra, value in config.items("options.extras_require"):
+                groups[extra] = _cfg_list(value, path)
+        return groups
+
+
+class PyprojectReader(Reader):
+    """
+    Reads the PEP 621 'dependencies' and 'optional-dependencies' of the
+    '[project]' table in pyproject.toml
+    """
+    filename = "pyproject.toml"
+    markers = ("dependencies",)
+
+    def read(self, path, text=None, dynamic=False, use_cache=True):
+        """
+        Returns:
+            dict<str, list<str>>:
+                Dictionary from group names to their dependency lines
+        Raises:
+            ValueError:
+                If the file is not valid TOML, or its dependencies are
+                declared dynamic
+        """
+        if text is None:
+            text = _read_text(path)
+        project = load_toml(text).get("project", {})
+        dynamic_fields = set(project.get("dynamic", [])).intersection(
+            ("dependencies", "optional-dependencies"))
+        if dynamic_fields:
+            raise ValueError("{} declares {} dynamic, so they cannot be read "
+                             "statically".format(
+                                 path, " and ".join(sorted(dynamic_fields))))
+
+        groups = {INSTALL_REQUIRES: list(project.get("dependencies", []))}
+        for extra, extra_deps in project.get("optional-dependencies",
+                                             {}).items():
+            groups[extra] = list(extra_deps)
+        return groups
+
+
+class PipfileReader(Reader):
+    """
+    Reads the packages listed in a Pipfile
+    """
+    filename = "Pipfile"
+    markers = ("packages",)
+
+    def read(self, path, text=None, dynamic=False, use_cache=True):
+        """
+        Returns:
+            dict<str, object>:
+                The '[packages]' section, from package names to
+                specification strings or dictionaries
+        """
+        return self.read_sections(path, text)["packages"]
+
+    def read_sections(self, path, text=None):
+        """
+        Reads every section that lists packages: '[packages]',
+        '[dev-packages]' and any custom package categories
+
+        Args:
+            path (str):
+                Path of the Pipfile to read
+            text (str):
+                Contents of the Pipfile to parse instead of reading 'path'
+        Returns:
+            dict<str, dict<str, object>>:
+                Dictionary from section names to the packages they list
+        """
+        if text is None:
+            text = _read_text(path)
+        pipfile_data = load_toml(text)
+        sections = {"packages": pipfile_data.get("packages", {}),
+                    "dev-packages": pipfile_data.get("dev-packages", {})}
+        for section, packages in pipfile_data.items():
+            if (isinstance(packages, dict) and
+                    section not in _non_package_sections):
+                sections.setdefault(section, packages)
+        return sections
+
+
+# Mapping from file names to the readers for them. Other readers can be
+# added with 'register_reader'.
+readers = {
+    "setup.py": SetupPyReader(),
+    "setup.cfg": SetupCfgReader(),
+    "pyproject.toml": PyprojectReader(),
+    "Pipfile": PipfileReader()
+}
+
+# Files that may declare a package's dependencies, in order of preference
+setup_sources = ["setup.py", "setup.cfg", "pyproject.toml"]
+
+
+def register_reader(filename, reader, setup_source=False):
+    """
+    Adds or replaces the reader used for files with a given name
+
+    Args:
+        filename (str):
+            The file name, e.g. 'setup.cfg'
+        reader (Reader):
+            The reader
+        setup_source (bool):
+            Whether the file declares a package's dependencies, and should
+            be looked for when no setup path is given
+    """
+    readers[filename] = reader
+    if setup_source and filename not in setup_sources:
+        setup_sources.append(filename)
+
+
+def reader_for(path, default="setup.py"):
+    """
+    Chooses the reader for a file by its name
+
+    Args:
+        path (str):
+            Path of the file
+        default (str):
+            Name of the reader used for files with other names, e.g.
+            'setup.py' for a renamed setup script
+    Returns:
+        Reader: The reader for the file
+    """
+    return readers.get(os.path.basename(path), readers[default])
+
+
+def find_setup_source(project_root=None):
+    """
+    Finds the file declaring a project's dependencies: the first of
+    'setup_sources' present in the project that appears to declare any, so
+    that a setup.py shim is passed over for the setup.cfg beside it
+
+    Args:
+        project_root (str):
+            Directory containing the project, or None for the current
+            directory
+    Returns:
+        str:
+            Path of the file - the first present if none appears to declare
+            dependencies, or setup.py if none is present
+    """
+    project_root = project_root or ""
+    first_present = None
+    for filename in setup_sources:
+        path = os.path.join(project_root, filename)
+        reader = readers[filename]
+        if reader.can_skip(path).reason == ABSENT:
+            continue
+        try:
+            text = _read_text(path)
+        except (OSError, UnicodeDecodeError):
+            continue
+        if reader.declares_deps(text):
+            return path
+        first_present = first_present or path
+    return first_present or os.path.join(project_root, setup_sources[0])
+
+
+def file_signature(path):
+    """
+    Identifies the state of a file without reading it
+
+    Args:
+        path (str):
+            Path of the file
+    Returns:
+        tuple<int, int, int>:
+            The file's modification time in nanoseconds, size and inode, or
+            None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def load_toml(text):
+    """
+    Parses TOML with the standard library's 'tomllib' where available,
+    falling back to its 'tomli' backport on Python versions before 3.11
+
+    Args:
+        text (str):
+            The TOML document
+    Returns:
+        dict: The parsed document
+    Raises:
+        ValueError:
+            If the document is not valid TOML
+    """
+    try:
+        import tomllib
+    except ImportError:
+        import tomli as tomllib
+    return tomllib.loads(text)
+
+
+def _read_text(path):
+    """Reads a file as text"""
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _requirement_list(value, name, path):
+    """
+    Checks that a setup() argument lists requirements - as a list or tuple
+    of strings, or a string of one requirement per line - and returns them
+    as a list
+    """
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    if (isinstance(value, (list, tuple)) and
+            all(isinstance(item, str) for item in value)):
+        return list(value)
+    raise ValueError("{} in {} is not a list of requirement strings: {!r}"
+                     .format(name, path, value))
+
+
+def _cfg_list(value, path):
+    """Splits a setup.cfg list option into its lines, dropping comments"""
+    if value.strip().startswith("file:"):
+        raise ValueError("{} reads dependencies from other files with "
+                         "'file:', so they cannot be read statically".format(
+                             path))
+    items = []
+    for line in value.splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if line and not line.startswith("#"):
+            items.append(line)
+    return items
@@ -0,0 +1,219 @@
+import json
+
+from pipenv_devcheck.paths import resolve_paths
+from pipenv_devcheck.phases import phase
+
+# Names of the checks a finding can come from
+NAME_CHECK = "name"
+VERSION_CHECK = "version"
+EXTRAS_CHECK = "extras"
+
+
+class Finding:
+    """
+    A single problem found while comparing the dependency files
+
+    Attributes:
+        package (str):
+            Name of the dependency concerned
+        check (str):
+            The check that failed: NAME_CHECK, VERSION_CHECK or EXTRAS_CHECK
+        setup_spec (str):
+            What setup.py declares for the dependency, or None if it is
+            missing from setup.py
+        pipfile_spec (str):
+            What the Pipfile declares for the dependency, or None if it is
+            missing from the Pipfile
+    """
+    __slots__ = ("package", "check", "setup_spec", "pipfile_spec")
+
+    def __init__(self, package, check, setup_spec, pipfile_spec):
+        self.package = package
+        self.check = check
+        self.setup_spec = setup_spec
+        self.pipfile_spec = pipfile_spec
+
+    def __eq__(self, other):
+        return (isinstance(other, Finding) and
+                self.as_dict() == other.as_dict())
+
+    def __repr__(self):
+        return "Finding({!r}, {!r}, {!r}, {!r})".format(
+            self.package, self.check, self.setup_spec, self.pipfile_spec)
+
+    def as_dict(self):
+        """
+        Returns:
+            dict<str, str>: The finding's fields, for JSON output
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class Report:
+    """
+    Every finding for a project, or the error that stopped its dependency
+    files from being read
+
+    Attributes:
+        project (str):
+            The project's root directory
+        findings (list<Finding>):
+            The problems found, ordered by package and check
+        error (str):
+            Why the dependency files could not be read, or None
+    """
+    __slots__ = ("project", "findings", "error")
+
+    def __init__(self, project, findings, error=None):
+        self.project = project
+        self.findings = findings
+        self.error = error
+
+    @property
+    def passed(self):
+        """bool: Whether the dependency files were read and agree"""
+        return self.error is None and not self.findings
+
+    @property
+    def exit_code(self):
+        """int: The command-line exit status for the report"""
+        return 0 if self.passed else 1
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: The report's fields, with findings as dictionaries
+        """
+        return {"project": self.project, "passed": self.passed,
+                "error": self.error,
+                "findings": [finding.as_dict() for finding in self.findings]}
+
+    def to_json(self, **kwargs):
+        """
+        Args:
+            **kwargs:
+                Arguments passed on to 'json.dumps'
+        Returns:
+            str: The report as JSON
+        """
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+def check_report(setup_path=None, pipfile_path=None, project_root=None,
+                 parser="regex", dynamic_setup=False, use_cache=True):
+    """
+    Equivalent of 'compare_deps' that gathers every failed check into a
+    report instead of raising on the first failing category, so that a
+    single run surfaces all problems
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        pipfile_path (str):
+            Path of the Pipfile to read
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        use_cache (bool):
+            Whether such an evaluation may be served from and stored in the
+            result cache
+    Returns:
+        Report:
+            The findings, or the error raised while reading the dependency
+            files
+    """
+    from pipenv_devcheck.pipenv_setup_comp import (
+        get_setup_deps, get_pipfile_deps)
+
+    project = project_root or "."
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    try:
+        setup_deps, setup_extras = get_setup_deps(
+            setup_path, parser, dynamic_setup, use_cache=use_cache)
+        pipfile_deps, pipfile_extras = get_pipfile_deps(pipfile_path)
+    except Exception as e:
+        return Report(project, [], "{}: {}".format(type(e).__name__, e))
+    return Report(project, collect_findings(setup_deps, setup_extras,
+                                            pipfile_deps, pipfile_extras))
+
+
+@phase("collect_findings")
+def collect_findings(setup_deps, setup_extras, pipfile_deps,
+                     pipfile_extras, intervals=None):
+    """
+    Runs the name, version and extras checks in a single pass over the
+    dependencies, recording every failure
+
+    Args:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        setup_extras (dict<str, list<str>>):
+            Dictionary of extras specified in setup.py
+        pipfile_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in the Pipfile
+        pipfile_extras (dict<str, list<str>>):
+            Dictionary of extras specified in the Pipfile
+        intervals (callable):
+            Converts specifications to version intervals. Defaults to
+            'version_cache.spec_intervals'.
+    Returns:
+        list<Finding>: The failures, ordered by package and check
+    """
+    from pipenv_devcheck.intervals import intersect
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    intervals = intervals or spec_intervals
+    findings = []
+    for package in sorted(setup_deps.keys() | pipfile_deps.keys()):
+        setup_specs = setup_deps.get(package)
+        pipfile_specs = pipfile_deps.get(package)
+        if setup_specs is None or pipfile_specs is None:
+            findings.append(Finding(package, NAME_CHECK,
+                                    format_specs(setup_specs),
+                                    format_specs(pipfile_specs)))
+            continue
+        if not intersect(intervals(setup_specs), intervals(pipfile_specs)):
+            findings.append(Finding(package, VERSION_CHECK,
+                                    format_specs(setup_specs),
+                                    format_specs(pipfile_specs)))
+        if setup_extras.get(package) != pipfile_extras.get(package):
+            findings.append(Finding(package, EXTRAS_CHECK,
+                                    format_extras(setup_extras.get(package)),
+                                    format_extras(
+                                        pipfile_extras.get(package))))
+    return findings
+
+
+def format_specs(specs):
+    """
+    Renders parsed specifications as they would be written
+
+    Args:
+        specs (list<tuple<str, str>>):
+            (operator, version) tuples, or ["*"]. May be None.
+    Returns:
+        str: e.g. '>=1.0, <2.0', or None if 'specs' is None
+    """
+    if specs is None:
+        return None
+    return ", ".join(spec if spec == "*" else "".join(spec)
+                     for spec in specs)
+
+
+def format_extras(extras):
+    """
+    Renders a list of extras as they would be written
+
+    Args:
+        extras (list<str>):
+            Names of the extras. May be None.
+    Returns:
+        str: e.g. '[hive, presto]', or '[]' if 'extras' is None
+    """
+    return "[{}]".format(", ".join(extras or []))
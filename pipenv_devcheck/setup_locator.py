@@ -0,0 +1,123 @@
+import ast
+
+
+def find_setup_call(setup_tree):
+    """
+    Finds the call to setup() in a parsed setup.py file. Only top-level
+    statements and the bodies of 'if __name__ == "__main__"' blocks are
+    searched, and the search stops at the first matching call, falling back
+    to walking the whole tree only if no call is found that way.
+    Module-level assignments of literal values preceding the call are
+    collected along the way, so that keyword arguments referring to them
+    can be resolved.
+
+    Args:
+        setup_tree (ast.Module):
+            The parsed setup.py file
+    Returns:
+        tuple<ast.Call, dict<str, object>>:
+            The setup() call, or None if there is none, and the values of
+            the module-level constants assigned before it
+    """
+    constants = {}
+    setup_node = _find_in_body(setup_tree.body, constants)
+    if setup_node is None:
+        setup_node = next((node for node in ast.walk(setup_tree)
+                           if isinstance(node, ast.Call) and
+                           _is_setup_func(node.func)), None)
+    return setup_node, constants
+
+
+def evaluate(node, constants):
+    """
+    Evaluates an expression made of literals, names of module-level
+    constants and list/tuple concatenations
+
+    Args:
+        node (ast.expr):
+            The expression to evaluate
+        constants (dict<str, object>):
+            Values of the module-level constants, as returned by
+            'find_setup_call'
+    Returns:
+        object: The value of the expression
+    Raises:
+        ValueError:
+            If the expression contains anything else, such as function calls
+            or names that are not known constants, or cannot be evaluated,
+            such as the concatenation of a list and a string
+    """
+    if isinstance(node, ast.Name):
+        if node.id not in constants:
+            raise ValueError("Cannot resolve name '{}' in setup.py - only "
+                             "module-level literals are supported"
+                             .format(node.id))
+        return constants[node.id]
+    if isinstance(node, ast.List):
+        return [evaluate(elt, constants) for elt in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(evaluate(elt, constants) for elt in node.elts)
+    try:
+        if isinstance(node, ast.Dict) and None not in node.keys:
+            return {evaluate(key, constants): evaluate(value, constants)
+                    for key, value in zip(node.keys, node.values)}
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            return (evaluate(node.left, constants) +
+                    evaluate(node.right, constants))
+    except TypeError as e:
+        raise ValueError("Cannot evaluate expression on line {} of setup.py: "
+                         "{}".format(node.lineno, e))
+    return ast.literal_eval(node)
+
+
+def _find_in_body(body, constants):
+    """
+    Searches a list of statements for the setup() call, recording constants
+    assigned before it in 'constants'
+    """
+    for stmt in body:
+        if isinstance(stmt, (ast.Expr, ast.Assign)):
+            if (isinstance(stmt.value, ast.Call) and
+                    _is_setup_func(stmt.value.func)):
+                return stmt.value
+        if isinstance(stmt, ast.Assign):
+            _record_constant(stmt.targets, stmt.value, constants)
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            _record_constant([stmt.target], stmt.value, constants)
+        elif isinstance(stmt, ast.If) and _is_main_guard(stmt.test):
+            setup_node = _find_in_body(stmt.body, constants)
+            if setup_node is not None:
+                return setup_node
+    return None
+
+
+def _record_constant(targets, value, constants):
+    """
+    Records the value assigned to simple names, forgetting names whose new
+    value cannot be evaluated
+    """
+    names = [target.id for target in targets if isinstance(target, ast.Name)]
+    if not names:
+        return
+    try:
+        resolved = evaluate(value, constants)
+    except (ValueError, TypeError, SyntaxError):
+        for name in names:
+            constants.pop(name, None)
+        return
+    for name in names:
+        constants[name] = resolved
+
+
+def _is_setup_func(func):
+    """Whether a call target is 'setup' or an attribute such as
+    'setuptools.setup'"""
+    return ((isinstance(func, ast.Name) and func.id == "setup") or
+            (isinstance(func, ast.Attribute) and func.attr == "setup"))
+
+
+def _is_main_guard(test):
+    """Whether an if statement's test compares '__name__'"""
+    return (isinstance(test, ast.Compare) and
+            any(isinstance(operand, ast.Name) and operand.id == "__name__"
+                for operand in [test.left] + test.comparators))
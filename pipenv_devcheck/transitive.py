@@ -0,0 +1,288 @@
+from collections import deque, namedtuple
+import os
+
+from pipenv_devcheck.paths import resolve_paths
+
+# A requirement of an installed distribution on another: the canonical name
+# of the distribution required, its specifications and the extras requested
+Edge = namedtuple("Edge", ["name", "specs", "extras"])
+
+# An installed distribution's requirement on a setup.py dependency
+Requirer = namedtuple("Requirer", ["name", "version", "specs"])
+
+# A setup.py dependency whose range no version allowed by the installed
+# distributions requiring it falls within
+TransitiveConflict = namedtuple("TransitiveConflict",
+                                ["package", "setup_specs", "required_by"])
+
+# Installed distributions' requirements, keyed by the path of their metadata
+# and shared across every project checked in the process. Each entry holds
+# the metadata's signature, its parsed requirements and their edges by the
+# extras requested.
+_graph_cache = {}
+
+
+def check_transitive(setup_path=None, project_root=None, parser="regex",
+                     dynamic_setup=False, paths=None, use_cache=True):
+    """
+    Checks that the ranges in setup.py are consistent with the requirements
+    of the installed distributions they lead to. The dependency graph is
+    walked from the setup.py dependencies through the 'Requires-Dist'
+    metadata of the installed distributions, without using the network.
+    Each distribution's edges are resolved once per process (see
+    'distribution_edges').
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to read
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, a key of
+            'requirement_parsers'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        use_cache (bool):
+            Whether such an evaluation may be served from and stored in the
+            result cache
+        paths (list<str>):
+            Directories to look for installed distributions in. Defaults to
+            the entries of 'sys.path'.
+    Returns:
+        dict<str, str>:
+            Dictionary from the canonical names of the installed
+            distributions reached to their versions
+    Raises:
+        ValueError:
+            If the installed distributions requiring a setup.py dependency
+            allow no version within its range
+    """
+    from pipenv_devcheck.environment import installed_distributions
+    from pipenv_devcheck.pipenv_setup_comp import get_setup_deps
+    from pipenv_devcheck.report import format_specs
+
+    setup_path, _ = resolve_paths(setup_path, None, project_root)
+    setup_deps, setup_extras = get_setup_deps(setup_path, parser,
+                                              dynamic_setup,
+                                              use_cache=use_cache)
+    distributions = installed_distributions(paths)
+    reached, constraints = walk_requirements(setup_deps, setup_extras,
+                                             distributions)
+    conflicts = find_transitive_conflicts(setup_deps, constraints)
+    if conflicts:
+        err_msg = ("Installed distributions allow no version within the "
+                   "ranges of setup.py!\n")
+        for conflict in conflicts:
+            err_msg += "{} {} in setup.py, but {}\n".format(
+                conflict.package, format_specs(conflict.setup_specs),
+                "; ".join("{} {} requires {}".format(
+                    requirer.name, requirer.version,
+                    format_specs(requirer.specs))
+                    for requirer in conflict.required_by))
+        raise ValueError(err_msg)
+    return {name: distributions[name].version for name in reached}
+
+
+def walk_requirements(setup_deps, setup_extras, distributions):
+    """
+    Walks the requirements of the installed distributions reachable from
+    the setup.py dependencies, breadth first. Requirements on distributions
+    that are not installed are recorded, but not followed.
+
+    Args:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        setup_extras (dict<str, list<str>>):
+            Dictionary of extras specified in setup.py
+        distributions (dict<str, Distribution>):
+            Installed distributions, as returned by
+            'installed_distributions'
+    Returns:
+        tuple<set<str>, dict<str, list<Requirer>>>:
+            The canonical names of the distributions reached, and the
+            requirements on each canonical name by the distributions reached
+    """
+    from pipenv_devcheck.lexer import canonical_name
+
+    pending = deque((canonical_name(dep_name),
+                     frozenset(extra.lower()
+                               for extra in setup_extras.get(dep_name, [])))
+                    for dep_name in setup_deps)
+    visited = set()
+    constraints = {}
+    while pending:
+        node = pending.popleft()
+        name, extras = node
+        if node in visited or name not in distributions:
+            continue
+        visited.add(node)
+        distribution = distributions[name]
+        for edge in distribution_edges(distribution.metadata_path, extras):
+            requirer = Requirer(distribution.name, distribution.version,
+                                edge.specs)
+            requirers = constraints.setdefault(edge.name, [])
+            if requirer not in requirers:
+                # A distribution reached with several sets of extras
+                # repeats its unconditional requirements
+                requirers.append(requirer)
+            pending.append((edge.name, edge.extras))
+    return {name for name, _ in visited}, constraints
+
+
+def find_transitive_conflicts(setup_deps, constraints):
+    """
+    Finds the setup.py dependencies whose range does not overlap the
+    requirements of the installed distributions on them
+
+    Args:
+        setup_deps (dict<str, list<tuple<str, str>>>):
+            Dictionary of the dependencies found in setup.py
+        constraints (dict<str, list<Requirer>>):
+            Requirements on each canonical name, as returned by
+            'walk_requirements'
+    Returns:
+        list<TransitiveConflict>: The conflicts, in the order of setup.py
+    """
+    from pipenv_devcheck.intervals import intersect
+    from pipenv_devcheck.lexer import canonical_name
+    from pipenv_devcheck.version_cache import spec_intervals
+
+    conflicts = []
+    for dep_name, specs in setup_deps.items():
+        requirers = constraints.get(canonical_name(dep_name), [])
+        allowed = spec_intervals(specs)
+        for requirer in requirers:
+            allowed = intersect(allowed, spec_intervals(requirer.specs))
+        if requirers and not allowed:
+            conflicts.append(TransitiveConflict(dep_name, specs, requirers))
+    return conflicts
+
+
+def distribution_edges(metadata_path, extras=frozenset()):
+    """
+    Resolves the requirements of an installed distribution into edges of
+    the dependency graph, evaluating their environment markers for the
+    running interpreter and the extras requested. Results are memoized by
+    the metadata's path until its signature changes, so each distribution
+    is read once however many projects reach it.
+
+    Args:
+        metadata_path (str):
+            Path of the distribution's METADATA or PKG-INFO file
+        extras (frozenset<str>):
+            The extras of the distribution requested
+    Returns:
+        list<Edge>: The edges, in the order of the metadata
+    """
+    from pipenv_devcheck.readers import file_signature
+
+    signature = file_signature(metadata_path)
+    entry = _graph_cache.get(metadata_path)
+    if entry is None or entry[0] != signature:
+        try:
+            requirements = _parse_requirements(
+                read_requirements(metadata_path))
+        except OSError:
+            requirements = []
+        entry = _graph_cache[metadata_path] = (signature, requirements, {})
+    _, requirements, edges = entry
+    if extras not in edges:
+        edges[extras] = _resolve_edges(requirements, extras)
+    return edges[extras]
+
+
+def read_requirements(metadata_path):
+    """
+    Reads the requirements of an installed distribution: the
+    'Requires-Dist' headers of its METADATA file, or the 'requires.txt'
+    file beside the PKG-INFO of an egg-info directory
+
+    Args:
+        metadata_path (str):
+            Path of the distribution's METADATA or PKG-INFO file
+    Returns:
+        list<str>: The requirement strings, with their markers
+    """
+    if os.path.basename(metadata_path) == "PKG-INFO":
+        requires_path = os.path.join(os.path.dirname(metadata_path),
+                                     "requires.txt")
+        if not os.path.isfile(requires_path):
+            return []
+        with open(requires_path, "r", encoding="utf-8",
+                  errors="replace") as f:
+            return _egg_requirements(f.read())
+
+    requirements = []
+    with open(metadata_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                # The headers end at the first blank line
+                break
+            if line.startswith("Requires-Dist:"):
+                requirements.append(line[14:].strip())
+    return requirements
+
+
+def clear_graph_cache():
+    """Empties the cache of installed distributions' requirements"""
+    _graph_cache.clear()
+
+
+def _parse_requirements(requirement_strs):
+    """Parses requirement strings, dropping those that are invalid"""
+    from packaging.requirements import InvalidRequirement, Requirement
+
+    requirements = []
+    for requirement_str in requirement_strs:
+        try:
+            requirements.append(Requirement(requirement_str))
+        except InvalidRequirement:
+            continue
+    return requirements
+
+
+def _resolve_edges(requirements, extras):
+    """
+    Converts parsed requirements into edges, dropping those whose markers
+    do not hold for any of the extras requested
+    """
+    from pipenv_devcheck.lexer import canonical_name
+
+    edges = []
+    for requirement in requirements:
+        if requirement.marker is not None and not any(
+                requirement.marker.evaluate({"extra": extra})
+                for extra in [""] + sorted(extras)):
+            continue
+        specs = [(specifier.operator, specifier.version)
+                 for specifier in requirement.specifier] or ["*"]
+        edges.append(Edge(canonical_name(requirement.name), specs,
+                          frozenset(extra.lower()
+                                    for extra in requirement.extras)))
+    return edges
+
+
+def _egg_requirements(requires_text):
+    """
+    Converts the sections of an egg's 'requires.txt' - '[extra]',
+    '[:marker]' or '[extra:marker]' - into requirement strings with markers
+    """
+    requirements = []
+    marker = None
+    for line in requires_text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            extra, _, section_marker = line[1:-1].partition(":")
+            markers = ["({})".format(section_marker)] if section_marker \
+                else []
+            if extra:
+                markers.append('extra == "{}"'.format(extra))
+            marker = " and ".join(markers) or None
+            continue
+        requirements.append(line if marker is None
+                            else "{}; {}".format(line, marker))
+    return requirements
+
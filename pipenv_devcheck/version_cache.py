@@ -0,0 +1,140 @@
+from collections import namedtuple
+import functools
+
+# Upper bounds on the number of entries kept by each cache. Versions and
+# specifications recur across projects (common pins of numpy or pandas), so
+# a batch of hundreds of projects fits comfortably.
+VERSION_CACHE_SIZE = 4096
+SPEC_CACHE_SIZE = 4096
+SPECS_CACHE_SIZE = 2048
+
+# Hit and miss counts of one cache
+CacheStats = namedtuple("CacheStats", ["name", "hits", "misses", "size",
+                                       "max_size"])
+
+
+def parse_version(version):
+    """
+    Parses a version string, returning the same object for every call with
+    the same string while it is cached
+
+    Args:
+        version (str):
+            The version, e.g. '1.17.3'
+    Returns:
+        packaging.version.Version: The parsed version
+    Raises:
+        packaging.version.InvalidVersion:
+            If the version is not valid
+    """
+    return _parse_version(version)
+
+
+def lex_spec(spec):
+    """
+    Cached equivalent of 'lexer.lex_spec'
+
+    Args:
+        spec (str):
+            A specification, e.g. '>=3.1.1'
+    Returns:
+        tuple<str, str>: The operator and the version
+    Raises:
+        ValueError:
+            If the text is not a valid specification
+    """
+    return _lex_spec(spec)
+
+
+def spec_intervals(specs):
+    """
+    Cached equivalent of 'intervals.spec_intervals', which also parses
+    versions through 'parse_version'
+
+    Args:
+        specs (list<tuple<str, str>>):
+            Operator/version tuples, or ["*"] for any version
+    Returns:
+        list<Interval>: The satisfying intervals, in ascending order
+    """
+    # A fresh list, so that callers cannot alter the cached intervals
+    return list(_spec_intervals(tuple(specs)))
+
+
+def cache_stats():
+    """
+    Reports how often each cache has been hit since it was last cleared
+
+    Returns:
+        list<CacheStats>: One entry per cache
+    """
+    stats = []
+    for name, cached_fn in _caches():
+        info = cached_fn.cache_info()
+        stats.append(CacheStats(name, info.hits, info.misses,
+                                info.currsize, info.maxsize))
+    return stats
+
+
+def hit_rate(stats):
+    """
+    Args:
+        stats (CacheStats):
+            A cache's statistics
+    Returns:
+        float: The fraction of lookups that were hits, or None if none
+    """
+    lookups = stats.hits + stats.misses
+    return stats.hits / lookups if lookups else None
+
+
+def format_cache_stats(stats):
+    """
+    Renders cache statistics as a table
+
+    Args:
+        stats (list<CacheStats>):
+            As returned by 'cache_stats'
+    Returns:
+        str: One line per cache, with a header
+    """
+    lines = ["{:<24}{:>10}{:>10}{:>10}".format("cache", "hits", "misses",
+                                               "hit rate")]
+    for stat in stats:
+        rate = hit_rate(stat)
+        lines.append("{:<24}{:>10}{:>10}{:>10}".format(
+            stat.name, stat.hits, stat.misses,
+            "-" if rate is None else "{:.1%}".format(rate)))
+    return "\n".join(lines)
+
+
+def clear_caches():
+    """
+    Empties every cache and resets its statistics
+    """
+    for _, cached_fn in _caches():
+        cached_fn.cache_clear()
+
+
+@functools.lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _parse_version(version):
+    from packaging.version import parse
+    return parse(version)
+
+
+@functools.lru_cache(maxsize=SPEC_CACHE_SIZE)
+def _lex_spec(spec):
+    from pipenv_devcheck.lexer import lex_spec
+    return lex_spec(spec)
+
+
+@functools.lru_cache(maxsize=SPECS_CACHE_SIZE)
+def _spec_intervals(specs):
+    from pipenv_devcheck import intervals
+    return tuple(intervals.spec_intervals(specs, parse_version))
+
+
+def _caches():
+    """Lists the caches with their names"""
+    return [("parse_version", _parse_version), ("lex_spec", _lex_spec),
+            ("spec_intervals", _spec_intervals)]
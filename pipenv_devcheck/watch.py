@@ -0,0 +1,233 @@
+from collections import namedtuple
+import os
+import select
+import struct
+import time
+
+from pipenv_devcheck.paths import resolve_paths
+from pipenv_devcheck.readers import file_signature
+
+# Outcome of one check in watch mode. 'changed' holds the paths that were
+# re-parsed, and 'seconds' the time taken to re-parse and check.
+WatchResult = namedtuple("WatchResult",
+                         ["changed", "passed", "error", "seconds"])
+
+# Default number of seconds between checks when polling for changes
+DEFAULT_INTERVAL = 0.5
+# Time to wait for further events after a change, so that an editor's
+# write-then-rename counts as a single change
+_settle_seconds = 0.05
+
+# inotify constants, from <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_event_header = struct.Struct("iIII")
+
+
+def watch(setup_path=None, pipfile_path=None, project_root=None,
+          parser="regex", dynamic_setup=False, interval=DEFAULT_INTERVAL,
+          use_cache=True):
+    """
+    Checks the dependency files whenever they change, printing each verdict,
+    until interrupted
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to watch
+        pipfile_path (str):
+            Path of the Pipfile to watch
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, 'regex' or 'linear'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        interval (float):
+            Seconds between checks when polling for changes
+        use_cache (bool):
+            Whether evaluations of a dynamic setup.py may be served from and
+            stored in the result cache
+    """
+    try:
+        for result in watch_results(setup_path, pipfile_path, project_root,
+                                    parser, dynamic_setup, interval,
+                                    use_cache):
+            changed = ", ".join(sorted(os.path.basename(path)
+                                       for path in result.changed))
+            print("[{}] {} - checked {} in {:.1f} ms".format(
+                time.strftime("%H:%M:%S"),
+                "PASS" if result.passed else "FAIL",
+                changed, result.seconds * 1000))
+            if result.error:
+                print("    " + result.error)
+    except KeyboardInterrupt:
+        pass
+
+
+def watch_results(setup_path=None, pipfile_path=None, project_root=None,
+                  parser="regex", dynamic_setup=False,
+                  interval=DEFAULT_INTERVAL, use_cache=True):
+    """
+    Checks the dependency files once, then again each time one of them
+    changes. Only the file that changed is parsed again - the other file's
+    parsed dependencies are kept from the previous check. Changes are
+    detected with inotify where available, falling back to polling.
+
+    Args:
+        setup_path (str):
+            Path of the setup.py file to watch
+        pipfile_path (str):
+            Path of the Pipfile to watch
+        project_root (str):
+            Directory containing the dependency files
+        parser (str):
+            Requirement parsing mode for setup.py, 'regex' or 'linear'
+        dynamic_setup (bool):
+            Whether to evaluate setup.py in a subprocess when its
+            dependencies cannot be read statically
+        interval (float):
+            Seconds between checks when polling for changes
+        use_cache (bool):
+            Whether evaluations of a dynamic setup.py may be served from and
+            stored in the result cache
+    Yields:
+        WatchResult: The outcome of each check
+    """
+    from pipenv_devcheck.pipenv_setup_comp import (
+        get_setup_deps, get_pipfile_deps, run_checks)
+
+    setup_path, pipfile_path = resolve_paths(setup_path, pipfile_path,
+                                             project_root)
+    parse_fns = {
+        setup_path: lambda path: get_setup_deps(path, parser, dynamic_setup,
+                                                use_cache=use_cache),
+        pipfile_path: get_pipfile_deps}
+    parsed = {}
+    watcher = _make_watcher([setup_path, pipfile_path], interval)
+    try:
+        changed = set(parse_fns)
+        while True:
+            start = time.perf_counter()
+            error = None
+            try:
+                for path in changed:
+                    parsed.pop(path, None)
+                    parsed[path] = parse_fns[path](path)
+                setup_deps, setup_extras = parsed[setup_path]
+                pipfile_deps, pipfile_extras = parsed[pipfile_path]
+                run_checks(setup_deps, setup_extras,
+                           pipfile_deps, pipfile_extras)
+            except Exception as e:
+                error = "{}: {}".format(type(e).__name__, e)
+            yield WatchResult(frozenset(changed), error is None, error,
+                              time.perf_counter() - start)
+            # Files that failed to parse are parsed again on the next change
+            changed = watcher.wait() | (set(parse_fns) - set(parsed))
+    finally:
+        watcher.close()
+
+
+def _make_watcher(paths, interval):
+    """Creates an inotify watcher for 'paths', or a polling one if inotify
+    is unavailable"""
+    try:
+        return _InotifyWatcher(paths)
+    except OSError:
+        return _PollingWatcher(paths, interval)
+
+
+class _PollingWatcher:
+    """Detects changes by comparing file metadata at a fixed interval"""
+
+    def __init__(self, paths, interval):
+        self.interval = interval
+        self.stats = {path: file_signature(path) for path in paths}
+
+    def wait(self):
+        """Blocks until at least one file changes, returning the changed
+        paths"""
+        while True:
+            changed = set()
+            for path, old_stat in self.stats.items():
+                new_stat = file_signature(path)
+                if new_stat != old_stat:
+                    self.stats[path] = new_stat
+                    changed.add(path)
+            if changed:
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class _InotifyWatcher:
+    """Detects changes with Linux's inotify, watching the directories of the
+    files so that editors replacing files by renaming are noticed"""
+
+    def __init__(self, paths):
+        import ctypes
+        import ctypes.util
+
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.paths_by_wd = {}
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        for path in paths:
+            directory = os.path.dirname(os.path.abspath(path)) or "."
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                        mask)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            self.paths_by_wd.setdefault(wd, {})[
+                os.fsencode(os.path.basename(path))] = path
+
+    def _read_changes(self, timeout):
+        """Reads pending events, waiting up to 'timeout' seconds for the
+        first one"""
+        changed = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, _, _, name_len = _event_header.unpack_from(data, offset)
+            offset += _event_header.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            path = self.paths_by_wd.get(wd, {}).get(name)
+            if path is not None:
+                changed.add(path)
+        return changed
+
+    def wait(self):
+        """Blocks until at least one file changes, returning the changed
+        paths"""
+        changed = set()
+        while not changed:
+            changed = self._read_changes(None)
+        while True:
+            more = self._read_changes(_settle_seconds)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        os.close(self.fd)
@@ -84,11 +84,13 @@ setup(
     packages=find_packages(),
     install_requires=[
         'packaging>=20.1',
-        'pipfile>=0.0.2'
+        'pipfile>=0.0.2',
+        'tomli>=1.1.0; python_version < "3.11"'
     ],
     entry_points={
         'console_scripts': [
             'pipenv-devcheck=pipenv_devcheck.__main__:main',
+            'pipenv-devcheck-client=pipenv_devcheck.client:main',
         ],
     },
     cmdclass={
@@ -128,3 +128,44 @@ def test_extras():
         'pyhive': ['hive', 'presto'],
         'testpackage': ['extra0', 'extra1']
     }
+
+
+@pytest.fixture
+def project_dir(tmp_path, setup_text, pipfile_text):
+    """A project directory containing the setup.py and Pipfile fixtures"""
+    (tmp_path / "setup.py").write_text(setup_text)
+    (tmp_path / "Pipfile").write_text(pipfile_text)
+    return tmp_path
+
+
+@pytest.fixture()
+def setup_text_w_constants():
+    """
+    setup.py text calling setuptools.setup under a __main__ guard, with
+    dependencies held in module-level constants
+    """
+    return """
+import setuptools
+
+BASE_REQUIREMENTS = [
+        'matplotlib>=3.1.1',
+        'pyhive[hive, presto]>=0.6.0'
+]
+REQUIREMENTS = BASE_REQUIREMENTS + ['pandas[fake_extra]>=0.25.1']
+PLOTTING = ['seaborn>=0.9.0']
+
+
+def unrelated():
+    setup(install_requires=['not-a-dependency'])
+
+
+if __name__ == '__main__':
+    setuptools.setup(
+        name='demo_setup',
+        install_requires=REQUIREMENTS,
+        extras_require={
+            'plotting': PLOTTING,
+            'salesforce': ['simple_salesforce>=0.74.3']
+        }
+    )
+    """
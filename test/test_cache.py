@@ -0,0 +1,156 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pipenv_devcheck.cache import (cache_key, cached_compare_deps,
+                                   clear_cache, evict, store_entry)
+
+
+def test_cached_compare_deps_hit(mocker, tmp_path, project_dir,
+                                 setup_deps_and_extras,
+                                 pipfile_deps_and_extras):
+    """
+    Tests that unchanged dependency files are served from the cache
+    without being parsed again
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    cache_dir = str(tmp_path / "cache")
+    expected = (setup_deps_and_extras[0], pipfile_deps_and_extras[0])
+    assert cached_compare_deps(project_root=str(project_dir),
+                               cache_dir=cache_dir) == expected
+
+    get_setup_deps = mocker.patch(
+        "pipenv_devcheck.pipenv_setup_comp.get_setup_deps")
+    assert cached_compare_deps(project_root=str(project_dir),
+                               cache_dir=cache_dir) == expected
+    get_setup_deps.assert_not_called()
+
+
+def test_cached_compare_deps_options(mocker, tmp_path, project_dir):
+    """
+    Tests that results cached with one parser or setup file name are not
+    served to another configuration
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    from pipenv_devcheck import pipenv_setup_comp
+
+    cache_dir = str(tmp_path / "cache")
+    cached_compare_deps(project_root=str(project_dir), cache_dir=cache_dir)
+    get_setup_deps = mocker.patch(
+        "pipenv_devcheck.pipenv_setup_comp.get_setup_deps",
+        wraps=pipenv_setup_comp.get_setup_deps)
+    cached_compare_deps(project_root=str(project_dir), parser="linear",
+                        cache_dir=cache_dir)
+    assert get_setup_deps.call_args[0][1] == "linear"
+    cached_compare_deps(project_root=str(project_dir), parser="linear",
+                        cache_dir=cache_dir)
+    assert get_setup_deps.call_count == 1
+
+    (project_dir / "setup_copy.py").write_text(
+        (project_dir / "setup.py").read_text())
+    cached_compare_deps(setup_path="setup_copy.py",
+                        project_root=str(project_dir), parser="linear",
+                        cache_dir=cache_dir)
+    assert get_setup_deps.call_count == 2
+
+
+def test_cached_compare_deps_hit_skips_imports(tmp_path, project_dir):
+    """
+    Tests that a cache hit does not import the parsing modules
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    cache_dir = str(tmp_path / "cache")
+    cached_compare_deps(project_root=str(project_dir), cache_dir=cache_dir)
+    script = (
+        "import sys\n"
+        "from pipenv_devcheck.cache import cached_compare_deps\n"
+        "cached_compare_deps(project_root={!r}, cache_dir={!r})\n"
+        "print(sorted(m for m in ('ast', 'pipfile', 'packaging') "
+        "if m in sys.modules))\n"
+    ).format(str(project_dir), cache_dir)
+    output = subprocess.check_output(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert output.decode().strip() == "[]"
+
+
+def test_cached_compare_deps_failure(tmp_path, project_dir):
+    """
+    Tests that failed checks are cached and raised again on a hit, and that
+    changing a dependency file invalidates the entry
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    cache_dir = str(tmp_path / "cache")
+    pipfile = project_dir / "Pipfile"
+    valid_text = pipfile.read_text()
+    pipfile.write_text(valid_text.replace('seaborn = "==0.9.0"',
+                                          'seaborn = "<0.8.0"'))
+    for _ in range(2):
+        with pytest.raises(ValueError, match="seaborn"):
+            cached_compare_deps(project_root=str(project_dir),
+                                cache_dir=cache_dir)
+
+    pipfile.write_text(valid_text)
+    assert cached_compare_deps(project_root=str(project_dir),
+                               cache_dir=cache_dir)
+
+
+def test_cached_compare_deps_invalid_version(tmp_path, project_dir):
+    """
+    Tests that a check failing with a subclass of ValueError, such as
+    InvalidVersion, is cached as a ValueError, and that entries recording
+    an unknown error type are recomputed
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    cache_dir = tmp_path / "cache"
+    pipfile = project_dir / "Pipfile"
+    pipfile.write_text(pipfile.read_text().replace('seaborn = "==0.9.0"',
+                                                   'seaborn = ">=abc"'))
+    for _ in range(2):
+        with pytest.raises(ValueError, match="abc"):
+            cached_compare_deps(project_root=str(project_dir),
+                                cache_dir=str(cache_dir))
+
+    entry_path, = cache_dir.glob("*.json")
+    entry_path.write_text(entry_path.read_text().replace(
+        '"ValueError"', '"InvalidVersion"'))
+    with pytest.raises(ValueError, match="abc"):
+        cached_compare_deps(project_root=str(project_dir),
+                            cache_dir=str(cache_dir))
+    assert '"ValueError"' in entry_path.read_text()
+
+
+def test_evict_and_clear(tmp_path):
+    """
+    Tests that the cache stays within its size bound, evicting the least
+    recently used entries first, and that it can be cleared
+    """
+    cache_dir = str(tmp_path / "cache")
+    keys = [cache_key(str(i).encode()) for i in range(5)]
+    for i, key in enumerate(keys):
+        store_entry(key, {"padding": "x" * 100}, cache_dir)
+        os.utime(os.path.join(cache_dir, key + ".json"), (i, i))
+
+    evict(cache_dir, max_bytes=250)
+    assert sorted(os.listdir(cache_dir)) == sorted(
+        key + ".json" for key in keys[-2:])
+
+    clear_cache(cache_dir)
+    assert not os.path.exists(cache_dir)
@@ -0,0 +1,66 @@
+import shutil
+import subprocess
+
+import pytest
+
+from pipenv_devcheck import pipenv_setup_comp
+from pipenv_devcheck.changes import changed_paths, check_changes
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None,
+                                reason="git is not installed")
+
+
+def git(repo, *args):
+    """Runs a git command in a test repository"""
+    subprocess.run(["git", "-C", str(repo), "-c", "user.name=Test",
+                    "-c", "user.email=test@example.com"] + list(args),
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+@pytest.fixture
+def repo(project_dir, tmp_path, monkeypatch):
+    """The project fixture committed to a repository, with its own cache"""
+    monkeypatch.setenv("PIPENV_DEVCHECK_CACHE_DIR", str(tmp_path / "cache"))
+    git(project_dir, "init", "-q")
+    git(project_dir, "add", "setup.py", "Pipfile")
+    git(project_dir, "commit", "-q", "-m", "Initial commit")
+    return project_dir
+
+
+def test_changed_paths(repo):
+    """
+    Tests that staged changes and changes since a revision are listed
+    """
+    (repo / "README").write_text("readme")
+    git(repo, "add", "README")
+    assert changed_paths(str(repo)) == {"README"}
+    (repo / "Pipfile").write_text("")
+    assert changed_paths(str(repo)) == {"README"}
+    assert changed_paths(str(repo), "HEAD") == {"README", "Pipfile"}
+
+
+def test_check_changes(repo, pipfile_text, mocker):
+    """
+    Tests that the check is skipped when neither dependency file changed,
+    and that only the changed file is parsed when one did
+    """
+    get_setup_deps = mocker.spy(pipenv_setup_comp, "get_setup_deps")
+    get_pipfile_deps = mocker.spy(pipenv_setup_comp, "get_pipfile_deps")
+
+    (repo / "README").write_text("readme")
+    git(repo, "add", "README")
+    assert check_changes(project_root=str(repo)) == []
+    assert get_setup_deps.call_count == get_pipfile_deps.call_count == 0
+
+    (repo / "Pipfile").write_text(pipfile_text + "\n")
+    git(repo, "add", "Pipfile")
+    assert check_changes(project_root=str(repo)) == [str(repo / "Pipfile")]
+    assert get_setup_deps.call_count == get_pipfile_deps.call_count == 1
+
+    (repo / "Pipfile").write_text(
+        pipfile_text.replace('seaborn = "==0.9.0"', 'seaborn = "<0.9.0"'))
+    git(repo, "add", "Pipfile")
+    with pytest.raises(ValueError, match="seaborn"):
+        check_changes(project_root=str(repo))
+    assert get_setup_deps.call_count == 1
+    assert get_pipfile_deps.call_count == 2
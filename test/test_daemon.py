@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+import pytest
+
+from pipenv_devcheck import client, daemon
+
+
+@pytest.fixture
+def server_socket(tmp_path):
+    """Path of the socket of a daemon running in a background thread"""
+    socket_path = str(tmp_path / "d.sock")
+    server = daemon.make_server(socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_request_check(server_socket, project_dir, pipfile_text, tmp_path,
+                       monkeypatch):
+    """
+    Tests that the daemon reports passing and failing projects to
+    concurrent clients
+    """
+    monkeypatch.setenv("PIPENV_DEVCHECK_CACHE_DIR", str(tmp_path / "cache"))
+    failing_dir = tmp_path / "failing"
+    failing_dir.mkdir()
+    (failing_dir / "setup.py").write_text(
+        (project_dir / "setup.py").read_text())
+    (failing_dir / "Pipfile").write_text(
+        pipfile_text.replace('seaborn = "==0.9.0"', 'seaborn = "<0.9.0"'))
+
+    roots = [str(project_dir), str(failing_dir)] * 8
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(
+            lambda root: client.request_check(root, server_socket), roots))
+    for root, response in zip(roots, responses):
+        if root == str(project_dir):
+            assert response == {"passed": True, "error": None}
+        else:
+            assert not response["passed"]
+            assert response["error"].startswith("ValueError")
+            assert "seaborn" in response["error"]
+
+    missing = client.request_check(str(tmp_path / "missing"), server_socket,
+                                   use_cache=False)
+    assert missing["error"].startswith("FileNotFoundError")
+
+
+def test_make_server_in_use(server_socket):
+    """
+    Tests that a second daemon cannot take over a socket in use
+    """
+    with pytest.raises(OSError):
+        daemon.make_server(server_socket)
+
+
+def test_client_without_daemon(project_dir, tmp_path, monkeypatch, capsys):
+    """
+    Tests that the client checks in-process when no daemon is running
+    """
+    monkeypatch.setenv("PIPENV_DEVCHECK_CACHE_DIR", str(tmp_path / "cache"))
+    client.main([str(project_dir), "--socket", str(tmp_path / "none.sock")])
+    assert capsys.readouterr().out == "PASS {}\n".format(project_dir)
+
+
+def test_clear_cache_keeps_socket(tmp_path, monkeypatch):
+    """
+    Tests that the default socket lives outside the cache directory, so
+    that clearing the cache leaves a running daemon reachable
+    """
+    from pipenv_devcheck.cache import CACHE_DIR_ENV, clear_cache
+
+    monkeypatch.delenv(client.SOCKET_ENV, raising=False)
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    socket_path = client.default_socket_path()
+    assert socket_path == str(tmp_path / "run" / "pipenv-devcheck.sock")
+
+    server = daemon.make_server(socket_path)
+    try:
+        clear_cache()
+        assert os.path.exists(socket_path)
+    finally:
+        server.server_close()
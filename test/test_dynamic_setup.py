@@ -0,0 +1,149 @@
+import subprocess
+
+import pytest
+
+from pipenv_devcheck import dynamic_setup
+from pipenv_devcheck.cache import CACHE_DIR_ENV
+from pipenv_devcheck.dynamic_setup import evaluate_setup
+from pipenv_devcheck.pipenv_setup_comp import compare_deps
+
+dynamic_setup_text = """
+from setuptools import setup
+
+with open("requirements.txt") as f:
+    requirements = f.read().splitlines()
+
+setup(
+    name="demo_setup",
+    install_requires=requirements,
+    extras_require={"salesforce": ["simple_salesforce" + ">=0.74.3"]},
+)
+"""
+
+requirements_text = """matplotlib>=3.1.1
+pyhive[hive, presto]>=0.6.0
+pandas[fake_extra]>=0.25.1
+seaborn>=0.9.0
+"""
+
+
+@pytest.fixture
+def dynamic_project_dir(tmp_path, monkeypatch, pipfile_text):
+    """A project whose setup.py reads its dependencies from a file"""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "setup.py").write_text(dynamic_setup_text)
+    (project_dir / "requirements.txt").write_text(requirements_text)
+    (project_dir / "Pipfile").write_text(pipfile_text)
+    return project_dir
+
+
+def test_compare_deps_dynamic_setup(dynamic_project_dir,
+                                    setup_deps_and_extras):
+    """
+    Tests that computed dependencies are only read when opted in to
+    """
+    with pytest.raises(ValueError):
+        compare_deps(project_root=str(dynamic_project_dir))
+    setup_deps, _ = compare_deps(project_root=str(dynamic_project_dir),
+                                 dynamic_setup=True)
+    assert setup_deps == setup_deps_and_extras[0]
+
+
+def test_compare_deps_dynamic_type_error(dynamic_project_dir,
+                                         setup_deps_and_extras):
+    """
+    Tests that dependencies that only look mistyped statically, such as a
+    constant reassigned under a condition, are read by evaluating setup.py
+    """
+    (dynamic_project_dir / "setup.py").write_text(
+        "import sys\n"
+        "from setuptools import setup\n"
+        "REQUIREMENTS = 'requirements.txt'\n"
+        "if sys.version_info[0] >= 3:\n"
+        "    with open(REQUIREMENTS) as f:\n"
+        "        REQUIREMENTS = f.read().splitlines()\n"
+        "setup(install_requires=REQUIREMENTS + ['simple_salesforce>=0.74.3'])"
+        "\n")
+    with pytest.raises(ValueError, match="line 7"):
+        compare_deps(project_root=str(dynamic_project_dir))
+    setup_deps, _ = compare_deps(project_root=str(dynamic_project_dir),
+                                 dynamic_setup=True)
+    assert setup_deps == setup_deps_and_extras[0]
+
+
+def test_evaluate_setup_cached(mocker, dynamic_project_dir):
+    """
+    Tests that each version of a setup.py file is only evaluated once, and
+    that changing a requirements file invalidates the cached result
+    """
+    setup_path = str(dynamic_project_dir / "setup.py")
+    first = evaluate_setup(setup_path)
+    assert first["extras_require"] == {
+        "salesforce": ["simple_salesforce>=0.74.3"]}
+
+    run = mocker.spy(subprocess, "run")
+    assert evaluate_setup(setup_path) == first
+    run.assert_not_called()
+
+    (dynamic_project_dir / "requirements.txt").write_text("pandas>=1.0\n")
+    assert evaluate_setup(setup_path)["install_requires"] == ["pandas>=1.0"]
+    assert run.call_count == 1
+
+
+def test_evaluate_setup_timeout(tmp_path, monkeypatch):
+    """
+    Tests that evaluations taking too long, or never calling setup(), are
+    abandoned with an error
+    """
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    slow_setup = tmp_path / "setup.py"
+    slow_setup.write_text("import time\ntime.sleep(30)\n")
+    with pytest.raises(ValueError, match="timed out"):
+        evaluate_setup(str(slow_setup), timeout=0.5)
+
+    # The caller's environment, e.g. its credentials, is not passed on
+    monkeypatch.setenv("DEVCHECK_TEST_TOKEN", "secret")
+    slow_setup.write_text("import os\n"
+                          "raise RuntimeError(os.getenv('DEVCHECK_TEST_TOKEN'"
+                          ", 'cleared'))\n")
+    with pytest.raises(ValueError, match="RuntimeError: cleared"):
+        evaluate_setup(str(slow_setup))
+
+    slow_setup.write_text("raise RuntimeError('no setup here')\n")
+    with pytest.raises(ValueError, match="no setup here"):
+        evaluate_setup(str(slow_setup))
+
+
+def test_evaluate_setup_no_cache(mocker, tmp_path, dynamic_project_dir):
+    """
+    Tests that with the cache disabled each evaluation runs setup.py and
+    nothing is read from or written to the cache
+    """
+    run = mocker.spy(subprocess, "run")
+    for _ in range(2):
+        compare_deps(project_root=str(dynamic_project_dir),
+                     dynamic_setup=True, use_cache=False)
+    assert run.call_count == 2
+    assert not (tmp_path / "cache").exists()
+
+
+def test_evaluate_setup_limits(mocker, tmp_path, monkeypatch):
+    """
+    Tests that the size of the files setup.py writes is limited by the
+    evaluation subprocess itself, rather than between fork and exec
+    """
+    pytest.importorskip("resource")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setattr(dynamic_setup, "MAX_FILE_BYTES", 1024)
+    setup = tmp_path / "setup.py"
+    setup.write_text("with open('big.bin', 'wb') as f:\n"
+                     "    f.write(b'0' * 4096)\n"
+                     "from setuptools import setup\n"
+                     "setup(install_requires=['pandas'])\n")
+    run = mocker.spy(subprocess, "run")
+    with pytest.raises(ValueError, match="did not reach setup"):
+        evaluate_setup(str(setup))
+    assert (tmp_path / "big.bin").stat().st_size <= 1024
+    assert "preexec_fn" not in run.call_args[1]
@@ -0,0 +1,91 @@
+import pytest
+
+from pipenv_devcheck.__main__ import main
+from pipenv_devcheck.environment import (check_installed, installed_versions,
+                                         read_name_version)
+
+
+def install(site_packages, name, version, kind="dist-info"):
+    """Writes the metadata of an installed distribution"""
+    metadata = ("Metadata-Version: 2.1\nName: {}\nVersion: {}\n"
+                "Summary: A test distribution\n\n"
+                "Version: 0.0 in the description\n").format(name, version)
+    if kind == "dist-info":
+        dist_dir = site_packages / "{}-{}.dist-info".format(
+            name.replace("-", "_"), version)
+        dist_dir.mkdir()
+        (dist_dir / "METADATA").write_text(metadata)
+    elif kind == "egg-info":
+        dist_dir = site_packages / "{}-{}.egg-info".format(name, version)
+        dist_dir.mkdir()
+        (dist_dir / "PKG-INFO").write_text(metadata)
+    else:
+        (site_packages / "{}-{}.egg-info".format(name, version)).write_text(
+            metadata)
+
+
+@pytest.fixture
+def site_packages(tmp_path):
+    """Installed distributions satisfying the setup.py fixture"""
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    install(site_packages, "matplotlib", "3.1.2")
+    install(site_packages, "PyHive", "0.6.1", "egg-info")
+    install(site_packages, "pandas", "0.25.1")
+    install(site_packages, "seaborn", "0.9.0", "egg-file")
+    install(site_packages, "simple-salesforce", "0.74.3")
+    return site_packages
+
+
+def test_read_name_version(site_packages):
+    """
+    Tests that only the headers of the metadata are read
+    """
+    metadata_path = site_packages / "pandas-0.25.1.dist-info" / "METADATA"
+    assert read_name_version(str(metadata_path)) == ("pandas", "0.25.1")
+
+
+def test_installed_versions(site_packages, tmp_path):
+    """
+    Tests that every kind of metadata is indexed by canonical name, and that
+    earlier directories take precedence
+    """
+    override = tmp_path / "override"
+    override.mkdir()
+    install(override, "pandas", "1.0.0")
+    assert installed_versions([str(override), str(site_packages),
+                               str(tmp_path / "missing")]) == {
+        "matplotlib": "3.1.2", "pyhive": "0.6.1", "pandas": "1.0.0",
+        "seaborn": "0.9.0", "simple-salesforce": "0.74.3"}
+
+
+def test_check_installed(project_dir, site_packages, tmp_path):
+    """
+    Tests that missing and disallowed versions are reported together
+    """
+    assert check_installed(project_root=str(project_dir),
+                           paths=[str(site_packages)])["pyhive"] == "0.6.1"
+
+    override = tmp_path / "override"
+    override.mkdir()
+    install(override, "seaborn", "0.8.1")
+    (site_packages / "pandas-0.25.1.dist-info" / "METADATA").unlink()
+    with pytest.raises(ValueError) as e:
+        check_installed(project_root=str(project_dir),
+                        paths=[str(override), str(site_packages)])
+    assert str(e.value) == (
+        "Installed packages do not satisfy setup.py!\n"
+        "Dependencies in setup.py but not installed: pandas\n"
+        "Installed versions not allowed by setup.py: seaborn==0.8.1\n")
+
+
+def test_main_installed(project_dir, site_packages):
+    """
+    Tests the --installed flag, which does not need a Pipfile
+    """
+    (project_dir / "Pipfile").unlink()
+    main(["--installed", "--project-root", str(project_dir),
+          "--site-packages", str(site_packages)])
+    with pytest.raises(ValueError, match="not installed"):
+        main(["--installed", "--project-root", str(project_dir),
+              "--site-packages", str(project_dir)])
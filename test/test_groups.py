@@ -0,0 +1,113 @@
+import pytest
+
+from pipenv_devcheck import intervals, lexer, version_cache
+from pipenv_devcheck.__main__ import main
+from pipenv_devcheck.groups import VersionTable, compare_groups
+
+
+@pytest.fixture
+def grouped_project(tmp_path, setup_text, pipfile_text):
+    """
+    The project fixture with a 'test' extra, matched by '[dev-packages]',
+    and a 'docs' extra, matched by a '[docs]' category
+    """
+    setup = setup_text.replace(
+        "        ]\n",
+        "        ],\n"
+        "        extras_require={\n"
+        "                'test': ['pytest>=5.0', 'seaborn>=0.9.0'],\n"
+        "                'docs': ['sphinx>=2.0,<3.0']\n"
+        "        }\n")
+    pipfile = pipfile_text.replace(
+        "[requires]",
+        '[dev-packages]\npytest = "==5.3.2"\nseaborn = "*"\n\n'
+        '[docs]\nsphinx = "==2.4.0"\n\n[requires]')
+    (tmp_path / "setup.py").write_text(setup)
+    (tmp_path / "Pipfile").write_text(pipfile)
+    return tmp_path
+
+
+def test_compare_groups(grouped_project):
+    """
+    Tests that each group is compared with its own section
+    """
+    results = compare_groups(project_root=str(grouped_project))
+    assert [(result.section, result.groups, result.findings)
+            for result in results] == [("packages", ["install_requires"], []),
+                                       ("dev-packages", ["test"], []),
+                                       ("docs", ["docs"], [])]
+
+
+def test_compare_groups_findings(grouped_project):
+    """
+    Tests that findings are reported against the section they occur in, and
+    that sections can be chosen for groups
+    """
+    pipfile = grouped_project / "Pipfile"
+    pipfile.write_text(pipfile.read_text().replace('"==2.4.0"', '"==3.0"'))
+    results = compare_groups(project_root=str(grouped_project),
+                             group_map={"test": "packages"})
+    assert [(result.section, result.groups) for result in results] == [
+        ("packages", ["install_requires", "test"]), ("docs", ["docs"])]
+    assert [(finding.package, finding.check)
+            for finding in results[0].findings] == [("pytest", "name")]
+    assert [(finding.package, finding.check)
+            for finding in results[1].findings] == [("sphinx", "version")]
+
+
+def test_shared_version_table(grouped_project, mocker):
+    """
+    Tests that text shared between groups is parsed once
+    """
+    setup = grouped_project / "setup.py"
+    setup.write_text(setup.read_text().replace(
+        "'docs': ['sphinx>=2.0,<3.0']",
+        "'docs': ['sphinx>=2.0,<3.0', 'seaborn>=0.9.0']"))
+    pipfile = grouped_project / "Pipfile"
+    pipfile.write_text(pipfile.read_text().replace(
+        'sphinx = "==2.4.0"', 'sphinx = "==2.4.0"\nseaborn = "==0.9.0"'))
+    lex_requirement = mocker.spy(lexer, "lex_requirement")
+    mocker.patch.dict(lexer.requirement_parsers,
+                      regex=lexer.lex_requirement)
+    version_cache.clear_caches()
+    spec_intervals = mocker.spy(intervals, "spec_intervals")
+
+    results = compare_groups(project_root=str(grouped_project))
+    assert not any(result.findings for result in results)
+    # Seven distinct requirement lines, though seaborn is listed in three
+    assert lex_requirement.call_count == 7
+    # Fifteen distinct specifications out of eighteen compared
+    assert spec_intervals.call_count == 15
+
+
+def test_version_table_merges_duplicates():
+    """
+    Tests that a dependency listed in several groups must satisfy all of
+    their specifications
+    """
+    table = VersionTable()
+    deps, extras = table.setup_deps(["pandas[a]>=1.0", "pandas[b]<2.0",
+                                     "numpy", "numpy>=1.17"])
+    assert deps == {"pandas": [(">=", "1.0"), ("<", "2.0")],
+                    "numpy": [(">=", "1.17")]}
+    assert extras == {"pandas": ["a", "b"]}
+
+
+def test_main_groups(grouped_project, capsys):
+    """
+    Tests the --groups flag
+    """
+    main(["--groups", "--project-root", str(grouped_project)])
+    assert capsys.readouterr().out == (
+        "PASS [packages] (install_requires)\n"
+        "PASS [dev-packages] (test)\n"
+        "PASS [docs] (docs)\n")
+
+    pipfile = grouped_project / "Pipfile"
+    pipfile.write_text(pipfile.read_text().replace('"==5.3.2"', '"==4.6"'))
+    with pytest.raises(SystemExit) as e:
+        main(["--groups", "--project-root", str(grouped_project)])
+    assert e.value.code == 1
+    assert capsys.readouterr().out.splitlines()[1:3] == [
+        "FAIL [dev-packages] (test)",
+        "    version pytest: setup.py >=5.0, Pipfile ==4.6"]
@@ -0,0 +1,97 @@
+import shutil
+import subprocess
+
+import pytest
+
+from pipenv_devcheck import history
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None,
+                                reason="git is not installed")
+
+
+def git(repo, *args):
+    """Runs a git command in a test repository"""
+    subprocess.run(["git", "-C", str(repo), "-c", "user.name=Test",
+                    "-c", "user.email=test@example.com"] + list(args),
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+@pytest.fixture
+def repo(tmp_path, setup_text, pipfile_text):
+    """
+    A repository whose Pipfile drifts from setup.py in its third commit and
+    is fixed in its fifth
+    """
+    git(tmp_path, "init", "-q")
+    (tmp_path / "setup.py").write_text(setup_text)
+    git(tmp_path, "add", "setup.py")
+    git(tmp_path, "commit", "-q", "-m", "Add setup.py")
+
+    drifted = pipfile_text.replace('seaborn = "==0.9.0"',
+                                   'seaborn = "<0.9.0"')
+    for message, text in [("Add Pipfile", pipfile_text),
+                          ("Pin old seaborn", drifted),
+                          ("Update README", None),
+                          ("Fix seaborn", pipfile_text)]:
+        if text is None:
+            (tmp_path / "README").write_text(message)
+            git(tmp_path, "add", "README")
+        else:
+            (tmp_path / "Pipfile").write_text(text)
+            git(tmp_path, "add", "Pipfile")
+        git(tmp_path, "commit", "-q", "-m", message)
+    return tmp_path
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_check_history(repo, processes, mocker):
+    """
+    Tests that every commit is reported, and that commits sharing the same
+    dependency files are only checked once
+    """
+    check_texts = mocker.spy(history, "check_texts")
+    results = history.check_history(repo=str(repo), processes=processes)
+
+    assert [(result.subject, result.passed) for result in results] == [
+        ("Add setup.py", False), ("Add Pipfile", True),
+        ("Pin old seaborn", False), ("Update README", False),
+        ("Fix seaborn", True)]
+    assert results[0].error == ("FileNotFoundError: Pipfile not found in "
+                                "commit")
+    assert "seaborn" in results[2].error
+    assert results[2].error == results[3].error
+    if processes == 1:
+        assert check_texts.call_count == 2
+
+
+def test_check_history_range(repo):
+    """
+    Tests that only the commits in the range are checked, and that invalid
+    ranges raise a ValueError
+    """
+    results = history.check_history("HEAD~2..HEAD", repo=str(repo))
+    assert [result.subject for result in results] == [
+        "Update README", "Fix seaborn"]
+    with pytest.raises(ValueError, match="git log failed"):
+        history.check_history("no-such-ref", repo=str(repo))
+
+
+def test_check_history_subdirectory(tmp_path, setup_text, pipfile_text):
+    """
+    Tests that paths are read relative to a project in a subdirectory of
+    the repository, not to the repository's top level
+    """
+    git(tmp_path, "init", "-q")
+    project = tmp_path / "services" / "api"
+    project.mkdir(parents=True)
+    (project / "setup.py").write_text(setup_text)
+    (project / "Pipfile").write_text(pipfile_text)
+    # A top-level Pipfile that would fail the check if it were read instead
+    (tmp_path / "Pipfile").write_text(pipfile_text.replace(
+        'seaborn = "==0.9.0"', 'seaborn = "<0.9.0"'))
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "Add api service")
+
+    results = history.check_history(repo=str(project), processes=1)
+    assert [(result.subject, result.passed, result.error)
+            for result in results] == [("Add api service", True, None)]
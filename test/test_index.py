@@ -0,0 +1,111 @@
+import pytest
+
+from pipenv_devcheck import index, pipenv_setup_comp
+from pipenv_devcheck.__main__ import main
+
+
+@pytest.fixture
+def projects(tmp_path, setup_text, pipfile_text):
+    """
+    Three projects: the fixture project, one requiring an older seaborn and
+    one whose Pipfile disagrees with its setup.py on seaborn
+    """
+    variants = {
+        "base": (setup_text, pipfile_text),
+        "old": (setup_text.replace("'seaborn>=0.9.0'", "'seaborn<0.9.0'"),
+                pipfile_text.replace('seaborn = "==0.9.0"',
+                                     'seaborn = "==0.8.1"')),
+        "drifted": (setup_text,
+                    pipfile_text.replace('seaborn = "==0.9.0"',
+                                         'seaborn = "<0.9.0"')),
+    }
+    roots = {}
+    for name, (setup, pipfile) in variants.items():
+        root = tmp_path / name
+        root.mkdir()
+        (root / "setup.py").write_text(setup)
+        (root / "Pipfile").write_text(pipfile)
+        roots[name] = str(root)
+    return roots
+
+
+def test_index_projects(projects, tmp_path, mocker):
+    """
+    Tests that projects are only parsed again when their files change
+    """
+    db_path = str(tmp_path / "index.sqlite3")
+    get_setup_deps = mocker.spy(pipenv_setup_comp, "get_setup_deps")
+    roots = list(projects.values()) + [str(tmp_path / "missing")]
+
+    assert index.index_projects(roots, db_path) == (3, 0, 1)
+    assert index.index_projects(roots, db_path) == (0, 3, 1)
+    assert get_setup_deps.call_count == 3
+
+    with open(projects["base"] + "/Pipfile", "r+") as f:
+        pipfile = f.read()
+        f.seek(0)
+        f.write(pipfile.replace("[packages]\n",
+                                "[packages]\nrequests = '*'\n"))
+    assert index.index_projects(roots, db_path) == (1, 2, 1)
+    allowing = index.projects_allowing("Requests>2", db_path, "pipfile")
+    assert [spec.project for spec in allowing] == [projects["base"]]
+
+
+def test_queries(projects, tmp_path):
+    """
+    Tests that projects allowing a requirement and conflicting
+    specifications are found
+    """
+    db_path = str(tmp_path / "index.sqlite3")
+    index.index_projects(projects.values(), db_path)
+
+    allowing = index.projects_allowing("seaborn<0.9", db_path)
+    assert allowing == [index.ProjectSpec(projects["old"], "setup",
+                                          [("<", "0.9.0")])]
+    assert index.projects_allowing("pandas[fake_extra]<0.25", db_path) == []
+    assert len(index.projects_allowing("Simple-Salesforce", db_path)) == 3
+
+    conflicts = index.find_conflicts("seaborn", db_path)
+    assert [(conflict.left.project, conflict.left.source,
+             conflict.right.project, conflict.right.source)
+            for conflict in conflicts] == [
+        (projects["drifted"], "setup", projects["drifted"], "pipfile"),
+        (projects["base"], "setup", projects["old"], "setup"),
+        (projects["drifted"], "setup", projects["old"], "setup"),
+    ]
+    assert index.find_conflicts("pandas", db_path) == []
+
+
+def test_main_index_query(projects, tmp_path, capsys):
+    """
+    Tests the index and query commands
+    """
+    db_path = str(tmp_path / "index.sqlite3")
+    main(["index", "--db", db_path] + list(projects.values()))
+    assert capsys.readouterr().out == (
+        "Indexed 3 projects, 0 unchanged, 0 failed\n")
+    main(["query", "allows", "seaborn<0.9", "--db", db_path])
+    assert capsys.readouterr().out == "{} <0.9.0\n".format(projects["old"])
+    main(["query", "conflicts", "seaborn", "--db", db_path])
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+
+def test_clear_cache_keeps_index(projects, tmp_path, monkeypatch):
+    """
+    Tests that the index is stored apart from the result cache, so clearing
+    the cache does not delete it
+    """
+    from pipenv_devcheck.cache import CACHE_DIR_ENV, clear_cache
+
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.delenv(index.INDEX_PATH_ENV, raising=False)
+    assert index.default_index_path() == str(
+        tmp_path / "data" / "pipenv-devcheck" / "index.sqlite3")
+
+    index.index_projects(list(projects.values()))
+    clear_cache()
+    assert len(index.projects_allowing("seaborn>=0.9.0")) == 2
+
+    monkeypatch.setenv(index.INDEX_PATH_ENV, str(tmp_path / "other.db"))
+    assert index.default_index_path() == str(tmp_path / "other.db")
@@ -0,0 +1,139 @@
+import random
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from pipenv_devcheck.intervals import (AfterPosts, Interval,
+                                       contains_version, format_intervals,
+                                       intersect, is_subset, spec_intervals)
+
+
+def test_spec_intervals_range():
+    """
+    Tests that range operators are combined into a single interval
+    """
+    assert spec_intervals([(">=", "1.0"), ("<", "2.0"), (">", "1.0")]) == [
+        Interval(AfterPosts(Version("1.0")), False, Version("2.0.dev0"),
+                 False)]
+    assert spec_intervals(["*"]) == [Interval(None, False, None, False)]
+
+
+def test_spec_intervals_unsatisfiable():
+    """
+    Tests that contradictory specifications produce no intervals
+    """
+    assert spec_intervals([(">=", "2.0"), ("<", "1.0")]) == []
+    assert spec_intervals([("==", "1.0"), ("!=", "1.0")]) == []
+    assert spec_intervals([(">", "1.0"), ("<=", "1.0")]) == []
+
+
+def test_spec_intervals_exclusions():
+    """
+    Tests that '!=' chains split the range, ignoring exclusions that fall
+    outside of it
+    """
+    intervals = spec_intervals([("!=", "1.5"), (">=", "1.0"), ("!=", "0.5"),
+                                ("!=", "1.2"), ("<", "2.0")])
+    assert format_intervals(intervals) == \
+        ">=1.0, <1.2 | >1.2, <1.5 | >1.5, <2.0.dev0"
+
+
+def test_intersect():
+    """
+    Tests that intersections report the overlapping range
+    """
+    setup = spec_intervals([(">=", "1.0"), ("!=", "1.5")])
+    pipfile = spec_intervals([(">=", "1.2"), ("<=", "2.0")])
+    overlap = intersect(setup, pipfile)
+    assert format_intervals(overlap) == ">=1.2, <1.5 | >1.5, <=2.0"
+    assert intersect(spec_intervals([("==", "1.5")]), setup) == []
+    assert format_intervals(intersect(spec_intervals([("<=", "1.0")]),
+                                      spec_intervals([(">=", "1.0")]))) == \
+        "==1.0"
+
+
+def test_is_subset_and_contains_version():
+    """
+    Tests containment of intervals and of single versions
+    """
+    outer = spec_intervals([(">=", "1.0"), ("<", "2.0")])
+    assert is_subset(spec_intervals([("==", "1.1")]), outer)
+    assert not is_subset(spec_intervals([(">=", "1.1")]), outer)
+    assert contains_version(outer, Version("1.9"))
+    assert not contains_version(outer, Version("2.0"))
+
+
+def test_spec_intervals_compatible_release_and_wildcards():
+    """
+    Tests that '~=', '===' and prefix-matching specifications are
+    normalized like their equivalent ranges
+    """
+    assert format_intervals(spec_intervals([("~=", "1.4.2")])) == \
+        ">=1.4.2, <1.5.dev0"
+    assert format_intervals(spec_intervals([("==", "1.*")])) == \
+        ">=1.dev0, <2.dev0"
+    assert format_intervals(spec_intervals([("===", "1.0")])) == "==1.0"
+    intervals = spec_intervals([(">=", "1.0"), ("!=", "1.2.*"),
+                                ("<", "2.0")])
+    assert format_intervals(intervals) == \
+        ">=1.0, <1.2.dev0 | >=1.3.dev0, <2.0.dev0"
+    assert contains_version(intervals, Version("1.3.0"))
+    assert not contains_version(intervals, Version("1.2.5"))
+
+
+def test_spec_intervals_exclusive_comparisons():
+    """
+    Tests that '<' and '>' with a final release leave out its pre- and
+    post-releases, as SpecifierSet does, but not with other releases
+    """
+    below = spec_intervals([("<", "2.0")])
+    assert not contains_version(below, Version("2.0rc1"))
+    assert not contains_version(below, Version("2.0.dev0"))
+    assert contains_version(below, Version("1.9.post1"))
+    assert contains_version(spec_intervals([("<", "2.0.post1")]),
+                            Version("2.0rc1"))
+
+    above = spec_intervals([(">", "2.0")])
+    assert not contains_version(above, Version("2.0.post1"))
+    assert not contains_version(above, Version("2.0.post1.dev1"))
+    assert contains_version(above, Version("2.0.0.1"))
+    assert contains_version(spec_intervals([(">", "2.0rc1")]),
+                            Version("2.0.post1"))
+    assert format_intervals(above) == ">2.0"
+    assert spec_intervals([(">", "2.0"), ("<=", "2.0.post1")]) == []
+    assert intersect(above, spec_intervals([(">", "2.0.0")])) == above
+
+
+def test_spec_intervals_epochs():
+    """
+    Tests that '~=' and prefix matching keep the epoch of their version
+    """
+    assert format_intervals(spec_intervals([("~=", "1!1.4.2")])) == \
+        ">=1!1.4.2, <1!1.5.dev0"
+    assert format_intervals(spec_intervals([("!=", "1!2.*"),
+                                            (">=", "1!1.0")])) == \
+        ">=1!1.0, <1!2.dev0 | >=1!3.dev0"
+
+
+def test_intersect_matches_specifier_set():
+    """
+    Tests on random specifications that two sides have overlapping
+    intervals exactly when some sampled version satisfies both according
+    to SpecifierSet
+    """
+    rng = random.Random(0)
+    grid = ["{}.{}".format(major, minor) for major in range(1, 4)
+            for minor in range(3)]
+    universe = [Version(version) for grid_version in grid
+                for version in (grid_version, grid_version + ".5")]
+    universe.append(Version("0.5"))
+    for _ in range(300):
+        left, right = [[(rng.choice(["==", "!=", ">=", "<=", "<", ">"]),
+                         rng.choice(grid))
+                        for _ in range(rng.randint(1, 3))]
+                       for _ in range(2)]
+        specifiers = SpecifierSet(",".join(op + version
+                                           for op, version in left + right))
+        expected = any(specifiers.contains(version) for version in universe)
+        overlap = intersect(spec_intervals(left), spec_intervals(right))
+        assert bool(overlap) == expected, (left, right)
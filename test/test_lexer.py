@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+from pipenv_devcheck.lexer import (Requirement, lex_requirement, lex_spec,
+                                   lex_specs, scan_requirement)
+
+valid_requirements = [
+    "matplotlib>=3.1.1",
+    "pyhive[hive, presto]>=0.6.0, <0.7",
+    "zope.interface",
+    "  requests (~=2.22 , !=2.22.1 )  ",
+    "numpy===1.18.1; python_version < '3.8'",
+    "pkg @ https://example.com/pkg.tar.gz",
+    "pkg[]==1!2.0.post1+local",
+]
+invalid_requirements = ["", "pandas>=", "pandas>=1.0,", "pandas >=1.0 <2.0",
+                        "requests (>=2.0", "pkg[extra", "pkg>==1", "pkg=>1"]
+
+
+def test_lex_requirement():
+    """
+    Tests that names, extras and specifications are parsed in one pass
+    """
+    assert lex_requirement("pyhive[hive, presto]>=0.6.0, <0.7") == \
+        Requirement("pyhive", ["hive", "presto"],
+                    [(">=", "0.6.0"), ("<", "0.7")])
+    assert lex_requirement("zope.interface") == \
+        Requirement("zope.interface", [], ["*"])
+    assert lex_requirement("requests (~=2.22)") == \
+        Requirement("requests", [], [("~=", "2.22")])
+    assert lex_requirement("numpy===1.18.1; python_version < '3.8'") == \
+        Requirement("numpy", [], [("===", "1.18.1")])
+
+
+def test_lex_requirement_invalid():
+    """
+    Tests that malformed requirements are rejected rather than misread
+    """
+    for text in invalid_requirements:
+        with pytest.raises(ValueError, match="Could not parse"):
+            lex_requirement(text)
+
+
+def test_lex_specs():
+    """
+    Tests that Pipfile specification strings are parsed into tuples
+    """
+    assert lex_specs(">=3.1.1, <=3.1.2") == [(">=", "3.1.1"),
+                                             ("<=", "3.1.2")]
+    assert lex_specs("*") == ["*"]
+    assert lex_specs("~=1.4, !=1.4.3") == [("~=", "1.4"), ("!=", "1.4.3")]
+    assert lex_spec(" ==1.0.* ") == ("==", "1.0.*")
+
+
+def test_scan_requirement_matches_lexer():
+    """
+    Tests that the linear-time state machine parses requirements exactly
+    like the regular expression lexer
+    """
+    for text in valid_requirements:
+        assert scan_requirement(text) == lex_requirement(text)
+    for text in invalid_requirements:
+        with pytest.raises(ValueError, match="Could not parse"):
+            scan_requirement(text)
+
+
+def test_parsers_agree_on_random_requirements():
+    """
+    Tests on random requirements, well-formed and malformed, that both
+    parsers return the same result or raise the same error
+    """
+    rng = random.Random(0)
+    ops = ["===", "~=", "==", "!=", "<=", ">=", "<", ">"]
+    versions = ["1", "1.0", "2.0.*", "1!2.0", "1.0rc1", "1.0.post1",
+                "1.0+local", "0.dev0"]
+
+    def random_valid():
+        specs = ", ".join(rng.choice(ops) + rng.choice(["", " "]) +
+                          rng.choice(versions)
+                          for _ in range(rng.randint(0, 3)))
+        if specs and rng.random() < 0.3:
+            specs = " (" + specs + ")"
+        extras = rng.choice(["", "[a]", "[a, b]", "[]"])
+        tail = rng.choice(["", "; python_version < '3.8'", " @ file:///x"])
+        return rng.choice(["pkg", "Zope.Interface", "a_b-c"]) + extras + \
+            specs + tail
+
+    alphabet = (list("aZ1_.-*+![](),;@ \t\xa0\xe9") + ops + versions)
+
+    def random_malformed():
+        return "".join(rng.choice(alphabet)
+                       for _ in range(rng.randint(0, 10)))
+
+    texts = ["a<!-", "pkg~=!1", "pkg>=!,<!"]
+    texts += [random_valid() for _ in range(2000)]
+    texts += [random_malformed() for _ in range(20000)]
+    for text in texts:
+        assert _parse(scan_requirement, text) == \
+            _parse(lex_requirement, text), text
+
+
+def _parse(parse_requirement, text):
+    """Parses a requirement, returning the error message if it raises"""
+    try:
+        return parse_requirement(text)
+    except ValueError as e:
+        return str(e)
+
+
+def test_scan_requirement_pathological():
+    """
+    Tests that long malformed requirements are rejected rather than
+    triggering excessive backtracking
+    """
+    for text in ["a" * 100000 + ">=", "pkg" + ">=1.0," * 20000,
+                 "pkg" + " " * 100000 + "x", "pkg[" + "a, " * 30000]:
+        with pytest.raises(ValueError):
+            scan_requirement(text)
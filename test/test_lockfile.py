@@ -0,0 +1,157 @@
+import json
+
+import pipfile
+import pytest
+
+from pipenv_devcheck import lockfile
+from pipenv_devcheck.__main__ import main
+from pipenv_devcheck.lockfile import (check_lock, read_lock_default,
+                                      read_lock_hash)
+
+
+def write_lock(project_dir, default_versions, lock_hash=None):
+    """
+    Writes a Pipfile.lock for the project's Pipfile, pinning the given
+    versions in the default section
+    """
+    if lock_hash is None:
+        lock_hash = pipfile.load(str(project_dir / "Pipfile")).hash
+    lock = {
+        "_meta": {"hash": {"sha256": lock_hash}, "pipfile-spec": 6,
+                  "requires": {}, "sources": [{"name": "default",
+                                               "url": "https://example.com",
+                                               "verify_ssl": True}]},
+        "default": {name: {"hashes": ["sha256:" + "0" * 64] * 3,
+                           "version": "==" + version}
+                    for name, version in default_versions.items()},
+        "develop": {"pytest": {"hashes": [], "version": "==5.3.0"}},
+    }
+    (project_dir / "Pipfile.lock").write_text(json.dumps(lock, indent=4))
+
+
+@pytest.fixture
+def locked_versions():
+    """Versions pinned by a lock that satisfies the setup.py fixture"""
+    return {"matplotlib": "3.1.2", "pyhive": "0.6.1", "pandas": "0.25.1",
+            "seaborn": "0.9.0", "simple-salesforce": "0.74.3",
+            "numpy": "1.18.1"}
+
+
+def test_read_lock(project_dir, locked_versions):
+    """
+    Tests that the lock's Pipfile hash and pinned versions are read
+    """
+    write_lock(project_dir, locked_versions, lock_hash="abc123")
+    lock_path = str(project_dir / "Pipfile.lock")
+    assert read_lock_hash(lock_path) == "abc123"
+    assert read_lock_default(lock_path) == locked_versions
+
+
+def test_read_lock_nested_default(project_dir, locked_versions):
+    """
+    Tests that only the top-level 'default' section is read, even when a
+    nested 'default' key comes first
+    """
+    write_lock(project_dir, locked_versions)
+    lock_path = project_dir / "Pipfile.lock"
+    lock = json.loads(lock_path.read_text())
+    lock["_meta"]["sources"][0]["default"] = {
+        "pandas": {"version": "==0.1.0"}}
+    lock_path.write_text(json.dumps(lock))
+    assert read_lock_default(str(lock_path)) == locked_versions
+
+
+def test_read_lock_sections(project_dir, locked_versions):
+    """
+    Tests that reading stops once the '_meta' and 'default' sections have
+    been decoded, and that sections in any order are found
+    """
+    write_lock(project_dir, locked_versions, lock_hash="abc123")
+    lock_path = project_dir / "Pipfile.lock"
+    text = lock_path.read_text()
+    # Everything after 'default', written last by pipenv, is never decoded
+    lock_path.write_text(text[:text.index('"develop"')] + "not JSON")
+    lock = lockfile.read_lock(str(lock_path))
+    assert sorted(lock) == ["_meta", "default"]
+    assert "hashes" not in lock["default"]["pandas"]
+
+    lock = json.loads(text)
+    lock_path.write_text(json.dumps({"develop": lock["develop"],
+                                     "default": lock["default"],
+                                     "_meta": lock["_meta"]}))
+    assert read_lock_default(str(lock_path)) == locked_versions
+    assert read_lock_hash(str(lock_path)) == "abc123"
+
+    lock_path.write_text('{"_meta": {}, "default" {}}')
+    with pytest.raises(ValueError, match="Expecting ':' delimiter"):
+        lockfile.read_lock(str(lock_path))
+
+
+def test_check_lock(mocker, tmp_path, project_dir, locked_versions):
+    """
+    Tests that a valid lock passes and that its verdict is then served from
+    the cache without parsing anything, until the lock is re-pinned
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    cache_dir = str(tmp_path / "cache")
+    write_lock(project_dir, locked_versions)
+    locked = check_lock(project_root=str(project_dir), cache_dir=cache_dir)
+    assert locked["simple_salesforce"] == "0.74.3"
+    assert "numpy" not in locked
+
+    check_uncached = mocker.patch.object(
+        lockfile, "_check_lock_uncached",
+        wraps=lockfile._check_lock_uncached)
+    assert check_lock(project_root=str(project_dir),
+                      cache_dir=cache_dir) == locked
+    check_uncached.assert_not_called()
+
+    # 'pipenv lock' re-pins without changing the Pipfile or its hash
+    locked_versions["seaborn"] = "0.8.0"
+    write_lock(project_dir, locked_versions)
+    with pytest.raises(ValueError, match="seaborn==0.8.0"):
+        check_lock(project_root=str(project_dir), cache_dir=cache_dir)
+
+    # Results read with another parser are cached separately
+    locked_versions["seaborn"] = "0.9.0"
+    write_lock(project_dir, locked_versions)
+    check_lock(project_root=str(project_dir), parser="linear",
+               cache_dir=cache_dir)
+    assert check_uncached.call_args[0][3:] == ("linear", False, True)
+
+
+def test_check_lock_invalid(project_dir, locked_versions):
+    """
+    Tests that stale locks and locked versions not allowed by setup.py are
+    reported
+
+    Args:
+        project_dir (pathlib.Path, pytest.fixture):
+            A project directory containing setup.py and a Pipfile
+    """
+    write_lock(project_dir, locked_versions, lock_hash="stale")
+    with pytest.raises(ValueError, match="out of date"):
+        check_lock(project_root=str(project_dir), use_cache=False)
+
+    locked_versions["seaborn"] = "0.8.0"
+    del locked_versions["pandas"]
+    write_lock(project_dir, locked_versions)
+    with pytest.raises(ValueError) as excinfo:
+        check_lock(project_root=str(project_dir), use_cache=False)
+    excinfo.match("not in Pipfile.lock: pandas")
+    excinfo.match("not allowed by setup.py: seaborn==0.8.0")
+
+
+def test_main_lock_other_modes(project_dir, capsys):
+    """
+    Tests that --lock is rejected with modes that do not run the default
+    comparison, rather than silently ignored
+    """
+    for flags in (["--json"], ["--groups"], ["--staged"], ["--installed"]):
+        with pytest.raises(SystemExit):
+            main(["--lock", "--project-root", str(project_dir)] + flags)
+        assert "--lock cannot be combined with " + flags[0] in \
+            capsys.readouterr().err
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+from packaging.version import Version
+
+from pipenv_devcheck import matrix as matrix_module
+from pipenv_devcheck.intervals import intersect
+from pipenv_devcheck.matrix import (compatibility_matrix, encode_intervals,
+                                    encode_version)
+from pipenv_devcheck.version_cache import spec_intervals
+
+specs_lists = [
+    [(">=", "1.0"), ("<", "2.0")],
+    [("==", "2.0")],
+    [("<=", "2.0")],
+    [("!=", "1.5"), (">", "1.4"), ("<", "1.6")],
+    [("==", "1.5")],
+    ["*"],
+    [(">=", "1.0"), ("<", "2.0")],
+]
+
+expected_matrix = [
+    [True, False, True, True, True, True, True],
+    [False, True, True, False, False, True, False],
+    [True, True, True, True, True, True, True],
+    [True, False, True, True, False, True, True],
+    [True, False, True, False, True, True, True],
+    [True, True, True, True, True, True, True],
+    [True, False, True, True, True, True, True],
+]
+
+
+def test_encode_version():
+    """
+    Tests that release versions encode in version order, and that other
+    versions are left to the scalar path
+    """
+    versions = ["0.dev0", "0", "1.0", "1.0.1", "1.2.dev0", "1.2", "1.10",
+                "2.0.0.1", "10"]
+    keys = [encode_version(Version(version)) for version in versions]
+    assert keys == sorted(set(keys))
+    assert encode_version(Version("1.0")) == encode_version(Version("1"))
+    for version in ["1.0rc1", "1.0.post1", "1.0.dev1", "1.0+local", "1!1.0",
+                    "1.2.3.4.5", "40000.0"]:
+        assert encode_version(Version(version)) is None
+    assert encode_intervals(spec_intervals([(">", "1.0a1")])) is None
+
+
+def test_compatibility_matrix_scalar():
+    """
+    Tests the matrix computed without NumPy, including duplicate rows
+    """
+    assert compatibility_matrix(specs_lists, vectorize=False) == \
+        expected_matrix
+    assert compatibility_matrix(specs_lists[:2], [["*"]],
+                                vectorize=False) == [[True], [True]]
+
+
+def test_compatibility_matrix_vectorized():
+    """
+    Tests the matrix computed with NumPy, with rows of pre-releases falling
+    back to pairwise comparison. '<2.0' does not allow 2.0rc1.
+    """
+    pytest.importorskip("numpy")
+    assert compatibility_matrix(specs_lists, vectorize=True).tolist() == \
+        expected_matrix
+    matrix = compatibility_matrix([[(">=", "2.0rc1")], [("<", "2.0")]],
+                                  specs_lists, vectorize=True)
+    assert matrix.tolist() == [
+        [False, True, True, False, False, True, False],
+        [True, False, True, True, True, True, True],
+    ]
+
+
+def test_compatibility_matrix_dev0_bounds(mocker):
+    """
+    Tests that '~=' and '==X.*', whose intervals end at '.dev0' versions,
+    are compared in the vectorized path, including against bounds right
+    beside those versions
+    """
+    pytest.importorskip("numpy")
+    specs = [[("~=", "1.4")], [("~=", "1.4.2")], [("==", "1.2.*")],
+             [("!=", "1.4.*")], [("<", "1.2")], [(">=", "1.5")],
+             [(">", "1.4.99")], [("<=", "1.2")], [(">", "1.2")]]
+    scalar_compatible = mocker.patch.object(
+        matrix_module, "_scalar_compatible",
+        wraps=matrix_module._scalar_compatible)
+    matrix = compatibility_matrix(specs, vectorize=True)
+    scalar_compatible.assert_not_called()
+    assert matrix.tolist() == [
+        [bool(intersect(spec_intervals(left), spec_intervals(right)))
+         for right in specs] for left in specs]
+
+
+def test_compatibility_matrix_matches_scalar():
+    """
+    Tests on random specifications, some of them pre-releases, that the
+    vectorized matrix matches the pairwise interval comparison
+    """
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+    grid = ["{}.{}".format(major, minor) for major in range(3)
+            for minor in range(3)] + ["1.0rc1", "1.1.post1", "1.1.dev0",
+                                      "1.*", "0.2.*"]
+    specs = []
+    for _ in range(60):
+        row = []
+        for _ in range(rng.randint(1, 3)):
+            version = rng.choice(grid)
+            ops = ["==", "!="] if version.endswith(".*") else [
+                "==", "!=", ">=", "<=", "<", ">", "~="]
+            row.append((rng.choice(ops), version))
+        specs.append(row)
+    matrix = compatibility_matrix(specs, specs[:40], vectorize=True)
+    assert matrix.shape == (60, 40)
+    for i, left in enumerate(specs):
+        for j, right in enumerate(specs[:40]):
+            assert matrix[i, j] == bool(intersect(spec_intervals(left),
+                                                  spec_intervals(right)))
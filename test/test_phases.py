@@ -0,0 +1,95 @@
+import pytest
+
+from pipenv_devcheck import phases
+from pipenv_devcheck.__main__ import main
+from pipenv_devcheck.pipenv_setup_comp import compare_deps, version_check
+
+
+def test_hooks(project_dir):
+    """
+    Tests that hooks are called around every phase of a check, with the
+    number of dependencies each phase processed
+    """
+    events = []
+    hook = phases.add_hook(
+        on_start=lambda name: events.append(("start", name)),
+        on_end=lambda stats: events.append(("end", stats.name, stats.deps,
+                                            stats.peak_bytes)))
+    try:
+        compare_deps(project_root=str(project_dir))
+    finally:
+        phases.remove_hook(hook)
+
+    assert events == [
+        ("start", "read_setup"), ("end", "read_setup", 5, None),
+        ("start", "parse_setup_deps"), ("end", "parse_setup_deps", 5, None),
+        ("start", "read_pipfile"), ("end", "read_pipfile", 5, None),
+        ("start", "parse_pipfile_deps"),
+        ("end", "parse_pipfile_deps", 5, None),
+        ("start", "name_equality_check"),
+        ("end", "name_equality_check", 5, None),
+        ("start", "version_check"), ("end", "version_check", 5, None),
+        ("start", "extras_equality_check"),
+        ("end", "extras_equality_check", 2, None),
+    ]
+
+    compare_deps(project_root=str(project_dir))
+    assert len(events) == 14
+
+
+def test_record_timings(setup_deps_and_extras, pipfile_deps_and_extras):
+    """
+    Tests that recorded stats include peak memory, and that phases that
+    raise are still recorded
+    """
+    setup_deps, _ = setup_deps_and_extras
+    pipfile_deps, _ = pipfile_deps_and_extras
+    pipfile_deps["seaborn"] = [("<", "0.9.0")]
+
+    stats, stop = phases.record_timings()
+    try:
+        with pytest.raises(ValueError):
+            version_check(setup_deps, pipfile_deps)
+    finally:
+        stop()
+    assert [stat.name for stat in stats] == ["version_check"]
+    assert stats[0].deps is None
+    assert stats[0].seconds > 0
+    assert stats[0].peak_bytes > 0
+    assert "version_check" in phases.format_timings(stats)
+
+
+def test_record_timings_without_reset_peak(monkeypatch, setup_deps_and_extras,
+                                           pipfile_deps_and_extras):
+    """
+    Tests that peak memory is left unmeasured, rather than failing, where
+    tracemalloc cannot reset its peak (before Python 3.9)
+    """
+    import tracemalloc
+
+    monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+    stats, stop = phases.record_timings()
+    try:
+        version_check(setup_deps_and_extras[0], pipfile_deps_and_extras[0])
+    finally:
+        stop()
+    assert stats[0].deps > 0
+    assert stats[0].peak_bytes is None
+    assert not tracemalloc.is_tracing()
+    assert phases.format_timings(stats).splitlines()[1].endswith("-")
+
+
+def test_main_timings(project_dir, capsys):
+    """
+    Tests that --timings prints a line per phase, then the cache hit rates,
+    to stderr
+    """
+    main(["--project-root", str(project_dir), "--timings"])
+    lines = capsys.readouterr().err.splitlines()
+    assert lines[0].split() == ["phase", "wall", "deps", "peak", "mem"]
+    assert [line.split()[0] for line in lines[1:8]] == [
+        "read_setup", "parse_setup_deps", "read_pipfile",
+        "parse_pipfile_deps", "name_equality_check", "version_check",
+        "extras_equality_check"]
+    assert [line.split()[0] for line in lines[8:]] == [
+        "cache", "parse_version", "lex_spec", "spec_intervals"]
@@ -1,9 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import subprocess
+import sys
+
 import pytest
 
+from pipenv_devcheck.__main__ import main
 from pipenv_devcheck.pipenv_setup_comp import (
     read_setup, read_pipfile, get_setup_deps, get_pipfile_deps,
     split_ops_and_versions, name_equality_check, version_check,
-    extras_equality_check)
+    extras_equality_check, compare_deps, compare_deps_batch)
 
 
 def test_read_setup(mocker, setup_text, setup_deps_from_read):
@@ -15,6 +21,49 @@ def test_read_setup(mocker, setup_text, setup_deps_from_read):
     assert read_results == setup_deps_from_read
 
 
+def test_read_setup_constants(mocker, setup_text_w_constants,
+                              setup_deps_from_read):
+    """
+    Tests that attribute calls to setup() are found and that dependencies
+    held in module-level constants are resolved
+    """
+    mocker.patch("builtins.open",
+                 mocker.mock_open(read_data=setup_text_w_constants))
+    read_results = read_setup()
+    assert read_results == setup_deps_from_read
+
+
+def test_read_setup_unresolvable(mocker):
+    """
+    Tests that a clear error is raised for dependencies that are not
+    literals or module-level constants
+    """
+    mocker.patch("builtins.open", mocker.mock_open(
+        read_data="from setuptools import setup\n"
+                  "setup(install_requires=read_requirements())\n"))
+    with pytest.raises(ValueError):
+        read_setup()
+    mocker.patch("builtins.open", mocker.mock_open(read_data="x = 1\n"))
+    with pytest.raises(ValueError, match="No setup"):
+        read_setup()
+
+
+def test_read_setup_invalid_types(mocker):
+    """
+    Tests that arguments of the wrong type are reported as ValueError, so
+    that dynamic evaluation can be fallen back on
+    """
+    for setup_text in [
+            "setup(install_requires=['pandas'] + 'seaborn')\n",
+            "setup(extras_require=['pandas'])\n",
+            "setup(extras_require={'test': [1]})\n",
+            "setup(extras_require={1: ['pandas']})\n"]:
+        mocker.patch("builtins.open", mocker.mock_open(
+            read_data="from setuptools import setup\n" + setup_text))
+        with pytest.raises(ValueError):
+            read_setup()
+
+
 def test_read_pipfile(mocker, pipfile_text, pipfile_deps_from_read):
     """
     Tests that Pipfile reading functions as expected
@@ -258,3 +307,127 @@ def test_extras_equality_check_invalid_mismatched_extras(test_extras):
     with pytest.raises(ValueError,
                        match='mismatched package extras'):
         assert extras_equality_check(setup_extras, pipenv_extras)
+
+
+def test_compare_deps_batch(tmp_path, setup_text, pipfile_text):
+    """
+    Tests that batch mode returns one result per project, in order, and
+    captures failures instead of raising them
+
+    Args:
+        setup_text (str, pytest.fixture):
+            setup.py text as would be returned by f.open().read()
+        pipfile_text (str, pytest.fixture):
+            Pipfile as would be returned by f.open().read()
+    """
+    valid_root = tmp_path / "valid"
+    invalid_root = tmp_path / "invalid"
+    for root in (valid_root, invalid_root):
+        root.mkdir()
+        (root / "setup.py").write_text(setup_text)
+    (valid_root / "Pipfile").write_text(pipfile_text)
+    (invalid_root / "Pipfile").write_text(
+        pipfile_text.replace('seaborn = "==0.9.0"', 'seaborn = "<0.8.0"'))
+
+    results = compare_deps_batch([str(valid_root), str(invalid_root)],
+                                 processes=2)
+    assert [result.project for result in results] == [str(valid_root),
+                                                      str(invalid_root)]
+    assert results[0].passed and results[0].error is None
+    assert not results[1].passed
+    assert "seaborn" in results[1].error
+
+
+def test_main_ineffective_flags(project_dir, capsys):
+    """
+    Tests that modes cannot be combined, and that options the selected mode
+    does not use are rejected rather than silently ignored
+    """
+    root = str(project_dir)
+    for argv, message in (
+            (["--projects", root, "--timings"],
+             "--timings cannot be combined with --projects"),
+            (["--history", "HEAD", "--timings"],
+             "--timings cannot be combined with --history"),
+            (["--watch", "--timings"],
+             "--timings cannot be combined with --watch"),
+            (["--watch", "--history", "HEAD"],
+             "--history cannot be combined with --watch"),
+            (["--history", "HEAD", "--no-cache"],
+             "--no-cache cannot be combined with --history"),
+            (["--serve", "--dynamic-setup"],
+             "--dynamic-setup cannot be combined with --serve"),
+            (["--installed", "--transitive", "--pipfile-path", "Pipfile"],
+             "--pipfile-path cannot be combined with --installed and "
+             "--transitive"),
+            (["--parser", "linear", "query", "conflicts", "pandas"],
+             "--parser cannot be combined with the query command"),
+            (["--jobs", "2"], "--jobs requires --history or --projects"),
+            (["--lock", "--poll-interval", "0"],
+             "--poll-interval requires --watch"),
+            (["--site-packages", root],
+             "--site-packages requires --installed or --transitive")):
+        with pytest.raises(SystemExit):
+            main(argv)
+        assert message in capsys.readouterr().err, argv
+
+    main(["--projects", root, "--parser", "linear", "--jobs", "1",
+          "--no-cache"])
+    assert capsys.readouterr().out == "PASS {}\n".format(root)
+
+
+def test_compare_deps_paths_concurrent(tmp_path, setup_text, pipfile_text,
+                                       setup_deps_and_extras,
+                                       pipfile_deps_and_extras):
+    """
+    Tests that compare_deps reads only the paths it is given, so several
+    projects can be checked concurrently without changing directory
+
+    Args:
+        setup_text (str, pytest.fixture):
+            setup.py text as would be returned by f.open().read()
+        pipfile_text (str, pytest.fixture):
+            Pipfile as would be returned by f.open().read()
+        setup_deps_and_extras (dict<str, list<tuple<str, str>>>),
+                               pytest.fixture):
+            setup.py dependencies extracted from a string into a dict
+        pipfile_deps_and_extras (dict<str, list<tuple<str, str>>>),
+                                 pytest.fixture):
+            Pipfile dependencies extracted from a string into a dict
+    """
+    roots = []
+    for i in range(8):
+        root = tmp_path / "project{}".format(i)
+        root.mkdir()
+        (root / "setup.py").write_text(setup_text)
+        (root / "Pipfile").write_text(pipfile_text)
+        roots.append(str(root))
+    cwd = os.getcwd()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            lambda root: compare_deps(project_root=root), roots))
+    assert os.getcwd() == cwd
+    expected = (setup_deps_and_extras[0], pipfile_deps_and_extras[0])
+    assert all(result == expected for result in results)
+
+    explicit = compare_deps(setup_path=os.path.join(roots[0], "setup.py"),
+                            pipfile_path=os.path.join(roots[1], "Pipfile"))
+    assert explicit == expected
+
+
+def test_import_is_lazy():
+    """
+    Tests that importing the package and its comparison module does not
+    import the modules only needed by individual phases
+    """
+    script = (
+        "import sys\n"
+        "import pipenv_devcheck.pipenv_setup_comp\n"
+        "print(sorted(m for m in ('ast', 'pipfile', 'packaging', "
+        "'multiprocessing', 'pipenv_devcheck.lexer') if m in sys.modules))\n"
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert output.decode().strip() == "[]"
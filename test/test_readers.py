@@ -0,0 +1,121 @@
+import pytest
+
+from pipenv_devcheck import compare_deps
+from pipenv_devcheck.readers import (ABSENT, UNCHANGED, find_setup_source,
+                                     reader_for, readers)
+
+setup_cfg_text = """
+[metadata]
+name = demo_setup
+
+[options]
+install_requires =
+    matplotlib>=3.1.1
+    # plotting
+    pyhive[hive, presto]>=0.6.0
+    pandas[fake_extra]>=0.25.1  # pinned for the demo
+    seaborn>=0.9.0
+    simple_salesforce>=0.74.3
+
+[options.extras_require]
+test =
+    pytest>=5.0
+"""
+
+pyproject_text = """
+[build-system]
+requires = ["setuptools"]
+
+[project]
+name = "demo_setup"
+dependencies = [
+    "matplotlib>=3.1.1",
+    "pyhive[hive, presto]>=0.6.0",
+    "pandas[fake_extra]>=0.25.1",
+    "seaborn>=0.9.0",
+    "simple_salesforce>=0.74.3",
+]
+
+[project.optional-dependencies]
+test = ["pytest>=5.0"]
+"""
+
+
+@pytest.mark.parametrize("filename,text", [("setup.cfg", setup_cfg_text),
+                                           ("pyproject.toml", pyproject_text)])
+def test_read_groups(filename, text, setup_deps_from_read):
+    """
+    Tests that setup.cfg and pyproject.toml dependencies are read by group
+    """
+    groups = reader_for(filename).read(filename, text)
+    assert groups == {"install_requires": setup_deps_from_read,
+                      "test": ["pytest>=5.0"]}
+
+
+def test_read_unsupported():
+    """
+    Tests that dependencies which cannot be read statically raise a
+    ValueError
+    """
+    with pytest.raises(ValueError, match="file:"):
+        readers["setup.cfg"].read(
+            "setup.cfg", "[options]\ninstall_requires = file: reqs.txt\n")
+    with pytest.raises(ValueError, match="dynamic"):
+        readers["pyproject.toml"].read(
+            "pyproject.toml",
+            '[project]\nname = "x"\ndynamic = ["dependencies"]\n')
+
+
+def test_reader_for():
+    """
+    Tests that readers are chosen by file name, with a default for others
+    """
+    assert reader_for("a/setup.cfg") is readers["setup.cfg"]
+    assert reader_for("a/setup_demo.py") is readers["setup.py"]
+    assert reader_for("a/Pipfile.test", "Pipfile") is readers["Pipfile"]
+
+
+def test_can_skip(tmp_path):
+    """
+    Tests that readers report absent and unchanged files
+    """
+    path = str(tmp_path / "setup.cfg")
+    reader = readers["setup.cfg"]
+    assert reader.can_skip(path) == (True, ABSENT, None)
+    (tmp_path / "setup.cfg").write_text(setup_cfg_text)
+    skip, reason, signature = reader.can_skip(path)
+    assert (skip, reason) == (False, None)
+    assert reader.can_skip(path, signature) == (True, UNCHANGED, signature)
+    (tmp_path / "setup.cfg").write_text(setup_cfg_text + "\n")
+    assert not reader.can_skip(path, signature).skip
+
+
+def test_find_setup_source(tmp_path):
+    """
+    Tests that a setup.py shim is passed over for a setup.cfg declaring the
+    dependencies, and that setup.py is preferred otherwise
+    """
+    assert find_setup_source(str(tmp_path)) == str(tmp_path / "setup.py")
+    (tmp_path / "pyproject.toml").write_text('[build-system]\n')
+    assert find_setup_source(str(tmp_path)) == str(
+        tmp_path / "pyproject.toml")
+    (tmp_path / "setup.py").write_text("from setuptools import setup\n"
+                                       "setup()\n")
+    (tmp_path / "setup.cfg").write_text(setup_cfg_text)
+    assert find_setup_source(str(tmp_path)) == str(tmp_path / "setup.cfg")
+    (tmp_path / "setup.py").write_text("setup(install_requires=[])\n")
+    assert find_setup_source(str(tmp_path)) == str(tmp_path / "setup.py")
+
+
+@pytest.mark.parametrize("filename,text", [("setup.cfg", setup_cfg_text),
+                                           ("pyproject.toml", pyproject_text)])
+def test_compare_deps_sources(tmp_path, pipfile_text, filename, text):
+    """
+    Tests that projects declaring their dependencies in setup.cfg or
+    pyproject.toml are found and checked
+    """
+    (tmp_path / filename).write_text(text)
+    (tmp_path / "Pipfile").write_text(pipfile_text.replace(
+        "[requires]", 'pytest = "==5.3.2"\n\n[requires]'))
+    setup_deps, _ = compare_deps(project_root=str(tmp_path))
+    assert setup_deps["pytest"] == [(">=", "5.0")]
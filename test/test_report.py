@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from pipenv_devcheck.__main__ import main
+from pipenv_devcheck.report import (Finding, check_report, collect_findings)
+
+
+def test_collect_findings_valid(setup_deps_and_extras,
+                                pipfile_deps_and_extras):
+    """
+    Tests that compatible dependency files produce no findings
+    """
+    assert collect_findings(*setup_deps_and_extras,
+                            *pipfile_deps_and_extras) == []
+
+
+def test_collect_findings_all(setup_deps_and_extras, pipfile_deps_and_extras):
+    """
+    Tests that failures of every check are gathered in a single pass
+    """
+    setup_deps, setup_extras = setup_deps_and_extras
+    pipfile_deps, pipfile_extras = pipfile_deps_and_extras
+    setup_deps["requests"] = ["*"]
+    del pipfile_deps["matplotlib"]
+    pipfile_deps["seaborn"] = [("<", "0.9.0")]
+    pipfile_extras["pyhive"] = ["hive"]
+
+    findings = collect_findings(setup_deps, setup_extras,
+                                pipfile_deps, pipfile_extras)
+    assert findings == [
+        Finding("matplotlib", "name", ">=3.1.1", None),
+        Finding("pyhive", "extras", "[hive, presto]", "[hive]"),
+        Finding("requests", "name", "*", None),
+        Finding("seaborn", "version", ">=0.9.0", "<0.9.0"),
+    ]
+    with pytest.raises(AttributeError):
+        findings[0].note = "records have fixed fields"
+
+
+def test_check_report(project_dir, pipfile_text):
+    """
+    Tests that reports carry findings and read errors, and convert to JSON
+    """
+    report = check_report(project_root=str(project_dir))
+    assert report.passed and report.exit_code == 0
+
+    (project_dir / "Pipfile").write_text(
+        pipfile_text.replace('seaborn = "==0.9.0"', 'seaborn = "<0.9.0"'))
+    report = json.loads(check_report(project_root=str(project_dir))
+                        .to_json())
+    assert report == {
+        "project": str(project_dir), "passed": False, "error": None,
+        "findings": [{"package": "seaborn", "check": "version",
+                      "setup_spec": ">=0.9.0", "pipfile_spec": "<0.9.0"}]}
+
+    (project_dir / "setup.py").unlink()
+    report = check_report(project_root=str(project_dir))
+    assert report.error.startswith("FileNotFoundError")
+    assert report.exit_code == 1
+
+
+def test_main_json(project_dir, pipfile_text, capsys):
+    """
+    Tests that --json prints the report and exits with its status
+    """
+    (project_dir / "Pipfile").write_text(
+        pipfile_text.replace('seaborn = "==0.9.0"', 'seaborn = "<0.9.0"'))
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--project-root", str(project_dir), "--json"])
+    assert exit_info.value.code == 1
+    report = json.loads(capsys.readouterr().out)
+    assert [finding["package"] for finding in report["findings"]] == [
+        "seaborn"]
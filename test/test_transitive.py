@@ -0,0 +1,148 @@
+import pytest
+
+from pipenv_devcheck import transitive
+from pipenv_devcheck.__main__ import main
+from pipenv_devcheck.environment import installed_distributions
+from pipenv_devcheck.transitive import (Edge, Requirer, check_transitive,
+                                        distribution_edges, read_requirements,
+                                        walk_requirements)
+
+
+def install(site_packages, name, version, requires=()):
+    """Writes the metadata of an installed distribution and its requirements"""
+    dist_dir = site_packages / "{}-{}.dist-info".format(
+        name.replace("-", "_"), version)
+    dist_dir.mkdir()
+    (dist_dir / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: {}\nVersion: {}\n{}\n"
+        "Requires-Dist: in-the-description\n".format(
+            name, version, "".join("Requires-Dist: {}\n".format(requirement)
+                                   for requirement in requires)))
+
+
+@pytest.fixture
+def site_packages(tmp_path):
+    """
+    Installed distributions satisfying the setup.py fixture, whose
+    requirements reach further distributions
+    """
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    install(site_packages, "matplotlib", "3.1.2",
+            ["numpy>=1.11", "kiwisolver>=1.0.1"])
+    install(site_packages, "numpy", "1.17.4")
+    install(site_packages, "kiwisolver", "1.1.0",
+            ['futures; python_version < "3"'])
+    install(site_packages, "PyHive", "0.6.1",
+            ["future", "python-dateutil",
+             'thrift>=0.10.0; extra == "hive"',
+             'requests>=1.0.0; extra == "presto"',
+             'sqlalchemy>=1.3.0; extra == "sqlalchemy"'])
+    install(site_packages, "thrift", "0.13.0", ["six>=1.7.2"])
+    install(site_packages, "pandas", "0.25.1", ["numpy>=1.13.3"])
+    install(site_packages, "seaborn", "0.9.0",
+            ["pandas>=0.15.2", "matplotlib>=1.4.3"])
+    install(site_packages, "simple-salesforce", "0.74.3",
+            ["requests[security]"])
+    return site_packages
+
+
+def test_read_requirements(site_packages, tmp_path):
+    """
+    Tests that requirements are read from the METADATA headers, or from the
+    sections of an egg's requires.txt
+    """
+    assert read_requirements(str(
+        site_packages / "seaborn-0.9.0.dist-info" / "METADATA")) == [
+        "pandas>=0.15.2", "matplotlib>=1.4.3"]
+
+    egg_dir = tmp_path / "demo-1.0.egg-info"
+    egg_dir.mkdir()
+    (egg_dir / "PKG-INFO").write_text("Name: demo\nVersion: 1.0\n")
+    (egg_dir / "requires.txt").write_text(
+        "six\n\n[:python_version < \"3\"]\nfutures\n\n[test]\npytest\n\n"
+        "[docs:sys_platform == \"win32\"]\nsphinx\n")
+    assert read_requirements(str(egg_dir / "PKG-INFO")) == [
+        "six", 'futures; (python_version < "3")', 'pytest; extra == "test"',
+        'sphinx; (sys_platform == "win32") and extra == "docs"']
+
+
+def test_walk_requirements(site_packages):
+    """
+    Tests that the walk follows the extras requested, skips requirements
+    whose markers do not hold, and records requirements on distributions
+    that are not installed
+    """
+    distributions = installed_distributions([str(site_packages)])
+    assert distribution_edges(
+        distributions["pyhive"].metadata_path, frozenset(["hive"])) == [
+        Edge("future", ["*"], frozenset()),
+        Edge("python-dateutil", ["*"], frozenset()),
+        Edge("thrift", [(">=", "0.10.0")], frozenset())]
+
+    reached, constraints = walk_requirements(
+        {"PyHive": [(">=", "0.6.0")], "Simple_Salesforce": ["*"]},
+        {"PyHive": ["hive", "presto"]}, distributions)
+    assert reached == {"pyhive", "thrift", "simple-salesforce"}
+    assert constraints["requests"] == [
+        Requirer("PyHive", "0.6.1", [(">=", "1.0.0")]),
+        Requirer("simple-salesforce", "0.74.3", ["*"])]
+    assert "sqlalchemy" not in constraints
+    assert "futures" not in constraints
+
+
+def test_check_transitive(project_dir, site_packages):
+    """
+    Tests that ranges are checked against requirements reached through
+    other dependencies, however deep
+    """
+    reached = check_transitive(project_root=str(project_dir),
+                               paths=[str(site_packages)])
+    assert sorted(reached) == [
+        "kiwisolver", "matplotlib", "numpy", "pandas", "pyhive",
+        "seaborn", "simple-salesforce", "thrift"]
+
+    install(site_packages, "six", "1.13.0", ["pandas<0.25"])
+    with pytest.raises(ValueError) as e:
+        check_transitive(project_root=str(project_dir),
+                         paths=[str(site_packages)])
+    assert str(e.value) == (
+        "Installed distributions allow no version within the ranges of "
+        "setup.py!\n"
+        "pandas >=0.25.1 in setup.py, but seaborn 0.9.0 requires "
+        ">=0.15.2; six 1.13.0 requires <0.25\n")
+
+
+def test_graph_cache(project_dir, site_packages, monkeypatch):
+    """
+    Tests that each distribution's requirements are read once across
+    checks, and again once its metadata changes
+    """
+    transitive.clear_graph_cache()
+    reads = []
+    read = transitive.read_requirements
+    monkeypatch.setattr(transitive, "read_requirements",
+                        lambda path: reads.append(path) or read(path))
+    for _ in range(3):
+        check_transitive(project_root=str(project_dir),
+                         paths=[str(site_packages)])
+    assert len(reads) == len(set(reads)) == 8
+
+    metadata_path = site_packages / "numpy-1.17.4.dist-info" / "METADATA"
+    metadata_path.write_text(metadata_path.read_text() + "\n")
+    check_transitive(project_root=str(project_dir),
+                     paths=[str(site_packages)])
+    assert reads[8:] == [str(metadata_path)]
+
+
+def test_main_transitive(project_dir, site_packages):
+    """
+    Tests the --transitive flag, which does not need a Pipfile
+    """
+    (project_dir / "Pipfile").unlink()
+    main(["--transitive", "--project-root", str(project_dir),
+          "--site-packages", str(site_packages)])
+    install(site_packages, "six", "1.13.0", ["matplotlib<3"])
+    with pytest.raises(ValueError, match="matplotlib >=3.1.1 in setup.py"):
+        main(["--transitive", "--project-root", str(project_dir),
+              "--site-packages", str(site_packages)])
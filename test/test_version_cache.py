@@ -0,0 +1,56 @@
+import pytest
+
+from pipenv_devcheck import version_cache
+from pipenv_devcheck.pipenv_setup_comp import version_check
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """Starts each test with empty caches"""
+    version_cache.clear_caches()
+    yield
+    version_cache.clear_caches()
+
+
+def stats_by_name():
+    """The current cache statistics, by cache name"""
+    return {stats.name: stats for stats in version_cache.cache_stats()}
+
+
+def test_parse_version_interns():
+    """
+    Tests that parsing a version twice returns the same object
+    """
+    version = version_cache.parse_version("1.17.3")
+    assert version_cache.parse_version("1.17.3") is version
+    stats = stats_by_name()["parse_version"]
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+    assert version_cache.hit_rate(stats) == 0.5
+
+
+def test_spec_intervals_copies():
+    """
+    Tests that cached intervals cannot be altered through a result
+    """
+    intervals = version_cache.spec_intervals([(">=", "1.0"), ("<", "2.0")])
+    intervals.clear()
+    assert len(version_cache.spec_intervals([(">=", "1.0"),
+                                             ("<", "2.0")])) == 1
+    assert stats_by_name()["spec_intervals"].hits == 1
+
+
+def test_version_check_shares_parses():
+    """
+    Tests that specifications recurring across projects are parsed once
+    """
+    setup_deps = {"numpy": [(">=", "1.17")], "pandas": [(">=", "0.25")]}
+    pipfile_deps = {"numpy": [("==", "1.17.3")], "pandas": [("==", "0.25.1")]}
+    for _ in range(10):
+        version_check(setup_deps, pipfile_deps)
+    stats = stats_by_name()
+    assert stats["spec_intervals"].misses == 4
+    assert stats["spec_intervals"].hits == 36
+    assert stats["parse_version"].misses == 4
+    assert version_cache.format_cache_stats(
+        version_cache.cache_stats()).splitlines()[3].split() == [
+        "spec_intervals", "36", "4", "90.0%"]
@@ -0,0 +1,61 @@
+import pytest
+
+from pipenv_devcheck import watch
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher_kind(request, monkeypatch):
+    """Runs a test with each way of detecting changes"""
+    if request.param == "polling":
+        monkeypatch.setattr(watch, "_make_watcher",
+                            lambda paths, interval:
+                            watch._PollingWatcher(paths, 0.01))
+    return request.param
+
+
+def test_watch_results(project_dir, pipfile_text, watcher_kind):
+    """
+    Tests that the files are checked once at the start, and that only the
+    file that changed is parsed again afterwards
+    """
+    results = watch.watch_results(project_root=str(project_dir))
+    setup_path = str(project_dir / "setup.py")
+    pipfile_path = str(project_dir / "Pipfile")
+
+    first = next(results)
+    assert first.passed
+    assert first.changed == {setup_path, pipfile_path}
+
+    (project_dir / "Pipfile").write_text(
+        pipfile_text.replace('seaborn = "==0.9.0"', 'seaborn = "<0.9.0"'))
+    second = next(results)
+    assert second.changed == {pipfile_path}
+    assert not second.passed
+    assert "seaborn" in second.error
+
+    (project_dir / "Pipfile").write_text(pipfile_text)
+    third = next(results)
+    assert third.changed == {pipfile_path}
+    assert third.passed
+    results.close()
+
+
+def test_watch_results_parse_error(project_dir, setup_text, watcher_kind):
+    """
+    Tests that a file that fails to parse is reported, and parsed again once
+    it is fixed
+    """
+    results = watch.watch_results(project_root=str(project_dir))
+    setup_path = str(project_dir / "setup.py")
+    assert next(results).passed
+
+    (project_dir / "setup.py").write_text("setup(")
+    broken = next(results)
+    assert not broken.passed
+    assert broken.error.startswith("SyntaxError")
+
+    (project_dir / "setup.py").write_text(setup_text)
+    fixed = next(results)
+    assert fixed.changed == {setup_path}
+    assert fixed.passed
+    results.close()